@@ -0,0 +1,131 @@
+"""Time full library loads of the API clients against a local fake API with injected latency and throttling.
+
+    python -m benchmarks.clients --playlists 20 --tracks 1000 --latency 0.05
+    python -m benchmarks.clients --platforms deezer --page-concurrency 1,2,4,8,16 --throttle-rate 0.05
+"""
+import time
+from typing import Any, List, NamedTuple, Optional, cast
+
+import httpx
+import typer
+from terminaltables import AsciiTable
+
+from benchmarks.fake_api import FakeApi, FakeApiOptions, RedirectTransport
+from playlist_organizer.client.base import BaseClient, Platform
+from playlist_organizer.client.deezer.client import DeezerClient
+from playlist_organizer.client.deezer.settings import DeezerSettings
+from playlist_organizer.client.spotify.client import SpotifyClient
+from playlist_organizer.client.spotify.settings import SpotifySettings
+from playlist_organizer.client.transport import MeteredTransport, WireStats
+
+app = typer.Typer()
+
+
+class ClientRun(NamedTuple):
+    platform: Platform
+    # pages in flight per listing, None for clients which fetch pages one by one
+    page_concurrency: Optional[int]
+    seconds: float
+    requests: int
+    throttled: int
+    playlists: int
+    tracks: int
+    wire: WireStats
+
+
+class _StaticToken:
+    token = 'benchmark-token'
+
+
+def _client(platform: Platform, api: FakeApi, page_concurrency: int, rate: float) -> BaseClient[Any]:
+    authenticator = cast(Any, _StaticToken())
+    # throttled requests are retried after Retry-After or a short backoff, so throttling costs round trips only
+    limits = {'http2': False, 'requests_per_second': rate, 'burst': max(1, int(rate)), 'retry_backoff': 0.01}
+    if platform is Platform.DEEZER:
+        return DeezerClient(
+            DeezerSettings(api_host=api.url, page_concurrency=page_concurrency, **limits), authenticator
+        )
+
+    settings = SpotifySettings(**limits)
+    transport = MeteredTransport(RedirectTransport(api.url, httpx.HTTPTransport(limits=settings.limits)))
+    return SpotifyClient(settings, authenticator, transport=transport)
+
+
+def measure(platform: Platform, options: FakeApiOptions, page_concurrency: int = 4, rate: float = 1000.0) -> ClientRun:
+    """Load every playlist of a fresh fake library with a client without caches, as the menu does on start."""
+    with FakeApi(options) as api:
+        client = _client(platform, api, page_concurrency, rate)
+        started = time.perf_counter()
+        catalog = client.get_playlist_catalog()
+        tracks = sum(len(client.get_playlist_tracks_by_id(entry.id)) for entry in catalog.entries)
+        elapsed = time.perf_counter() - started
+        return ClientRun(
+            platform=platform,
+            page_concurrency=page_concurrency if platform is Platform.DEEZER else None,
+            seconds=elapsed,
+            requests=api.requests,
+            throttled=api.throttled,
+            playlists=len(catalog),
+            tracks=tracks,
+            wire=cast(Any, client).wire_stats,
+        )
+
+
+@app.command()
+def main(  # pylint: disable=R0913
+    platforms: str = ','.join(p.value.lower() for p in Platform),
+    playlists: int = 20,
+    tracks: int = 500,
+    page_size: int = 100,
+    latency: float = 0.05,
+    throttle_rate: float = 0.0,
+    page_concurrency: str = '1,4,8',
+    rate: float = 1000.0,
+    seed: int = 0,
+) -> None:
+    options = FakeApiOptions(
+        playlists=playlists,
+        tracks=tracks,
+        page_size=page_size,
+        latency=latency,
+        throttle_rate=throttle_rate,
+        seed=seed,
+    )
+    rows = [
+        [
+            'Platform',
+            'Pages in flight',
+            'Seconds',
+            'Requests',
+            'Throttled',
+            'Tracks',
+            'Tracks/s',
+            'Requests/s',
+            'KiB wire / decoded',
+        ]
+    ]
+    for platform in (Platform[p.strip().upper()] for p in platforms.split(',')):
+        # the sync Spotify client fetches pages one by one, so there is nothing to sweep
+        sweep = [int(c) for c in page_concurrency.split(',')] if platform is Platform.DEEZER else [1]
+        for concurrency in sweep:
+            rows.append(_row(measure(platform, options, concurrency, rate)))
+
+    typer.secho(AsciiTable(rows).table)
+
+
+def _row(run: ClientRun) -> List[str]:
+    return [
+        run.platform.value,
+        '-' if run.page_concurrency is None else str(run.page_concurrency),
+        f'{run.seconds:.3f}',
+        str(run.requests),
+        str(run.throttled),
+        str(run.tracks),
+        f'{run.tracks / run.seconds:.0f}',
+        f'{run.requests / run.seconds:.1f}',
+        f'{run.wire.wire_bytes / 1024:.0f} / {run.wire.decoded_bytes / 1024:.0f}',
+    ]
+
+
+if __name__ == '__main__':
+    app()
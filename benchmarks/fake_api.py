@@ -0,0 +1,323 @@
+"""Local stand-in for the Deezer and Spotify APIs, serving a synthetic library with injected latency and throttling.
+
+Responses are built from the fixtures in tests/raw_objects, so clients parse the same shapes as in the tests
+and as on the real APIs. Deezer is served at the root, Spotify under /v1, both from the same port:
+
+    with FakeApi(FakeApiOptions(playlists=10, tracks=1000, latency=0.05)) as api:
+        settings = DeezerSettings(api_host=api.url)
+"""
+import copy
+import gzip
+import json
+import pathlib
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import httpx
+
+RAW_OBJECTS_PATH = pathlib.Path(__file__).parents[1] / 'tests' / 'raw_objects'
+DEEZER_QUOTA_EXCEEDED = {'error': {'type': 'Exception', 'message': 'Quota limit exceeded', 'code': 4}}
+USER_ID = 'benchmark'
+
+# field name to its nested fields, None for the whole value
+Fields = Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class FakeApiOptions:
+    playlists: int = 20
+    # tracks per playlist
+    tracks: int = 500
+    # most items the server puts on a page, whatever limit is asked for
+    page_size: int = 100
+    # seconds every response is held back, like a round trip to the real API
+    latency: float = 0.05
+    # share of requests answered as throttled (Spotify 429, Deezer quota error)
+    throttle_rate: float = 0.0
+    gzip: bool = True
+    seed: int = 0
+
+
+def _template(filename: str, key: str) -> Dict[str, Any]:
+    with (RAW_OBJECTS_PATH / filename).open(encoding='utf-8') as f:
+        return json.load(f)[key][0]
+
+
+class FakeLibrary:
+    """Synthetic playlists and their tracks in both platforms' shapes, tracks are built on first request."""
+
+    def __init__(self, options: FakeApiOptions) -> None:
+        self._options = options
+        self._deezer_playlist = _template('deezer_playlists_1.json', 'data')
+        self._deezer_track = _template('deezer_playlist_tracks_1.json', 'data')
+        self._spotify_playlist = _template('spotify_playlists_1.json', 'items')
+        self._spotify_item = _template('spotify_playlist_tracks_1.json', 'items')
+        self.deezer_tracks = lru_cache(maxsize=None)(self._deezer_tracks)
+        self.spotify_items = lru_cache(maxsize=None)(self._spotify_items)
+
+    def playlist_index(self, playlist_id: str) -> Optional[int]:
+        index = int(re.sub(r'\D', '', playlist_id) or -1)
+        return index if 0 <= index < self._options.playlists else None
+
+    def deezer_playlists(self) -> List[Dict[str, Any]]:
+        return [
+            {**self._deezer_playlist, 'id': str(i), 'title': f'Playlist {i}', 'checksum': f'{i:08x}'}
+            for i in range(self._options.playlists)
+        ]
+
+    def spotify_playlists(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                **self._spotify_playlist,
+                'id': f'playlist{i}',
+                'name': f'Playlist {i}',
+                'snapshot_id': f'{i:08x}',
+                'tracks': {'href': '', 'total': self._options.tracks},
+            }
+            for i in range(self._options.playlists)
+        ]
+
+    def _songs(self, playlist: int) -> List[Tuple[int, str, str, str, datetime]]:
+        rnd = random.Random(self._options.seed * 100_003 + playlist)
+        added = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        return [
+            (
+                playlist * self._options.tracks + i,
+                f'Song {rnd.randrange(10**6)}',
+                f'Artist {rnd.randrange(10**4)}',
+                f'Album {rnd.randrange(10**5)}',
+                added + timedelta(minutes=i),
+            )
+            for i in range(self._options.tracks)
+        ]
+
+    def _deezer_tracks(self, playlist: int) -> List[Dict[str, Any]]:
+        tracks = []
+        for track_id, title, artist, album, added_at in self._songs(playlist):
+            track = copy.deepcopy(self._deezer_track)
+            track.update(id=str(track_id), title=title, title_short=title, time_add=int(added_at.timestamp()))
+            track['artist']['name'] = artist
+            track['album']['title'] = album
+            tracks.append(track)
+        return tracks
+
+    def _spotify_items(self, playlist: int) -> List[Dict[str, Any]]:
+        items = []
+        for track_id, title, artist, album, added_at in self._songs(playlist):
+            item = copy.deepcopy(self._spotify_item)
+            item['added_at'] = added_at.strftime('%Y-%m-%dT%H:%M:%SZ')
+            track = item['track']
+            track.update(id=f'{track_id:022d}', uri=f'spotify:track:{track_id:022d}', name=title)
+            track['external_ids'] = {'isrc': f'QZ{track_id:010d}'}
+            track['artists'][0]['name'] = artist
+            track['album']['name'] = album
+            items.append(item)
+        return items
+
+
+class FakeApi:
+    """HTTP server on a free local port, started and stopped as a context manager."""
+
+    def __init__(self, options: FakeApiOptions = FakeApiOptions()) -> None:
+        self.options = options
+        self.library = FakeLibrary(options)
+        self.requests = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(options.seed)
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _handler(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self) -> 'FakeApi':
+        # build the library up front, so its cost does not show up as latency of the first requests
+        for index in range(self.options.playlists):
+            self.library.deezer_tracks(index)
+            self.library.spotify_items(index)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def count_request(self) -> bool:
+        """Count a request, returns whether it should be throttled."""
+        with self._lock:
+            self.requests += 1
+            throttled = self._random.random() < self.options.throttle_rate
+            self.throttled += throttled
+            return throttled
+
+    def respond(self, path: str, query: Dict[str, str]) -> Tuple[int, Dict[str, str], Any]:
+        """Status, extra headers and json body of one request."""
+        if self.count_request():
+            if path.startswith('/v1/'):
+                return 429, {'Retry-After': '0'}, {'error': {'status': 429, 'message': 'API rate limit exceeded'}}
+            return 200, {}, DEEZER_QUOTA_EXCEEDED
+        for pattern, route in self._routes():
+            match = re.fullmatch(pattern, path)
+            if match:
+                return route(match, query)
+        return 404, {}, {'error': {'status': 404, 'message': f'No route for {path}'}}
+
+    def _routes(self) -> List[Tuple[str, Callable[[re.Match, Dict[str, str]], Tuple[int, Dict[str, str], Any]]]]:
+        return [
+            (r'/user/me', lambda m, q: (200, {}, {'id': USER_ID, 'name': USER_ID, 'type': 'user'})),
+            (r'/user/me/playlists', lambda m, q: self._deezer_page(m, q, self.library.deezer_playlists())),
+            (r'/playlist/(\w+)/tracks', self._deezer_playlist_tracks),
+            (r'/track/(\d+)', lambda m, q: (200, {}, {'id': m.group(1), 'isrc': f'QZ{int(m.group(1)):010d}'})),
+            (r'/v1/me', lambda m, q: (200, {}, _spotify_user())),
+            (
+                r'/v1/(?:me|users/\w+)/playlists',
+                lambda m, q: self._spotify_page(m, q, self.library.spotify_playlists()),
+            ),
+            (r'/v1/playlists/(\w+)/tracks', self._spotify_playlist_items),
+        ]
+
+    def _deezer_playlist_tracks(self, match: re.Match, query: Dict[str, str]) -> Tuple[int, Dict[str, str], Any]:
+        index = self.library.playlist_index(match.group(1))
+        if index is None:
+            return 200, {}, {'error': {'type': 'DataException', 'message': 'no data', 'code': 800}}
+        return self._deezer_page(match, query, self.library.deezer_tracks(index))
+
+    def _spotify_playlist_items(self, match: re.Match, query: Dict[str, str]) -> Tuple[int, Dict[str, str], Any]:
+        index = self.library.playlist_index(match.group(1))
+        if index is None:
+            return 404, {}, {'error': {'status': 404, 'message': 'Not found.'}}
+        status, headers, page = self._spotify_page(match, query, self.library.spotify_items(index))
+        if query.get('fields'):
+            page = project(page, parse_fields(query['fields']))
+        return status, headers, page
+
+    def _limit(self, query: Dict[str, str], default: int) -> int:
+        return max(1, min(int(query.get('limit', default)), self.options.page_size))
+
+    def _deezer_page(
+        self, match: re.Match, query: Dict[str, str], items: List[Any]
+    ) -> Tuple[int, Dict[str, str], Any]:
+        index, limit = int(query.get('index', 0)), self._limit(query, 25)
+        body: Dict[str, Any] = {'data': items[index : index + limit], 'total': len(items)}
+        if index + limit < len(items):
+            body['next'] = f'{self.url}{match.group(0)}?{urlencode({"index": index + limit, "limit": limit})}'
+        return 200, {}, body
+
+    def _spotify_page(
+        self, match: re.Match, query: Dict[str, str], items: List[Any]
+    ) -> Tuple[int, Dict[str, str], Any]:
+        offset, limit = int(query.get('offset', 0)), self._limit(query, 20)
+        href = f'{self.url}{match.group(0)}'
+        has_next = offset + limit < len(items)
+        return (
+            200,
+            {},
+            {
+                'href': f'{href}?{urlencode({"offset": offset, "limit": limit})}',
+                'items': items[offset : offset + limit],
+                'limit': limit,
+                'next': f'{href}?{urlencode({"offset": offset + limit, "limit": limit})}' if has_next else None,
+                'offset': offset,
+                'previous': None,
+                'total': len(items),
+            },
+        )
+
+
+def _spotify_user() -> Dict[str, Any]:
+    return {
+        'id': USER_ID,
+        'display_name': USER_ID,
+        'href': f'https://api.spotify.com/v1/users/{USER_ID}',
+        'type': 'user',
+        'uri': f'spotify:user:{USER_ID}',
+        'external_urls': {},
+    }
+
+
+def parse_fields(spec: str) -> Fields:
+    """Spotify `fields` filter such as `total,items(track(name,album(name)))` as a tree of field names."""
+
+    def parse(pos: int) -> Tuple[Fields, int]:
+        fields: Fields = {}
+        while pos < len(spec) and spec[pos] != ')':
+            name = re.match(r'[^,()]*', spec[pos:]).group(0)  # type: ignore
+            pos += len(name)
+            nested = None
+            if pos < len(spec) and spec[pos] == '(':
+                nested, pos = parse(pos + 1)
+                pos += 1
+            fields[name] = nested
+            if pos < len(spec) and spec[pos] == ',':
+                pos += 1
+        return fields, pos
+
+    return parse(0)[0]
+
+
+def project(value: Any, fields: Fields) -> Any:
+    """Only <fields> of <value>, lists are projected item by item."""
+    if isinstance(value, list):
+        return [project(v, fields) for v in value]
+    if not isinstance(value, dict):
+        return value
+    return {k: value[k] if sub is None else project(value[k], sub) for k, sub in fields.items() if k in value}
+
+
+def _handler(api: FakeApi) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # headers and body go out in separate writes, Nagle's algorithm would delay the body by a delayed ACK
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:  # pylint: disable=C0103
+            url = urlparse(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            status, headers, body = api.respond(url.path.rstrip('/'), query)
+            time.sleep(api.options.latency)
+
+            content = json.dumps(body).encode()
+            self.send_response(status)
+            if api.options.gzip and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                content = gzip.compress(content, compresslevel=5)
+                self.send_header('Content-Encoding', 'gzip')
+            for name, value in {'Content-Type': 'application/json', **headers}.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+class RedirectTransport(httpx.BaseTransport):
+    """Sends requests for any host to <url>, for clients with a hardcoded API host such as tekore."""
+
+    def __init__(self, url: str, transport: Optional[httpx.BaseTransport] = None) -> None:
+        self._url = httpx.URL(url)
+        self._transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.url = request.url.copy_with(scheme=self._url.scheme, host=self._url.host, port=self._url.port)
+        return self._transport.handle_request(request)
+
+    def close(self) -> None:
+        self._transport.close()
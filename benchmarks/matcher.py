@@ -0,0 +1,101 @@
+"""Time TrackMatcher modes on synthetic libraries and check them against the reference scan.
+
+    python -m benchmarks.matcher --sizes 100,1000,10000,50000
+    python -m benchmarks.matcher --sizes 50000 --compact
+"""
+import time
+from collections import Counter
+from typing import List, Optional, Sequence, Tuple
+from unittest import mock
+
+import numpy as np
+import typer
+from Levenshtein import distance as levenshtein
+from terminaltables import AsciiTable
+
+from benchmarks.synthetic import Noise, synthetic_libraries
+from playlist_organizer.client.track import AnyTrack, CompactTrack
+from playlist_organizer.matcher import ExactKey, MatchMode, MatchOptions, MatchResult, TrackMatcher
+from playlist_organizer.matching import assignment, distance
+from playlist_organizer.matching.assignment import distance_matrix
+from playlist_organizer.matching.parallel import ParallelOptions
+
+# modes which promise exactly the same result as the greedy scan
+EQUIVALENT_MODES = (MatchMode.INDEXED, MatchMode.PARALLEL)
+
+app = typer.Typer()
+
+
+def _run(matcher: TrackMatcher, left: Sequence[AnyTrack], right: Sequence[AnyTrack]) -> Tuple[MatchResult, float]:
+    started = time.perf_counter()
+    result = matcher.match(list(left), list(right))
+    return result, time.perf_counter() - started
+
+
+def _count_distances(matcher: TrackMatcher, left: Sequence[AnyTrack], right: Sequence[AnyTrack]) -> int:
+    """String distances computed by one more, untimed run with wrapped distance functions.
+
+    Every bounded Levenshtein call counts once, a vectorized matrix counts its pairs with close enough lengths.
+    Only this process is counted, so PARALLEL mode is skipped by the caller.
+    """
+    matrix_pairs = []
+
+    def counted_matrix(left_keys: Sequence[str], right_keys: Sequence[str], cap: int) -> np.ndarray:
+        left_lengths, right_lengths = Counter(map(len, left_keys)), Counter(map(len, right_keys))
+        for left_len, left_count in left_lengths.items():
+            matrix_pairs.extend(count * left_count for n, count in right_lengths.items() if abs(n - left_len) < cap)
+        return distance_matrix(left_keys, right_keys, cap)
+
+    with mock.patch.object(distance, 'distance', side_effect=levenshtein) as calls, mock.patch.object(
+        assignment, 'distance_matrix', counted_matrix
+    ):
+        matcher.match(list(left), list(right))
+    return calls.call_count + sum(matrix_pairs)
+
+
+@app.command()
+def main(
+    sizes: str = '100,1000,5000,10000,50000',
+    modes: str = ','.join(m.value for m in MatchMode if m is not MatchMode.SCAN),
+    exact_key: ExactKey = ExactKey.NONE,
+    reference_limit: int = 2000,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    compact: bool = False,
+) -> None:
+    rows = [['Size', 'Mode', 'Seconds', 'Distances', 'Found', 'Only left', 'Only right', 'Same as scan']]
+    for size in (int(s) for s in sizes.split(',')):
+        left, right = _libraries(size, seed, compact)
+
+        reference = None
+        if size <= reference_limit:
+            scan = TrackMatcher(MatchOptions(mode=MatchMode.SCAN, exact_key=exact_key))
+            reference, elapsed = _run(scan, left, right)
+            rows.append([str(size), MatchMode.SCAN.value, f'{elapsed:.3f}', str(_count_distances(scan, left, right))])
+            rows[-1].extend([*_counts(reference), '-'])
+
+        for mode in (MatchMode(m) for m in modes.split(',')):
+            matcher = TrackMatcher(
+                MatchOptions(mode=mode, exact_key=exact_key, parallel=ParallelOptions(workers=workers))
+            )
+            result, elapsed = _run(matcher, left, right)
+            distances = '-' if mode is MatchMode.PARALLEL else str(_count_distances(matcher, left, right))
+            same = '-' if reference is None or mode not in EQUIVALENT_MODES else str(result.same_pairs(reference))
+            rows.append([str(size), mode.value, f'{elapsed:.3f}', distances, *_counts(result), same])
+
+    typer.secho(AsciiTable(rows).table)
+
+
+def _libraries(size: int, seed: int, compact: bool) -> Tuple[Sequence[AnyTrack], Sequence[AnyTrack]]:
+    left, right = synthetic_libraries(size, Noise(), seed=seed)
+    if not compact:
+        return left, right
+    return [CompactTrack.from_track(t) for t in left], [CompactTrack.from_track(t) for t in right]
+
+
+def _counts(result: MatchResult) -> List[str]:
+    return [str(len(result.found)), str(len(result.only_left)), str(len(result.only_right))]
+
+
+if __name__ == '__main__':
+    app()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import random
+import string
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from playlist_organizer.client.track import Platform, Track
+
+_SYLLABLES = ['la', 'mor', 'te', 'ri', 'son', 'ka', 'vel', 'do', 'nu', 'pha', 'ust', 'in', 'ge', 'bro', 'ly']
+_EPOCH = datetime(2015, 1, 1)
+
+
+@dataclass(frozen=True)
+class Noise:
+    """Share of tracks affected by every kind of difference between the two platforms."""
+
+    remaster: float = 0.1
+    punctuation: float = 0.2
+    typo: float = 0.05
+    missing: float = 0.05
+
+
+def synthetic_libraries(size: int, noise: Noise = Noise(), seed: int = 0) -> Tuple[List[Track], List[Track]]:
+    """Deezer and Spotify versions of the same library of <size> songs, for matcher tests and benchmarks.
+
+    Spotify titles get remaster suffixes, punctuation and typos, some songs are missing on either side
+    and the Spotify library is shuffled.
+    """
+    rnd = random.Random(seed)
+    artists = [_words(rnd, 1, 2).title() for _ in range(max(size // 10, 1))]
+
+    left: List[Track] = []
+    right: List[Track] = []
+    for number in range(size):
+        song = _Song(
+            title=_words(rnd, 1, 5).capitalize(),
+            artist=rnd.choice(artists),
+            album=_words(rnd, 1, 3).title(),
+            added_at=_EPOCH + timedelta(minutes=rnd.randrange(10**6)),
+        )
+        missing_side = rnd.choice([left, right]) if rnd.random() < noise.missing else None
+        if missing_side is not left:
+            left.append(song.track(song.title, Platform.DEEZER, str(10**6 + number)))
+        if missing_side is not right:
+            right.append(song.track(_noisy(rnd, song.title, noise), Platform.SPOTIFY, f'spotify:track:{number:022d}'))
+
+    rnd.shuffle(right)
+    return left, right
+
+
+@dataclass(frozen=True)
+class _Song:
+    title: str
+    artist: str
+    album: str
+    added_at: datetime
+
+    def track(self, title: str, source: Platform, external_id: str) -> Track:
+        return Track(
+            artists=[self.artist],
+            album=self.album,
+            title=title,
+            added_at=self.added_at,
+            source=source,
+            external_id=external_id,
+        )
+
+
+def _words(rnd: random.Random, min_count: int, max_count: int) -> str:
+    return ' '.join(
+        ''.join(rnd.choices(_SYLLABLES, k=rnd.randint(1, 4))) for _ in range(rnd.randint(min_count, max_count))
+    )
+
+
+def _noisy(rnd: random.Random, title: str, noise: Noise) -> str:
+    if rnd.random() < noise.typo:
+        pos = rnd.randrange(len(title))
+        title = title[:pos] + rnd.choice(string.ascii_lowercase) + title[pos + 1 :]
+    if rnd.random() < noise.punctuation:
+        title = rnd.choice(['{}!', '"{}"', '{}.', '{}?!']).format(title.replace(' ', ', ', 1))
+    if rnd.random() < noise.remaster:
+        title = rnd.choice(['{} - Remastered', '{} (Remaster)', '{} - Remastered {}']).format(
+            title, rnd.randint(1990, 2020)
+        )
+    return title
@@ -9,6 +9,7 @@ from datetime import datetime
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from typing import Optional
 
+import httpx
 import typer
 from pydantic import BaseModel, ValidationError
 
@@ -45,8 +46,14 @@ class Token(BaseModel):
 
 
 class BaseAuthenticator(abc.ABC):
-    def __init__(self, settings: BaseAuthSettings) -> None:
+    """Access token of a platform, kept on disk between runs.
+
+    <transport> is usually the one of the platform API client, so the token exchange shares its connection pool.
+    """
+
+    def __init__(self, settings: BaseAuthSettings, transport: Optional[httpx.BaseTransport] = None) -> None:
         self._settings = settings
+        self._http = httpx.Client(transport=transport)
         self._token: Optional[Token] = None
         self._token_path = _TOKEN_DIR / f'{type(self).__name__}-token.dump'
 
@@ -4,7 +4,6 @@ import logging
 from datetime import datetime, timedelta
 from typing import Tuple
 
-import httpx
 from httpx import Response
 
 from playlist_organizer.client.auth.base import BaseAuthenticator, Token
@@ -19,7 +18,7 @@ class DeezerAuthenticator(BaseAuthenticator):
             'secret': self._settings.secret_key,
             'code': self._code,
         }
-        resp = httpx.post(self._settings.token_url, data=params)
+        resp = self._http.post(self._settings.token_url, data=params)
         resp.raise_for_status()
 
         try:
@@ -4,8 +4,6 @@ import logging
 from base64 import b64encode
 from datetime import datetime, timedelta
 
-import httpx
-
 from playlist_organizer.client.auth.base import BaseAuthenticator, Token
 
 logger = logging.getLogger(__name__)
@@ -21,7 +19,7 @@ class SpotifyAuthenticator(BaseAuthenticator):
             'redirect_uri': f'{self._settings.redirect_host}:{self._settings.redirect_port}',
             'grant_type': 'authorization_code',
         }
-        resp = httpx.post(self._settings.token_url, data=payload, headers=headers)
+        resp = self._http.post(self._settings.token_url, data=payload, headers=headers)
         resp.raise_for_status()
         json_data = resp.json()
         try:
@@ -1,23 +1,31 @@
 from __future__ import annotations
 
 import abc
-import enum
-from datetime import datetime
-from typing import TYPE_CHECKING, Generic, List, TypeVar
+import asyncio
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Generic, Iterator, List, Optional, Set, Tuple, TypeVar
 
-from pydantic import BaseModel
+import httpx
 
 from playlist_organizer.client.auth.base import BaseAuthenticator
+from playlist_organizer.client.catalog import PlaylistCatalog, PlaylistEntry
+from playlist_organizer.client.checkpoint import Checkpoint
+from playlist_organizer.client.rate_limit import AsyncRateLimitedTransport, RateLimiter
+from playlist_organizer.client.track import Platform, Track
+from playlist_organizer.client.transport import AsyncMeteredTransport, HttpSettings, WireStats, create_async_transport
+from playlist_organizer.client.ttl_cache import TTLCache
 
 if TYPE_CHECKING:
-    from tekore._model import PlaylistTrack as SpotifyTrack
-
-    from playlist_organizer.client.deezer.entities import Track as DeezerTrack
+    from playlist_organizer.client.cache import PlaylistCache
+    from playlist_organizer.client.checkpoint import PaginationCheckpoints
 
 PlaylistType = TypeVar('PlaylistType')
+AsyncClientType = TypeVar('AsyncClientType', bound='IAsyncPlatformClient[Any]')
+ResultType = TypeVar('ResultType')
 
 
 class IPlatformClient(Generic[PlaylistType], abc.ABC):
+    platform: Platform
+
     @abc.abstractmethod
     def get_playlist_list(self) -> List[PlaylistType]:
         pass
@@ -30,68 +38,206 @@ class IPlatformClient(Generic[PlaylistType], abc.ABC):
     def get_playlist_tracks(self, name: str) -> List[Track]:
         pass
 
+    @abc.abstractmethod
+    def get_playlist_catalog(self) -> PlaylistCatalog:
+        pass
+
+    @abc.abstractmethod
+    def get_playlist_tracks_by_id(self, playlist_id: str) -> List[Track]:
+        pass
+
+    @abc.abstractmethod
+    def iter_playlist_tracks(self, playlist_id: str) -> Iterator[Track]:
+        pass
+
+
+class IAsyncPlatformClient(Generic[PlaylistType], abc.ABC):
+    @abc.abstractmethod
+    async def get_playlist_list(self) -> List[PlaylistType]:
+        pass
+
+    @abc.abstractmethod
+    async def get_playlist_names(self) -> List[str]:
+        pass
+
+    @abc.abstractmethod
+    async def get_playlist_catalog(self) -> PlaylistCatalog:
+        pass
+
+    @abc.abstractmethod
+    async def get_playlist_tracks(self, name: str) -> List[Track]:
+        pass
+
+    @abc.abstractmethod
+    async def aclose(self) -> None:
+        pass
+
+    async def __aenter__(self: AsyncClientType) -> AsyncClientType:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
 
 class BaseClient(IPlatformClient[PlaylistType], abc.ABC):
-    def __init__(self, authenticator: BaseAuthenticator):
+    def __init__(
+        self,
+        authenticator: BaseAuthenticator,
+        cache: Optional[PlaylistCache] = None,
+        checkpoints: Optional[PaginationCheckpoints] = None,
+        listings: Optional[TTLCache[Tuple[Any, ...], List[Any]]] = None,
+    ):
         self._authenticator = authenticator
+        self._cache = cache
+        self._checkpoints = checkpoints
+        self._catalog: Optional[PlaylistCatalog] = None
+        self._catalog_stale = False
+        self._listings: TTLCache[Tuple[Any, ...], List[Any]] = listings if listings is not None else TTLCache()
 
     @property
     def token(self) -> str:
         return self._authenticator.token
 
+    def get_playlist_names(self) -> List[str]:
+        return self.get_playlist_catalog().names
+
+    def get_playlist_catalog(self) -> PlaylistCatalog:
+        if self._catalog is None:
+            self._catalog = PlaylistCatalog(self._playlist_entry(p) for p in self.get_playlist_list())
+        elif self._catalog_stale:
+            self.refresh_playlist_catalog()
+        return self._catalog
+
+    def refresh_playlist_catalog(self, forget_cached: bool = False) -> Set[str]:
+        """Fetch the playlist list again, tracks are refetched only for playlists which changed since.
+
+        With <forget_cached> tracks of every playlist are dropped from the memo and the disk cache as well.
+        """
+        if forget_cached:
+            self._invalidate_cache()
+        self._catalog_stale = False
+        catalog = self.get_playlist_catalog()
+        self._listings.invalidate(lambda key: key[0] == self._listing())
+        changed = catalog.update(self._playlist_entry(p) for p in self.get_playlist_list())
+        stale = {self._listing(playlist_id) for playlist_id in changed}
+        self._listings.invalidate(lambda key: key[0] in stale)
+        return changed
 
-class Platform(str, enum.Enum):
-    DEEZER = 'DEEZER'
-    SPOTIFY = 'SPOTIFY'
+    def get_playlist_tracks(self, name: str) -> List[Track]:
+        return self.get_playlist_tracks_by_id(self._playlist_id_by_name(name))
+
+    def iter_playlist_tracks(self, playlist_id: str) -> Iterator[Track]:
+        """Tracks of a playlist page by page as responses arrive, only one page of them is kept in memory.
+
+        Tracks found in the listing memo or the disk cache are served from there, streamed tracks are not cached.
+        """
+        version = self._playlist_version(playlist_id) if self._cache or self._checkpoints else None
+        tracks = self._cache.get(self.platform, playlist_id, version) if self._cache and version else None
+        if tracks is not None:
+            yield from tracks
+            return
+
+        for page in self._iter_playlist_pages(playlist_id, version):
+            yield from page
+
+    def _playlist_id_by_name(self, name: str) -> str:
+        return self.get_playlist_catalog().by_name(name).id
+
+    def _playlist_version(self, playlist_id: str) -> Optional[str]:
+        """Value which changes with every edit of the playlist, None if the platform has no such thing."""
+        catalog = self.get_playlist_catalog()
+        return catalog.by_id(playlist_id).version if playlist_id in catalog else None
+
+    def _invalidate_cache(self, playlist_id: Optional[str] = None) -> None:
+        """Forget tracks of one playlist after a write or of all of them, the catalog is refreshed on next use."""
+        stale = {self._listing(), self._listing(playlist_id)}
+        self._listings.invalidate(lambda key: playlist_id is None or key[0] in stale)
+        if self._cache is not None:
+            self._cache.invalidate(self.platform, playlist_id)
+        self._catalog_stale = True
 
+    @abc.abstractmethod
+    def _playlist_entry(self, playlist: PlaylistType) -> PlaylistEntry:
+        pass
 
-class Track(BaseModel):
-    artists: List[str]
-    album: str
-    title: str
-    added_at: datetime
-    source: Platform
-    external_id: str
+    @abc.abstractmethod
+    def _iter_playlist_pages(self, playlist_id: str, version: Optional[str] = None) -> Iterator[List[Track]]:
+        pass
 
-    def __str__(self) -> str:
-        return f'{self._to_brief_str()} [added: {self.added_at}]'
+    @abc.abstractmethod
+    def _listing(self, playlist_id: Optional[str] = None) -> str:
+        """Memo key of the playlist list or of tracks of one playlist."""
+
+    def _cached_tracks(self, playlist_id: str, fetch: Callable[[Optional[str]], List[Track]]) -> List[Track]:
+        """Tracks from the disk cache if the playlist is unchanged, <fetch> gets the version to checkpoint with."""
+        if self._cache is None and self._checkpoints is None:
+            return fetch(None)
+
+        version = self._playlist_version(playlist_id)
+        if self._cache is None or not version:
+            return fetch(version)
+
+        tracks = self._cache.get(self.platform, playlist_id, version)
+        if tracks is None:
+            tracks = fetch(version)
+            self._cache.put(self.platform, playlist_id, version, tracks)
+        return tracks
+
+    def _checkpoint(self, listing: str, version: Optional[str] = None) -> Checkpoint:
+        if self._checkpoints is None:
+            return Checkpoint()
+        return self._checkpoints.open(self.platform, listing, version)
+
+
+class BaseAsyncClient(IAsyncPlatformClient[PlaylistType], abc.ABC):
+    def __init__(
+        self, authenticator: BaseAuthenticator, listings: Optional[TTLCache[Tuple[Any, ...], List[Any]]] = None
+    ):
+        self._authenticator = authenticator
+        self._transport: Optional[AsyncMeteredTransport] = None
+        self._catalog = PlaylistCatalog()
+        self._listings: TTLCache[Tuple[Any, ...], List[Any]] = listings if listings is not None else TTLCache()
 
-    def _to_brief_str(self) -> str:
-        artists = '; '.join(self.artists)
-        return f'{artists} - {self.title} ({self.album})'
+    @property
+    def token(self) -> str:
+        return self._authenticator.token
 
-    def to_brief_str(self, max_len: int) -> str:
-        original = str(self)
-        if len(original) < max_len:
-            return original
+    async def get_playlist_names(self) -> List[str]:
+        return (await self.get_playlist_catalog()).names
 
-        brief_str = self._to_brief_str()
-        if len(brief_str) > max_len:
-            return brief_str[: max_len - 3] + '...'
+    async def get_playlist_catalog(self) -> PlaylistCatalog:
+        """Catalog of the current playlist list, the list is memoized by the client."""
+        self._catalog.update(self._playlist_entry(p) for p in await self.get_playlist_list())
+        return self._catalog
 
-        return brief_str
+    async def _playlist_id_by_name(self, name: str) -> str:
+        return (await self.get_playlist_catalog()).by_name(name).id
 
-    def __hash__(self) -> int:
-        return hash(f'{self.source}-{self.external_id}')
+    @abc.abstractmethod
+    def _playlist_entry(self, playlist: PlaylistType) -> PlaylistEntry:
+        pass
 
-    @classmethod
-    def from_deezer(cls, track: DeezerTrack) -> Track:
-        return cls(
-            artists=[track.artist.name],
-            album=track.album.title,
-            title=track.title,
-            added_at=datetime.fromtimestamp(track.time_add),
-            source=Platform.DEEZER,
-            external_id=str(track.id),
+    @property
+    def wire_stats(self) -> WireStats:
+        """Traffic of the own connection pool, a passed in one is not metered."""
+        return self._transport.stats if self._transport is not None else WireStats()
+
+    def _own_http(self, settings: HttpSettings, limiter: RateLimiter) -> httpx.AsyncClient:
+        """Connection pool of the client itself, its requests are metered and go through <limiter>."""
+        self._transport = create_async_transport(settings)
+        return httpx.AsyncClient(
+            transport=AsyncRateLimitedTransport(limiter, self._transport),
+            headers=settings.headers,
+            timeout=settings.timeout,
         )
 
-    @classmethod
-    def from_spotify(cls, track: SpotifyTrack) -> Track:
-        return cls(
-            artists=[a.name for a in track.track.artists],
-            album=track.track.album.name,
-            title=track.track.name,
-            added_at=track.added_at,
-            source=Platform.SPOTIFY,
-            external_id=track.track.uri,
-        )
+
+async def gather_bounded(pages: Iterator[Awaitable[ResultType]], concurrency: int) -> List[ResultType]:
+    """Results of <pages> in their order, at most <concurrency> of them are awaited at once."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(page: Awaitable[ResultType]) -> ResultType:
+        async with semaphore:
+            return await page
+
+    return list(await asyncio.gather(*(bounded(page) for page in pages)))
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import logging
+import os
+import pathlib
+import re
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from playlist_organizer.client.base import Platform, Track
+
+logger = logging.getLogger(__name__)
+CACHE_PATH = pathlib.Path(__file__).parent / 'playlist_cache'
+MAX_ENTRIES = 1000
+MAX_BYTES = 256 * 1024 * 1024
+_UNSAFE = re.compile(r'[^\w-]')
+
+
+class CacheEntry(BaseModel):
+    version: str
+    tracks: List[Track]
+
+
+class IsrcEntry(BaseModel):
+    isrc: Dict[str, str]
+
+
+class PlaylistCache:
+    """Tracks of playlists kept on disk between runs, one json file per playlist.
+
+    An entry is valid for a single version of its playlist (Spotify snapshot_id, Deezer checksum).
+    Least recently used entries are evicted once there are more than <max_entries> of them
+    or they take more than <max_bytes> together.
+    ISRCs of tracks fetched one by one are kept per platform aside from the entries, they never go stale.
+    """
+
+    def __init__(self, path: pathlib.Path = CACHE_PATH, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self._path = path
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+
+    def get(self, platform: Platform, playlist_id: str, version: str) -> Optional[List[Track]]:
+        file = self._file(platform, playlist_id)
+        if not file.exists():
+            return None
+
+        try:
+            entry = CacheEntry.parse_file(file)
+        except (ValueError, ValidationError):
+            logger.warning('Broken playlist cache entry %s, dropping it', file)
+            file.unlink(missing_ok=True)
+            return None
+
+        if entry.version != version:
+            logger.debug('Playlist %s %s changed, cached version is stale', platform.value, playlist_id)
+            return None
+
+        os.utime(file)
+        return entry.tracks
+
+    def put(self, platform: Platform, playlist_id: str, version: str, tracks: List[Track]) -> None:
+        self._path.mkdir(parents=True, exist_ok=True)
+        file = self._file(platform, playlist_id)
+        tmp_file = file.with_suffix('.tmp')
+        tmp_file.write_text(CacheEntry(version=version, tracks=tracks).json(), encoding='utf-8')
+        tmp_file.replace(file)
+        self._evict()
+
+    def get_isrc(self, platform: Platform) -> Dict[str, str]:
+        """ISRCs by track id of the platform, empty if none were stored yet."""
+        file = self._isrc_file(platform)
+        if not file.exists():
+            return {}
+
+        try:
+            return IsrcEntry.parse_file(file).isrc
+        except (ValueError, ValidationError):
+            logger.warning('Broken ISRC cache %s, dropping it', file)
+            file.unlink(missing_ok=True)
+            return {}
+
+    def put_isrc(self, platform: Platform, isrc: Dict[str, str]) -> None:
+        file = self._isrc_file(platform)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = file.with_suffix('.tmp')
+        tmp_file.write_text(IsrcEntry(isrc=isrc).json(), encoding='utf-8')
+        tmp_file.replace(file)
+
+    def invalidate(self, platform: Optional[Platform] = None, playlist_id: Optional[str] = None) -> int:
+        """Drop entries of one playlist, of one platform or all of them, returns the number of dropped entries."""
+        if playlist_id is not None and platform is not None:
+            files = [self._file(platform, playlist_id)]
+        else:
+            prefix = f'{platform.value.lower()}-' if platform else ''
+            files = [f for f in self._entries() if f.name.startswith(prefix)]
+
+        dropped = 0
+        for file in files:
+            if file.exists():
+                file.unlink()
+                dropped += 1
+        logger.info('Dropped %s cached playlists', dropped)
+        return dropped
+
+    def _entries(self) -> List[pathlib.Path]:
+        return list(self._path.glob('*.json')) if self._path.exists() else []
+
+    def _file(self, platform: Platform, playlist_id: str) -> pathlib.Path:
+        safe_id = _UNSAFE.sub('_', playlist_id)
+        return self._path / f'{platform.value.lower()}-{safe_id}.json'
+
+    def _isrc_file(self, platform: Platform) -> pathlib.Path:
+        return self._path / 'isrc' / f'{platform.value.lower()}.json'
+
+    def _evict(self) -> None:
+        entries = sorted(((f.stat(), f) for f in self._entries()), key=lambda e: e[0].st_mtime, reverse=True)
+        total = 0
+        for count, (stat, file) in enumerate(entries, start=1):
+            total += stat.st_size
+            if count > self._max_entries or total > self._max_bytes:
+                logger.debug('Evicting cached playlist %s', file.name)
+                file.unlink(missing_ok=True)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PlaylistEntry:
+    id: str
+    name: str
+    version: Optional[str] = None
+
+
+class PlaylistCatalog:
+    """Playlists of one account in listing order, indexed by id and by name.
+
+    Names are not unique on either platform, so lookups by an ambiguous name fail and such playlists
+    are labeled with their ids.
+    """
+
+    def __init__(self, entries: Iterable[PlaylistEntry] = ()) -> None:
+        self._entries: List[PlaylistEntry] = []
+        self._by_id: Dict[str, PlaylistEntry] = {}
+        self._ids_by_name: Dict[str, List[str]] = defaultdict(list)
+        self.update(entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, playlist_id: object) -> bool:
+        return playlist_id in self._by_id
+
+    @property
+    def entries(self) -> List[PlaylistEntry]:
+        return list(self._entries)
+
+    @property
+    def names(self) -> List[str]:
+        return [e.name for e in self._entries]
+
+    def by_id(self, playlist_id: str) -> PlaylistEntry:
+        try:
+            return self._by_id[playlist_id]
+        except KeyError:
+            raise ValueError(f'Playlist with id "{playlist_id}" was not found') from None
+
+    def by_name(self, name: str) -> PlaylistEntry:
+        ids = self._ids_by_name.get(name)
+        if not ids:
+            raise ValueError(f'Playlist "{name}" was not found')
+        if len(ids) > 1:
+            raise ValueError(f'There are {len(ids)} playlists named "{name}", address them by id')
+        return self._by_id[ids[0]]
+
+    def label(self, entry: PlaylistEntry) -> str:
+        """Name of the playlist, with its id if the name is ambiguous."""
+        return entry.name if len(self._ids_by_name.get(entry.name, ())) <= 1 else f'{entry.name} [{entry.id}]'
+
+    def update(self, entries: Iterable[PlaylistEntry]) -> Set[str]:
+        """Replace the content with a fresh listing, returns ids of added, changed and removed playlists."""
+        self._entries = list(entries)
+        fresh = {e.id: e for e in self._entries}
+        changed = {i for i, e in fresh.items() if self._by_id.get(i) != e} | (self._by_id.keys() - fresh.keys())
+
+        self._by_id = fresh
+        self._ids_by_name = defaultdict(list)
+        for entry in self._entries:
+            self._ids_by_name[entry.name].append(entry.id)
+
+        if changed:
+            logger.debug('Playlist catalog: %s of %s playlists changed', len(changed), len(fresh))
+        return changed
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import pathlib
+import shutil
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from playlist_organizer.client.track import Platform
+
+logger = logging.getLogger(__name__)
+CHECKPOINTS_PATH = pathlib.Path(__file__).parent / 'checkpoints'
+MAX_AGE = timedelta(hours=12)
+
+
+def _digest(key: str) -> str:
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+class Checkpoint:
+    """Raw pages of one listing fetched so far, every page is written as soon as it arrives.
+
+    Checkpoint without a path keeps nothing, so callers do not need to check whether checkpoints are on.
+    """
+
+    def __init__(self, path: Optional[pathlib.Path] = None) -> None:
+        self._path = path
+
+    @property
+    def enabled(self) -> bool:
+        return self._path is not None
+
+    def get(self, page_key: str) -> Optional[Any]:
+        if self._path is None:
+            return None
+        file = self._path / f'{_digest(page_key)}.json'
+        if not file.exists():
+            return None
+        try:
+            return json.loads(file.read_text(encoding='utf-8'))
+        except ValueError:
+            logger.warning('Broken checkpoint page %s, fetching it again', file)
+            return None
+
+    def add(self, page_key: str, raw: Any) -> None:
+        if self._path is None:
+            return
+        file = self._path / f'{_digest(page_key)}.json'
+        tmp_file = file.with_suffix('.tmp')
+        tmp_file.write_text(json.dumps(raw, ensure_ascii=False), encoding='utf-8')
+        tmp_file.replace(file)
+
+    def done(self) -> None:
+        """The listing is complete, its pages are not needed anymore."""
+        if self._path is not None:
+            shutil.rmtree(self._path, ignore_errors=True)
+
+
+class PaginationCheckpoints:
+    """Progress of paginated fetches kept on disk, so an interrupted fetch resumes where it stopped.
+
+    A checkpoint belongs to one version of a listing (Spotify snapshot_id, Deezer checksum), listings without
+    versions are trusted for <max_age> only.
+    """
+
+    def __init__(self, path: pathlib.Path = CHECKPOINTS_PATH, max_age: timedelta = MAX_AGE) -> None:
+        self._path = path
+        self._max_age = max_age
+
+    def open(self, platform: Platform, listing: str, version: Optional[str] = None) -> Checkpoint:
+        path = self._path / f'{platform.value.lower()}-{_digest(listing)}'
+        meta_file = path / 'meta.json'
+
+        if meta_file.exists() and not self._is_valid(meta_file, version):
+            shutil.rmtree(path, ignore_errors=True)
+
+        if not meta_file.exists():
+            path.mkdir(parents=True, exist_ok=True)
+            meta = {'listing': listing, 'version': version, 'started_at': datetime.now().isoformat()}
+            meta_file.write_text(json.dumps(meta), encoding='utf-8')
+        else:
+            logger.info('Resuming %s %s from %s pages', platform.value, listing, len(list(path.glob('*.json'))) - 1)
+
+        return Checkpoint(path)
+
+    def _is_valid(self, meta_file: pathlib.Path, version: Optional[str]) -> bool:
+        try:
+            meta = json.loads(meta_file.read_text(encoding='utf-8'))
+            started_at = datetime.fromisoformat(meta['started_at'])
+        except (ValueError, KeyError, TypeError):
+            return False
+        return meta.get('version') == version and datetime.now() - started_at < self._max_age
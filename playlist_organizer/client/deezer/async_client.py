@@ -0,0 +1,112 @@
+import logging
+from typing import Any, Dict, List, Optional, Type, TypeVar, cast
+
+import httpx
+
+from playlist_organizer.client.auth.deezer import DeezerAuthenticator
+from playlist_organizer.client.base import BaseAsyncClient, Track, gather_bounded
+from playlist_organizer.client.catalog import PlaylistEntry
+from playlist_organizer.client.deezer.client import is_quota_exceeded
+from playlist_organizer.client.deezer.entities import (
+    FastPlaylistTracks,
+    PaginatedResponse,
+    Playlist,
+    PlaylistsResponse,
+    PlaylistTracks,
+)
+from playlist_organizer.client.deezer.settings import DeezerSettings
+from playlist_organizer.client.rate_limit import RateLimiter
+from playlist_organizer.client.ttl_cache import TTLCache
+
+PaginatedResponseType = TypeVar('PaginatedResponseType', bound=PaginatedResponse)
+logger = logging.getLogger(__name__)
+
+
+class AsyncDeezerClient(BaseAsyncClient[Playlist]):
+    """DeezerClient counterpart on one long-lived httpx.AsyncClient, so pages reuse kept-alive connections.
+
+    The client owns the connection pool unless <http> is passed in, close it with `aclose` or use
+    the client as an async context manager. Own pool sends requests through the Deezer rate limiter,
+    a passed in one brings its own transport.
+    """
+
+    def __init__(
+        self,
+        settings: DeezerSettings,
+        authenticator: DeezerAuthenticator,
+        http: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        super().__init__(authenticator, TTLCache(settings.listing_cache_size, settings.listing_cache_ttl))
+        self._settings = settings
+        self._owns_http = http is None
+        self._http = http or self._own_http(settings, RateLimiter(settings.rate_limit, throttled=is_quota_exceeded))
+        self._user_info: Optional[Dict[str, Any]] = None
+
+    async def aclose(self) -> None:
+        if self._owns_http:
+            await self._http.aclose()
+
+    async def user_info(self) -> Dict[str, Any]:
+        if self._user_info is None:
+            resp = await self._http.get(self._settings.user_info_url, params={'access_token': self.token})
+            resp.raise_for_status()
+            self._user_info = resp.json()
+        return self._user_info
+
+    async def get_playlist_list(self) -> List[Playlist]:
+        playlists = await self._fetch_paginated(self._settings.playlists_url, limit=50, model_cls=PlaylistsResponse)
+        return cast(List[Playlist], playlists)
+
+    def _playlist_entry(self, playlist: Playlist) -> PlaylistEntry:
+        return PlaylistEntry(id=playlist.id, name=playlist.title, version=playlist.checksum)
+
+    async def get_playlist_tracks(self, name: str) -> List[Track]:
+        playlist_id = await self._playlist_id_by_name(name)
+
+        if self._settings.strict_parsing:
+            tracks = await self._fetch_paginated(
+                url=self._settings.playlists_tracks_url.format(playlist_id), limit=200, model_cls=PlaylistTracks
+            )
+            return [Track.from_deezer(t) for t in tracks]
+
+        return await self._fetch_paginated(
+            url=self._settings.playlists_tracks_url.format(playlist_id), limit=200, model_cls=FastPlaylistTracks
+        )
+
+    async def _fetch_paginated(self, url: str, limit: int, model_cls: Type[PaginatedResponseType]) -> List[Any]:
+        cached = self._listings.get((url, limit))
+        if cached is not None:
+            return cached
+
+        params = {'access_token': self.token, 'limit': limit}
+        first = await self._fetch_page(url, params, model_cls)
+        if first.total is None:
+            rest = await self._follow_next(first, params, model_cls)
+        else:
+            rest = await gather_bounded(
+                (self._fetch_page(url, {**params, 'index': i}, model_cls) for i in first.remaining_indices(limit)),
+                self._settings.page_concurrency,
+            )
+        acc = [item for page in [first, *rest] for item in page.data]
+        logger.debug('Fetched %s items from %s', len(acc), url)
+
+        self._listings.put((url, limit), acc)
+        return acc
+
+    async def _follow_next(
+        self, first: PaginatedResponseType, params: Dict[str, Any], model_cls: Type[PaginatedResponseType]
+    ) -> List[PaginatedResponseType]:
+        """Pages after <first> one by one by their `next` links, for responses without a total."""
+        pages = []
+        next_url = first.next
+        while next_url:
+            pages.append(await self._fetch_page(next_url, params, model_cls))
+            next_url = pages[-1].next
+        return pages
+
+    async def _fetch_page(
+        self, url: str, params: Dict[str, Any], model_cls: Type[PaginatedResponseType]
+    ) -> PaginatedResponseType:
+        resp = await self._http.get(url, params=params)
+        resp.raise_for_status()
+        return model_cls.parse_obj(resp.json())
@@ -1,24 +1,68 @@
-from functools import cache, cached_property
-from typing import Any, Dict, List, Type, TypeVar, cast
+import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cached_property, partial
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Type, TypeVar, cast
 
 import httpx
+from pydantic import ValidationError
 
 from playlist_organizer.client.auth.deezer import DeezerAuthenticator
-from playlist_organizer.client.base import BaseClient, Track
-from playlist_organizer.client.deezer.entities import PaginatedResponse, Playlist, PlaylistsResponse, PlaylistTracks
+from playlist_organizer.client.base import BaseClient, Platform, Track
+from playlist_organizer.client.cache import PlaylistCache
+from playlist_organizer.client.catalog import PlaylistEntry
+from playlist_organizer.client.checkpoint import Checkpoint, PaginationCheckpoints
+from playlist_organizer.client.deezer.entities import (
+    FastPlaylistTracks,
+    PaginatedResponse,
+    Playlist,
+    PlaylistsResponse,
+    PlaylistTracks,
+    TrackInfo,
+)
 from playlist_organizer.client.deezer.settings import DeezerSettings
+from playlist_organizer.client.rate_limit import RateLimitedTransport, RateLimiter, is_throttled
+from playlist_organizer.client.transport import MeteredTransport, WireStats, create_transport
+from playlist_organizer.client.ttl_cache import TTLCache
 
 PaginatedResponseType = TypeVar('PaginatedResponseType', bound=PaginatedResponse)
+ResultType = TypeVar('ResultType')
+QUOTA_EXCEEDED_CODE = 4
+TRACKS_PAGE_SIZE = 200
+logger = logging.getLogger(__name__)
 
 
 class DeezerClient(BaseClient[Playlist]):
-    def __init__(self, settings: DeezerSettings, authenticator: DeezerAuthenticator) -> None:
+    platform = Platform.DEEZER
+
+    def __init__(  # pylint: disable=R0913
+        self,
+        settings: DeezerSettings,
+        authenticator: DeezerAuthenticator,
+        cache: Optional[PlaylistCache] = None,
+        checkpoints: Optional[PaginationCheckpoints] = None,
+        transport: Optional[MeteredTransport] = None,
+    ) -> None:
         self._settings = settings
-        super().__init__(authenticator)
+        self._transport = transport or create_transport(settings)
+        self._http = httpx.Client(
+            transport=RateLimitedTransport(
+                RateLimiter(settings.rate_limit, throttled=is_quota_exceeded), self._transport
+            ),
+            headers=settings.headers,
+            timeout=settings.timeout,
+        )
+        super().__init__(
+            authenticator, cache, checkpoints, TTLCache(settings.listing_cache_size, settings.listing_cache_ttl)
+        )
+
+    @property
+    def wire_stats(self) -> WireStats:
+        return self._transport.stats
 
     @cached_property
     def user_info(self) -> Dict[str, Any]:
-        resp = httpx.get(
+        resp = self._http.get(
             self._settings.user_info_url,
             params={'access_token': self._authenticator.token},
         )
@@ -26,42 +70,180 @@ class DeezerClient(BaseClient[Playlist]):
         return resp.json()
 
     def get_playlist_list(self) -> List[Playlist]:
-        playlists = self._fetch_paginated(self._settings.playlists_url, limit=50, model_cls=PlaylistsResponse)
+        playlists = self._fetch_paginated(self._listing(), limit=50, model_cls=PlaylistsResponse)
         return cast(List[Playlist], playlists)
 
-    def get_playlist_names(self) -> List[str]:
-        return [p.title for p in self.get_playlist_list()]
+    def get_playlist_tracks_by_id(self, playlist_id: str) -> List[Track]:
+        return self._cached_tracks(playlist_id, lambda version: self._fetch_playlist_tracks(playlist_id, version))
 
-    def _playlist_id_by_name(self, name: str) -> str:
-        for playlist in self.get_playlist_list():
-            if playlist.title == name:
-                return playlist.id
+    def _playlist_entry(self, playlist: Playlist) -> PlaylistEntry:
+        return PlaylistEntry(id=playlist.id, name=playlist.title, version=playlist.checksum)
 
-        raise ValueError(f'Playlist "{name}" was not found')
-
-    def get_playlist_tracks(self, name: str) -> List[Track]:
-        playlist_id = self._playlist_id_by_name(name)
+    def _listing(self, playlist_id: Optional[str] = None) -> str:
+        if playlist_id is None:
+            return self._settings.playlists_url
+        return self._settings.playlists_tracks_url.format(playlist_id)
 
+    def _fetch_playlist_tracks(self, playlist_id: str, version: Optional[str] = None) -> List[Track]:
         tracks = self._fetch_paginated(
-            url=self._settings.playlists_tracks_url.format(playlist_id),
-            limit=200,
-            model_cls=PlaylistTracks,
+            url=self._listing(playlist_id),
+            limit=TRACKS_PAGE_SIZE,
+            model_cls=self._tracks_page_cls,
+            version=version,
         )
-        return [Track.from_deezer(t) for t in tracks]
+        return self._to_tracks(tracks)
 
-    def _fetch_paginated(self, url: str, limit: int, model_cls: Type[PaginatedResponseType]) -> List[Any]:
-        return _fetch_paginated(url, limit, model_cls, self._authenticator.token)
+    def _iter_playlist_pages(self, playlist_id: str, version: Optional[str] = None) -> Iterator[List[Track]]:
+        url = self._listing(playlist_id)
+        cached = self._listings.get((url, TRACKS_PAGE_SIZE))
+        if cached is not None:
+            yield self._to_tracks(cached)
+            return
+        for items in self._iter_pages(url, TRACKS_PAGE_SIZE, self._tracks_page_cls, version):
+            yield self._to_tracks(items)
 
+    @property
+    def _tracks_page_cls(self) -> Type[PaginatedResponse]:
+        return PlaylistTracks if self._settings.strict_parsing else FastPlaylistTracks
 
-@cache
-def _fetch_paginated(url: str, limit: int, model_cls: Type[PaginatedResponseType], token: str) -> List[Any]:
-    acc = []
-    while True:
-        if not url:
-            break
-        resp = httpx.get(url, params={'access_token': token, 'limit': limit})
-        resp.raise_for_status()
-        page = model_cls.parse_obj(resp.json())
-        acc.extend(page.data)
-        url = page.next  # type: ignore
-    return acc
+    def _to_tracks(self, items: List[Any]) -> List[Track]:
+        """Strictly parsed pages hold Deezer entities, fast ones are decoded into Tracks already."""
+        if self._settings.strict_parsing:
+            return [Track.from_deezer(t) for t in items]
+        return items
+
+    def with_isrc(self, tracks: List[Track]) -> List[Track]:
+        """Return <tracks> with ISRC, playlist listings lack it, so it is fetched per track concurrently.
+
+        Fetched ISRCs are kept in the disk cache, if there is one, so every track is looked up once.
+        """
+        missing = list({t.external_id for t in tracks if not t.isrc and t.external_id not in self._isrc})
+        if missing:
+            token = self._authenticator.token
+            with ThreadPoolExecutor(max_workers=self._settings.isrc_concurrency) as pool:
+                fetched = dict(zip(missing, pool.map(lambda i: self._fetch_isrc(i, token), missing)))
+            self._isrc.update({track_id: isrc for track_id, isrc in fetched.items() if isrc})
+            logger.debug('Fetched ISRC for %s Deezer tracks', len(fetched))
+            if self._cache is not None:
+                self._cache.put_isrc(self.platform, self._isrc)
+
+        return [
+            t if t.isrc or t.external_id not in self._isrc else t.copy(update={'isrc': self._isrc[t.external_id]})
+            for t in tracks
+        ]
+
+    @cached_property
+    def _isrc(self) -> Dict[str, str]:
+        return self._cache.get_isrc(self.platform) if self._cache is not None else {}
+
+    def _fetch_isrc(self, track_id: str, token: str) -> Optional[str]:
+        try:
+            resp = self._http.get(self._settings.track_url.format(track_id), params={'access_token': token})
+            resp.raise_for_status()
+            return TrackInfo.parse_obj(resp.json()).isrc
+        except (httpx.HTTPError, ValueError, ValidationError):
+            logger.warning('Could not fetch ISRC of Deezer track %s', track_id)
+            return None
+
+    def _fetch_paginated(
+        self, url: str, limit: int, model_cls: Type[PaginatedResponseType], version: Optional[str] = None
+    ) -> List[Any]:
+        return self._listings.get_or_fetch(
+            (url, limit), lambda: [i for page in self._iter_pages(url, limit, model_cls, version) for i in page]
+        )
+
+    def _iter_pages(
+        self, url: str, limit: int, model_cls: Type[PaginatedResponseType], version: Optional[str] = None
+    ) -> Iterator[List[Any]]:
+        checkpoint = self._checkpoint(url, version)
+        params = {'access_token': self._authenticator.token, 'limit': limit}
+        yield from _iter_pages(self._http, url, params, model_cls, self._settings.page_concurrency, checkpoint)
+        checkpoint.done()
+        logger.debug('Fetched %s, Deezer traffic so far: %s', url, self.wire_stats)
+
+
+def is_quota_exceeded(response: httpx.Response) -> bool:
+    """Deezer reports exceeded quota as an error object in a successful response.
+
+    Successful responses without an error key are not decoded here, so a page is parsed once, by its caller.
+    """
+    if is_throttled(response):
+        return True
+    if response.status_code == httpx.codes.OK and b'"error"' not in response.content:
+        return False
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    error = body.get('error') if isinstance(body, dict) else None
+    return isinstance(error, dict) and error.get('code') == QUOTA_EXCEEDED_CODE
+
+
+def _iter_pages(  # pylint: disable=R0913
+    http: httpx.Client,
+    url: str,
+    params: Dict[str, Any],
+    model_cls: Type[PaginatedResponseType],
+    concurrency: int,
+    checkpoint: Checkpoint,
+) -> Iterator[List[Any]]:
+    """Items of a listing page by page: the first page tells the total, the rest are requested by offset concurrently.
+
+    At most <concurrency> pages are fetched ahead of the consumer, pages are yielded in listing order.
+    Responses without a total fall back to following `next` links one by one.
+    Pages already in <checkpoint> are not requested again.
+    """
+    first = _fetch_page(http, url, params, model_cls, checkpoint)
+    yield first.data
+
+    if first.total is None:
+        yield from _follow_next(first, lambda next_url: _fetch_page(http, next_url, params, model_cls, checkpoint))
+        return
+
+    fetches = (
+        partial(_fetch_page, http, url, {**params, 'index': index}, model_cls, checkpoint)
+        for index in first.remaining_indices(params['limit'])
+    )
+    for page in _run_ahead(fetches, concurrency):
+        yield page.data
+
+
+def _follow_next(first: PaginatedResponseType, fetch: Callable[[str], PaginatedResponseType]) -> Iterator[List[Any]]:
+    """Items of pages after <first> one by one by their `next` links, for responses without a total."""
+    next_url = first.next
+    while next_url:
+        page = fetch(next_url)
+        yield page.data
+        next_url = page.next
+
+
+def _run_ahead(fetches: Iterable[Callable[[], ResultType]], ahead: int) -> Iterator[ResultType]:
+    """Results of <fetches> in their order, at most <ahead> of them run before their result is taken."""
+    pending: Deque[Future[ResultType]] = deque()
+    with ThreadPoolExecutor(max_workers=ahead) as pool:
+        for fetch in fetches:
+            pending.append(pool.submit(fetch))
+            if len(pending) > ahead:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _fetch_page(
+    http: httpx.Client,
+    url: str,
+    params: Dict[str, Any],
+    model_cls: Type[PaginatedResponseType],
+    checkpoint: Checkpoint,
+) -> PaginatedResponseType:
+    page_key = str(httpx.URL(url).copy_merge_params({k: v for k, v in params.items() if k != 'access_token'}))
+    raw = checkpoint.get(page_key)
+    if raw is not None:
+        return model_cls.parse_obj(raw)
+
+    resp = http.get(url, params=params)
+    resp.raise_for_status()
+    raw = resp.json()
+    page = model_cls.parse_obj(raw)
+    checkpoint.add(page_key, raw)
+    return page
@@ -1,19 +1,36 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, List, Optional
+from urllib.parse import parse_qs, urlsplit
 
 from pydantic import BaseModel
 
+from playlist_organizer.client.track import Track as ClientTrack
+
 
 class PaginatedResponse(BaseModel):
     next: Optional[str] = None
+    total: Optional[int] = None
 
     if TYPE_CHECKING:
         data: List[Any]
 
+    def remaining_indices(self, limit: int) -> List[int]:
+        """Offsets of the pages after this first one.
+
+        The step is the index of the `next` page, so it follows the limit the API actually applied: pages may
+        come back shorter when unavailable tracks are left out. Requested <limit> is used if `next` has no index.
+        """
+        if self.total is None or self.next is None:
+            return []
+        index = parse_qs(urlsplit(self.next).query).get('index')
+        step = int(index[0]) if index else limit
+        return list(range(step, self.total, step)) if step > 0 else []
+
 
 class Playlist(BaseModel):
     id: str
     title: str
+    checksum: Optional[str] = None
 
 
 class PlaylistsResponse(PaginatedResponse):
@@ -42,6 +59,7 @@ class Track(BaseModel):
     time_add: int
     album: Album
     artist: Artist
+    isrc: Optional[str] = None
 
     def __str__(self) -> str:
         return f'{self.artist} - {self.title} ({self.album}) [added: {datetime.fromtimestamp(self.time_add)}]'
@@ -49,3 +67,23 @@ class Track(BaseModel):
 
 class PlaylistTracks(PaginatedResponse):
     data: List[Track]
+
+
+class TrackInfo(BaseModel):
+    id: int
+    isrc: Optional[str] = None
+
+
+class FastPlaylistTracks(PaginatedResponse):
+    """Page of playlist tracks decoded right into client Tracks, nothing is validated."""
+
+    if TYPE_CHECKING:
+        data: List[ClientTrack]
+
+    @classmethod
+    def parse_obj(cls, obj: Any) -> 'FastPlaylistTracks':
+        try:
+            data = [ClientTrack.from_deezer_json(raw) for raw in obj['data']]
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError('Unexpected Deezer playlist tracks page, enable strict parsing to find out why') from e
+        return cls.construct(data=data, next=obj.get('next'), total=obj.get('total'))
@@ -1,12 +1,26 @@
-from pydantic import BaseSettings
+from playlist_organizer.client.transport import HttpSettings
 
 
-class DeezerSettings(BaseSettings):
+class DeezerSettings(HttpSettings):
     api_host: str = 'https://api.deezer.com'
 
     user_info_path: str = 'user/me'
     playlists_path: str = 'user/me/playlists'
     playlist_tracks_path: str = 'playlist/{}/tracks'
+    track_path: str = 'track/{}'
+
+    # validate every response field, otherwise playlist tracks are decoded without validation
+    strict_parsing: bool = False
+
+    isrc_concurrency: int = 8
+    page_concurrency: int = 4
+
+    # Deezer allows 50 requests per 5 seconds
+    requests_per_second: float = 10.0
+    burst: int = 50
+
+    listing_cache_size: int = 256
+    listing_cache_ttl: float = 600.0
 
     @property
     def user_info_url(self) -> str:
@@ -20,5 +34,9 @@ class DeezerSettings(BaseSettings):
     def playlists_tracks_url(self) -> str:
         return f'{self.api_host}/{self.playlist_tracks_path}'
 
+    @property
+    def track_url(self) -> str:
+        return f'{self.api_host}/{self.track_path}'
+
     class Config:
         env_prefix = 'DEEZER_'
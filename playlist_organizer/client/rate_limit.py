@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+THROTTLED_STATUSES = (httpx.codes.TOO_MANY_REQUESTS, httpx.codes.SERVICE_UNAVAILABLE)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Sustained requests per second, burst size and retry policy of one API."""
+
+    rate: float
+    burst: int
+    max_retries: int = 5
+    backoff: float = 0.5
+    max_backoff: float = 60.0
+
+
+def is_throttled(response: httpx.Response) -> bool:
+    return response.status_code in THROTTLED_STATUSES
+
+
+class RateLimiter:
+    """Token bucket shared by every request to one platform, with retries of throttled responses.
+
+    Tokens are reserved ahead, so the bucket may go below zero and every caller waits for its own turn,
+    a throttled response pauses the whole bucket for Retry-After or a jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        limit: RateLimit,
+        throttled: Callable[[httpx.Response], bool] = is_throttled,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.limit = limit
+        self.throttled = throttled
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(limit.burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def reserve(self) -> float:
+        """Take a token, returns how many seconds to wait before sending the request."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.limit.burst, self._tokens + (now - self._updated) * self.limit.rate) - 1
+            self._updated = now
+            return max(0.0, -self._tokens / self.limit.rate, self._paused_until - now)
+
+    def retry_delay(self, response: httpx.Response, attempt: int) -> Optional[float]:
+        """Seconds to pause before retrying <response>, None if it should be returned as is."""
+        if attempt >= self.limit.max_retries or not self.throttled(response):
+            return None
+
+        delay = _retry_after(response)
+        if delay is None:
+            delay = random.uniform(0, min(self.limit.max_backoff, self.limit.backoff * 2**attempt))
+        logger.warning('Throttled by %s, retry %s in %.1f sec', response.request.url.host, attempt + 1, delay)
+
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + delay)
+        return delay
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    def __init__(self, limiter: RateLimiter, transport: Optional[httpx.BaseTransport] = None) -> None:
+        self._limiter = limiter
+        self._transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            time.sleep(self._limiter.reserve())
+            response = self._transport.handle_request(request)
+            response.request = request
+            response.read()
+            if self._limiter.retry_delay(response, attempt) is None:
+                return response
+            response.close()
+            attempt += 1
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, limiter: RateLimiter, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        self._limiter = limiter
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._limiter.reserve())
+            response = await self._transport.handle_async_request(request)
+            response.request = request
+            await response.aread()
+            if self._limiter.retry_delay(response, attempt) is None:
+                return response
+            await response.aclose()
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import functools
+import logging
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, List, Optional, Union
+
+import httpx
+import tekore as tk
+from tekore._model import SimplePlaylist
+
+from playlist_organizer.client.base import BaseAsyncClient, Track, gather_bounded
+from playlist_organizer.client.catalog import PlaylistEntry
+from playlist_organizer.client.rate_limit import RateLimiter
+from playlist_organizer.client.spotify.entities import PLAYLIST_ITEM_FIELDS, PlaylistItem, PlaylistItemsPage
+from playlist_organizer.client.ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    from tekore._model import PlaylistTrack, PrivateUser
+
+    from playlist_organizer.client.auth.spotify import SpotifyAuthenticator
+    from playlist_organizer.client.spotify.settings import SpotifySettings
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSpotifyClient(BaseAsyncClient[SimplePlaylist]):
+    """SpotifyClient counterpart on tekore's asynchronous mode, listings are fetched by concurrent offsets.
+
+    The client owns the connection pool unless <http> is passed in, close it with `aclose` or use
+    the client as an async context manager. Own pool sends requests through the Spotify rate limiter,
+    a passed in one brings its own transport.
+    """
+
+    def __init__(
+        self,
+        settings: SpotifySettings,
+        authenticator: SpotifyAuthenticator,
+        http: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        super().__init__(authenticator, TTLCache(settings.listing_cache_size, settings.listing_cache_ttl))
+        self._settings = settings
+        self._owns_http = http is None
+        self._sender = tk.AsyncSender(http or self._own_http(settings, RateLimiter(settings.rate_limit)))
+        self._client: Optional[tk.Spotify] = None
+        self._current_user: Optional[PrivateUser] = None
+
+    @property
+    def _spotify(self) -> tk.Spotify:
+        if self._client is None:
+            self._client = tk.Spotify(token=self.token, sender=self._sender, asynchronous=True)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._owns_http:
+            await self._sender.close()
+
+    async def current_user(self) -> PrivateUser:
+        if self._current_user is None:
+            self._current_user = await self._spotify.current_user()
+        return self._current_user
+
+    async def get_playlist_list(self) -> List[SimplePlaylist]:
+        key = (self._settings.playlists_url, 50)
+        playlists = self._listings.get(key)
+        if playlists is None:
+            user = await self.current_user()
+            playlists = await self._fetch_paginated(self._spotify.playlists, user.id, limit=50)
+            self._listings.put(key, playlists)
+        return playlists
+
+    def _playlist_entry(self, playlist: SimplePlaylist) -> PlaylistEntry:
+        return PlaylistEntry(id=playlist.id, name=playlist.name, version=playlist.snapshot_id)
+
+    async def get_playlist_tracks(self, name: str) -> List[Track]:
+        playlist_id = await self._playlist_id_by_name(name)
+
+        tracks: List[Union[PlaylistTrack, PlaylistItem]]
+        if self._settings.project_fields:
+            fetch_page = functools.partial(self._fetch_items_page, playlist_id)
+            tracks = await self._fetch_paginated(fetch_page, limit=50)
+        else:
+            tracks = await self._fetch_paginated(self._spotify.playlist_items, playlist_id, limit=50)
+        return [Track.from_spotify(t) for t in tracks]
+
+    async def _fetch_items_page(self, playlist_id: str, limit: int, offset: int) -> PlaylistItemsPage:
+        page = await self._spotify.playlist_items(playlist_id, fields=PLAYLIST_ITEM_FIELDS, limit=limit, offset=offset)
+        return PlaylistItemsPage.parse_obj(page)
+
+    async def _fetch_paginated(self, method: Callable[..., Awaitable[Any]], *args: Any, limit: int) -> List[Any]:
+        """All items of a listing: the first page tells the total, the rest are requested by offset concurrently.
+
+        Spotify may serve fewer items than asked, so offsets step by the limit of the first page.
+        """
+        first = await method(*args, limit=limit, offset=0)
+        step = first.limit or limit
+        pages = await gather_bounded(
+            (method(*args, limit=step, offset=offset) for offset in range(step, first.total, step)),
+            self._settings.page_concurrency,
+        )
+        acc = [item for page in [first, *pages] for item in page.items]
+        logger.debug('Fetched %s of %s items in %s pages', len(acc), first.total, len(pages) + 1)
+        return acc
@@ -1,35 +1,75 @@
 from __future__ import annotations
 
-from functools import cached_property, lru_cache, wraps
-from typing import TYPE_CHECKING, List
+import json
+import logging
+from functools import cached_property, wraps
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
 
+import httpx
 import tekore as tk
-from tekore._model import FullPlaylist, SimplePlaylist
+from pydantic import BaseModel
+from tekore._model import FullPlaylist, PlaylistTrackPaging, SimplePlaylist, SimplePlaylistPaging
 
-from playlist_organizer.client.base import BaseClient, Track
+from playlist_organizer.client.base import BaseClient, Platform, Track
+from playlist_organizer.client.catalog import PlaylistEntry
+from playlist_organizer.client.checkpoint import Checkpoint
+from playlist_organizer.client.rate_limit import RateLimitedTransport, RateLimiter
+from playlist_organizer.client.spotify.entities import PLAYLIST_ITEM_FIELDS, PlaylistItem, PlaylistItemsPage
+from playlist_organizer.client.transport import MeteredTransport, WireStats, create_transport
+from playlist_organizer.client.ttl_cache import TTLCache
 
 if TYPE_CHECKING:
     from tekore._model import PlaylistTrack, PrivateUser
 
     from playlist_organizer.client.auth.spotify import SpotifyAuthenticator
+    from playlist_organizer.client.cache import PlaylistCache
+    from playlist_organizer.client.checkpoint import PaginationCheckpoints
     from playlist_organizer.client.spotify.settings import SpotifySettings
 
+TRACKS_PAGE_SIZE = 50
+logger = logging.getLogger(__name__)
+
 
 def _ensure_auth(func):  # type: ignore
     @wraps(func)
     def _inner(self: SpotifyClient, *args, **kwargs):  # type: ignore
         if not self._spotify:  # pylint: disable=W0212
-            self._spotify = tk.Spotify(token=self._authenticator.token)  # pylint: disable=W0212
+            self._spotify = tk.Spotify(  # pylint: disable=W0212
+                token=self._authenticator.token, sender=self._sender  # pylint: disable=W0212
+            )
         return func(self, *args, **kwargs)
 
     return _inner
 
 
 class SpotifyClient(BaseClient[SimplePlaylist]):
-    def __init__(self, settings: SpotifySettings, authenticator: SpotifyAuthenticator):
+    platform = Platform.SPOTIFY
+
+    def __init__(  # pylint: disable=R0913
+        self,
+        settings: SpotifySettings,
+        authenticator: SpotifyAuthenticator,
+        cache: Optional[PlaylistCache] = None,
+        checkpoints: Optional[PaginationCheckpoints] = None,
+        transport: Optional[MeteredTransport] = None,
+    ):
         self._settings = settings
         self._spotify: tk.Spotify = None
-        super().__init__(authenticator)
+        self._transport = transport or create_transport(settings)
+        self._sender = tk.SyncSender(
+            httpx.Client(
+                transport=RateLimitedTransport(RateLimiter(settings.rate_limit), self._transport),
+                headers=settings.headers,
+                timeout=settings.timeout,
+            )
+        )
+        super().__init__(
+            authenticator, cache, checkpoints, TTLCache(settings.listing_cache_size, settings.listing_cache_ttl)
+        )
+
+    @property
+    def wire_stats(self) -> WireStats:
+        return self._transport.stats
 
     @cached_property
     @_ensure_auth
@@ -38,48 +78,126 @@ class SpotifyClient(BaseClient[SimplePlaylist]):
 
     @_ensure_auth
     def get_playlist_list(self) -> List[SimplePlaylist]:
-        return _fetch_paginated(self._spotify.playlists, limit=50, user_id=self.current_user.id)  # type: ignore
-
-    def get_playlist_names(self) -> List[str]:
-        return [p.name for p in self.get_playlist_list()]
+        return self._fetch_paginated(
+            self._listing(), self._spotify.playlists, self.current_user.id, limit=50, model_cls=SimplePlaylistPaging
+        )
 
     @_ensure_auth
-    def _playlist_id_by_name(self, name: str) -> str:
-        for playlist in self.get_playlist_list():
-            if playlist.name == name:
-                return playlist.id
+    def get_playlist_tracks_by_id(self, playlist_id: str) -> List[Track]:
+        return self._cached_tracks(playlist_id, lambda version: self._fetch_playlist_tracks(playlist_id, version))
 
-        raise ValueError(f'Playlist "{name}" was not found')
+    def _playlist_entry(self, playlist: SimplePlaylist) -> PlaylistEntry:
+        return PlaylistEntry(id=playlist.id, name=playlist.name, version=playlist.snapshot_id)
 
-    @_ensure_auth
-    def get_playlist_tracks(self, name: str) -> List[Track]:
-        playlist_id = self._playlist_id_by_name(name)
+    def _listing(self, playlist_id: Optional[str] = None) -> str:
+        return 'playlists' if playlist_id is None else f'playlist/{playlist_id}'
 
-        tracks: List[PlaylistTrack]
-        tracks = _fetch_paginated(self._spotify.playlist_items, playlist_id, limit=50)
+    @_ensure_auth
+    def _fetch_playlist_tracks(self, playlist_id: str, version: Optional[str] = None) -> List[Track]:
+        model_cls, kwargs = self._items_query()
+        tracks: List[Union[PlaylistTrack, PlaylistItem]] = self._fetch_paginated(
+            self._listing(playlist_id),
+            self._spotify.playlist_items,
+            playlist_id,
+            limit=TRACKS_PAGE_SIZE,
+            model_cls=model_cls,
+            version=version,
+            **kwargs,
+        )
         return [Track.from_spotify(t) for t in tracks]
 
+    @_ensure_auth
+    def _iter_playlist_pages(self, playlist_id: str, version: Optional[str] = None) -> Iterator[List[Track]]:
+        listing = self._listing(playlist_id)
+        cached = self._listings.get((listing, TRACKS_PAGE_SIZE))
+        if cached is not None:
+            pages: Iterable[List[Any]] = [cached]
+        else:
+            model_cls, kwargs = self._items_query()
+            checkpoint = self._checkpoint(f'{listing}/{model_cls.__name__}', version)
+            pages = _iter_pages(
+                self._spotify.playlist_items,
+                playlist_id,
+                limit=TRACKS_PAGE_SIZE,
+                checkpoint=checkpoint,
+                model_cls=model_cls,
+                **kwargs,
+            )
+        for items in pages:
+            yield [Track.from_spotify(t) for t in items]
+
+    def _items_query(self) -> Tuple[Type[Any], Dict[str, Any]]:
+        """Page model and extra arguments of playlist items requests, only used fields are requested if enabled."""
+        if self._settings.project_fields:
+            return PlaylistItemsPage, {'fields': PLAYLIST_ITEM_FIELDS}
+        return PlaylistTrackPaging, {}
+
     @_ensure_auth
     def create_playlist(self, name: str, public: bool = False) -> FullPlaylist:
-        return self._spotify.playlist_create(
+        playlist = self._spotify.playlist_create(
             user_id=self.current_user.id,
             name=name,
             public=public,
         )
+        self._invalidate_cache(playlist.id)
+        return playlist
 
     @_ensure_auth
     def add_playlist_tracks(self, playlist: FullPlaylist, tracks: List[Track]) -> None:
         pass
 
-
-@lru_cache()
-def _fetch_paginated(method, *args, limit: int, **kwargs):  # type: ignore
+    def _fetch_paginated(  # pylint: disable=R0913
+        self,
+        listing: str,
+        method: Callable[..., Any],
+        *args: Any,
+        limit: int,
+        model_cls: Type[Any],
+        version: Optional[str] = None,
+        **kwargs: Any,
+    ) -> List[Any]:
+        def fetch() -> List[Any]:
+            checkpoint = self._checkpoint(f'{listing}/{model_cls.__name__}', version)
+            items = _fetch_paginated(method, *args, limit=limit, checkpoint=checkpoint, model_cls=model_cls, **kwargs)
+            logger.debug('Fetched %s, Spotify traffic so far: %s', listing, self.wire_stats)
+            return items
+
+        return self._listings.get_or_fetch((listing, limit), fetch)
+
+
+def _fetch_paginated(method, *args, limit: int, checkpoint: Checkpoint, model_cls, **kwargs):  # type: ignore
+    return [
+        item
+        for page in _iter_pages(method, *args, limit=limit, checkpoint=checkpoint, model_cls=model_cls, **kwargs)
+        for item in page
+    ]
+
+
+def _iter_pages(method, *args, limit: int, checkpoint: Checkpoint, model_cls, **kwargs):  # type: ignore
+    """Items page by page, the checkpoint is done once the last page is yielded."""
     offset = 0
-    acc = []
     while True:
-        page = method(*args, limit=limit, offset=offset, **kwargs)
-        acc.extend(page.items)
-        offset += limit
+        page = _fetch_page(
+            method, *args, limit=limit, offset=offset, checkpoint=checkpoint, model_cls=model_cls, **kwargs
+        )
+        yield page.items
+        offset += page.limit or limit
         if not page.next:
             break
-    return acc
+    checkpoint.done()
+
+
+def _fetch_page(method, *args, checkpoint: Checkpoint, model_cls, **kwargs):  # type: ignore
+    """One page as <model_cls>, from <checkpoint> if it was fetched before, tekore models are kept as json."""
+    page_key = f'{kwargs["offset"]}:{kwargs["limit"]}'
+    page = checkpoint.get(page_key)
+    if page is None:
+        page = method(*args, **kwargs)
+        if checkpoint.enabled:
+            checkpoint.add(page_key, page if isinstance(page, dict) else json.loads(page.json()))
+
+    if not isinstance(page, dict):
+        return page
+    if issubclass(model_cls, BaseModel):
+        return model_cls.parse_obj(page)
+    return model_cls(**page)
@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, validator
+
+# everything Track.from_spotify needs, Spotify drops the rest of every item server side
+PLAYLIST_ITEM_FIELDS = 'limit,next,total,items(added_at,track(uri,name,external_ids(isrc),album(name),artists(name)))'
+
+
+class Artist(BaseModel):
+    name: str
+
+
+class Album(BaseModel):
+    name: str
+
+
+class TrackInfo(BaseModel):
+    uri: str
+    name: str
+    album: Album
+    artists: List[Artist]
+    external_ids: Dict[str, str] = {}
+
+
+class PlaylistItem(BaseModel):
+    """Projection of tekore PlaylistTrack, with the same attribute paths for the fields it keeps."""
+
+    added_at: datetime
+    track: TrackInfo
+
+    @validator('added_at')
+    def _naive_utc(cls, value: datetime) -> datetime:  # pylint: disable=E0213
+        """tekore parses timestamps to naive UTC, keep tracks comparable whichever way they came."""
+        if value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class PlaylistItemsPage(BaseModel):
+    items: List[PlaylistItem]
+    limit: int
+    total: int
+    next: Optional[str] = None
@@ -1,13 +1,24 @@
-from pydantic import BaseSettings
+from playlist_organizer.client.transport import HttpSettings
 
 
-class SpotifySettings(BaseSettings):
+class SpotifySettings(HttpSettings):
     api_host: str = 'https://api.spotify.com'
 
     user_info_path: str = 'v1/me'
     playlists_path: str = 'v1/me/playlists'
     playlist_info_path: str = 'v1/playlists/{}/tracks'
 
+    page_concurrency: int = 4
+
+    project_fields: bool = True
+
+    # Spotify does not publish its limits, Retry-After of throttled responses covers the rest
+    requests_per_second: float = 10.0
+    burst: int = 20
+
+    listing_cache_size: int = 256
+    listing_cache_ttl: float = 600.0
+
     @property
     def user_info_url(self) -> str:
         return f'{self.api_host}/{self.user_info_path}'
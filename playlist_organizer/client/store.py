@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import json
+import logging
+import pathlib
+import sqlite3
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from playlist_organizer.client.catalog import PlaylistCatalog, PlaylistEntry
+from playlist_organizer.client.track import AnyTrack, Platform, Track, normalize
+
+if TYPE_CHECKING:
+    from playlist_organizer.client.base import IPlatformClient
+
+logger = logging.getLogger(__name__)
+STORE_PATH = pathlib.Path(__file__).parent / 'library.sqlite3'
+SCHEMA_VERSION = 1
+SEARCH_LIMIT = 100
+
+_SCHEMA = '''
+CREATE TABLE playlists (
+    platform TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    version TEXT,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (platform, id)
+);
+CREATE TABLE tracks (
+    id INTEGER PRIMARY KEY,
+    platform TEXT NOT NULL,
+    external_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    artists TEXT NOT NULL,
+    album TEXT NOT NULL,
+    isrc TEXT,
+    title_key TEXT NOT NULL,
+    artist_key TEXT NOT NULL,
+    UNIQUE (platform, external_id)
+);
+CREATE TABLE playlist_tracks (
+    platform TEXT NOT NULL,
+    playlist_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    track_id INTEGER NOT NULL REFERENCES tracks (id),
+    added_at TEXT NOT NULL,
+    added_ts REAL NOT NULL,
+    PRIMARY KEY (platform, playlist_id, position),
+    FOREIGN KEY (platform, playlist_id) REFERENCES playlists (platform, id) ON DELETE CASCADE
+);
+CREATE INDEX tracks_title_artist ON tracks (title_key, artist_key);
+CREATE INDEX tracks_isrc ON tracks (isrc) WHERE isrc IS NOT NULL;
+CREATE INDEX playlist_tracks_track ON playlist_tracks (track_id);
+CREATE INDEX playlist_tracks_added ON playlist_tracks (added_ts);
+'''
+
+_TRACK_COLUMNS = 't.platform, t.external_id, t.title, t.artists, t.album, t.isrc, pt.added_at'
+_UPSERT_TRACK = '''
+INSERT INTO tracks (platform, external_id, title, artists, album, isrc, title_key, artist_key)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (platform, external_id) DO UPDATE SET
+    title = excluded.title, artists = excluded.artists, album = excluded.album,
+    isrc = COALESCE(excluded.isrc, tracks.isrc), title_key = excluded.title_key, artist_key = excluded.artist_key
+'''
+
+
+class LibraryStore:
+    """Playlists and tracks of both platforms in a local SQLite database, queried instead of fetching them again.
+
+    Clients sync into the store playlist by playlist, playlists whose version (Spotify snapshot_id,
+    Deezer checksum) is unchanged since the last sync are not fetched. Tracks are stored once per platform
+    and linked to playlists with the time they were added. Normalized titles and primary artists are indexed
+    the same way TrackMatcher compares them.
+    """
+
+    def __init__(self, path: pathlib.Path = STORE_PATH) -> None:
+        self._path = path
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = self._connect()
+        return self._db
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def sync(
+        self, client: IPlatformClient[Any], enrich: Optional[Callable[[List[Track]], List[Track]]] = None
+    ) -> Set[str]:
+        """Bring playlists of <client> up to date, returns ids of fetched and removed playlists."""
+        platform = client.platform
+        entries = client.get_playlist_catalog().entries
+        stored = {e.id: e.version for e in self.playlists(platform)}
+        changed = [e for e in entries if e.version is None or e.id not in stored or stored[e.id] != e.version]
+        removed = stored.keys() - {e.id for e in entries}
+
+        with self.db:
+            self.db.executemany(
+                'DELETE FROM playlists WHERE platform = ? AND id = ?', [(platform.value, i) for i in removed]
+            )
+            self.db.executemany(
+                '''INSERT INTO playlists (platform, id, name, version, position) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (platform, id) DO UPDATE SET name = excluded.name, position = excluded.position''',
+                [(platform.value, e.id, e.name, stored.get(e.id), i) for i, e in enumerate(entries)],
+            )
+
+        for entry in changed:
+            tracks = client.get_playlist_tracks_by_id(entry.id)
+            self._put_playlist(platform, entry, enrich(tracks) if enrich is not None else tracks)
+
+        with self.db:
+            self.db.execute('DELETE FROM tracks WHERE id NOT IN (SELECT track_id FROM playlist_tracks)')
+        logger.info('Synced %s library: %s of %s playlists fetched', platform.value, len(changed), len(entries))
+        return {e.id for e in changed} | removed
+
+    def _put_playlist(self, platform: Platform, entry: PlaylistEntry, tracks: Iterable[Track]) -> None:
+        """Replace tracks of one playlist, its version is written last, so an interrupted sync fetches it again."""
+        with self.db:
+            self.db.execute(
+                'DELETE FROM playlist_tracks WHERE platform = ? AND playlist_id = ?', (platform.value, entry.id)
+            )
+            rows = [
+                (platform.value, entry.id, position, self._upsert_track(t), *_added(t))
+                for position, t in enumerate(tracks)
+            ]
+            self.db.executemany('INSERT INTO playlist_tracks VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self.db.execute(
+                'UPDATE playlists SET version = ? WHERE platform = ? AND id = ?',
+                (entry.version, platform.value, entry.id),
+            )
+
+    def playlists(self, platform: Platform) -> List[PlaylistEntry]:
+        rows = self.db.execute(
+            'SELECT id, name, version FROM playlists WHERE platform = ? ORDER BY position', (platform.value,)
+        )
+        return [PlaylistEntry(id=i, name=name, version=version) for i, name, version in rows]
+
+    def playlist_tracks(self, platform: Platform, playlist_id: str) -> List[Track]:
+        rows = self.db.execute(
+            f'''SELECT {_TRACK_COLUMNS} FROM playlist_tracks pt JOIN tracks t ON t.id = pt.track_id
+            WHERE pt.platform = ? AND pt.playlist_id = ? ORDER BY pt.position''',
+            (platform.value, playlist_id),
+        )
+        return [_track(row) for row in rows]
+
+    def library(self, platform: Platform) -> Dict[str, List[Track]]:
+        """Tracks of every playlist by its label, like a freshly fetched library."""
+        catalog = PlaylistCatalog(self.playlists(platform))
+        return {catalog.label(e): self.playlist_tracks(platform, e.id) for e in catalog.entries}
+
+    def _upsert_track(self, track: Track) -> int:
+        keys = track.keys
+        values = (track.source.value, track.external_id, track.title, json.dumps(track.artists), track.album)
+        self.db.execute(_UPSERT_TRACK, (*values, track.isrc, keys.title, _artist_key(track)))
+        # no RETURNING, it needs SQLite 3.35
+        return self.db.execute(
+            'SELECT id FROM tracks WHERE platform = ? AND external_id = ?', (track.source.value, track.external_id)
+        ).fetchone()[0]
+
+    def _connect(self) -> sqlite3.Connection:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self._path)
+        db.execute('PRAGMA foreign_keys = ON')
+        db.execute('PRAGMA journal_mode = WAL')
+        if db.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            # the store only mirrors remote playlists, so an outdated one is rebuilt by the next sync
+            logger.info('Creating library store %s', self._path)
+            with db:
+                tables = db.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY rowid").fetchall()
+                for (table,) in reversed(tables):
+                    db.execute(f'DROP TABLE {table}')
+            db.executescript(_SCHEMA)
+            db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        return db
+
+
+class LibraryQueries:
+    """Questions about the library answered from a synced LibraryStore."""
+
+    def __init__(self, store: LibraryStore) -> None:
+        self._store = store
+
+    def search(self, title: str, artist: str = '', platform: Optional[Platform] = None) -> List[Track]:
+        """Tracks whose normalized title and primary artist start with the normalized <title> and <artist>."""
+        query = f'''SELECT {_TRACK_COLUMNS} FROM tracks t
+            JOIN playlist_tracks pt ON pt.rowid = (SELECT MIN(rowid) FROM playlist_tracks WHERE track_id = t.id)
+            WHERE t.title_key >= :title AND t.title_key < :title || char(1114111)
+            AND t.artist_key >= :artist AND t.artist_key < :artist || char(1114111)
+            AND (:platform IS NULL OR t.platform = :platform)
+            ORDER BY t.title_key, t.artist_key LIMIT {SEARCH_LIMIT}'''
+        params = {'title': normalize(title), 'artist': normalize(artist), 'platform': platform and platform.value}
+        return [_track(row) for row in self._store.db.execute(query, params)]
+
+    def containing(self, track: AnyTrack) -> List[Tuple[Platform, PlaylistEntry]]:
+        """Playlists of both platforms with <track>, its ISRC or its normalized title and primary artist."""
+        keys = track.keys
+        rows = self._store.db.execute(
+            '''SELECT DISTINCT p.platform, p.id, p.name, p.version FROM tracks t
+            JOIN playlist_tracks pt ON pt.track_id = t.id
+            JOIN playlists p ON p.platform = pt.platform AND p.id = pt.playlist_id
+            WHERE (t.platform = ? AND t.external_id = ?) OR t.isrc = ? OR (t.title_key = ? AND t.artist_key = ?)
+            ORDER BY p.platform, p.position''',
+            (track.source.value, track.external_id, track.isrc, keys.title, _artist_key(track)),
+        )
+        return [(Platform(p), PlaylistEntry(id=i, name=name, version=v)) for p, i, name, v in rows]
+
+    def added_between(
+        self, start: datetime, end: Optional[datetime] = None, platform: Optional[Platform] = None
+    ) -> List[Tuple[PlaylistEntry, Track]]:
+        """Tracks added to playlists from <start> till <end> or now, the latest first, naive bounds are UTC."""
+        rows = self._store.db.execute(
+            f'''SELECT p.id, p.name, p.version, {_TRACK_COLUMNS} FROM playlist_tracks pt
+            JOIN tracks t ON t.id = pt.track_id JOIN playlists p ON p.platform = pt.platform AND p.id = pt.playlist_id
+            WHERE pt.added_ts >= ?1 AND pt.added_ts < ?2 AND (?3 IS NULL OR pt.platform = ?3)
+            ORDER BY pt.added_ts DESC''',
+            (_ts(start), _ts(end or datetime.now(timezone.utc)), platform and platform.value),
+        )
+        return [(PlaylistEntry(id=row[0], name=row[1], version=row[2]), _track(row[3:])) for row in rows]
+
+
+def _artist_key(track: AnyTrack) -> str:
+    return track.keys.artists[0] if track.keys.artists else ''
+
+
+def _added(track: Track) -> Tuple[str, float]:
+    return track.added_at.isoformat(), _ts(track.added_at, track.source)
+
+
+def _ts(moment: datetime, platform: Optional[Platform] = None) -> float:
+    """Seconds since epoch, naive Deezer times are local like datetime.fromtimestamp made them, others are UTC."""
+    naive_utc = moment.tzinfo is None and platform is not Platform.DEEZER
+    return (moment.replace(tzinfo=timezone.utc) if naive_utc else moment).timestamp()
+
+
+def _track(row: Tuple[Any, ...]) -> Track:
+    platform, external_id, title, artists, album, isrc, added_at = row
+    return Track.construct(
+        artists=json.loads(artists),
+        album=album,
+        title=title,
+        added_at=datetime.fromisoformat(added_at),
+        source=Platform(platform),
+        external_id=external_id,
+        isrc=isrc,
+    )
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import enum
+import sys
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from tekore._model import PlaylistTrack as SpotifyTrack
+
+    from playlist_organizer.client.deezer.entities import Track as DeezerTrack
+    from playlist_organizer.client.spotify.entities import PlaylistItem
+
+TRACK_KEYS_CACHE_SIZE = 100_000
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class Platform(str, enum.Enum):
+    DEEZER = 'DEEZER'
+    SPOTIFY = 'SPOTIFY'
+
+
+class TrackKeys(NamedTuple):
+    title: str
+    artists: Tuple[str, ...]
+    album: str
+
+
+def normalize(raw: str) -> str:
+    replaced = raw.lower().replace('remastered', '').replace('remaster', '').strip()
+    return ''.join(r for r in replaced if r.isalpha() or r.isdigit())
+
+
+@lru_cache(maxsize=TRACK_KEYS_CACHE_SIZE)
+def _track_keys(title: str, artists: Tuple[str, ...], album: str) -> TrackKeys:
+    return TrackKeys(title=normalize(title), artists=tuple(normalize(a) for a in artists), album=normalize(album))
+
+
+class _TrackBase:
+    """Formatting and matching keys shared by both track representations."""
+
+    __slots__ = ()
+
+    if TYPE_CHECKING:
+
+        @property
+        def artists(self) -> Sequence[str]:
+            ...
+
+        @property
+        def album(self) -> str:
+            ...
+
+        @property
+        def title(self) -> str:
+            ...
+
+        @property
+        def added_at(self) -> datetime:
+            ...
+
+    def __str__(self) -> str:
+        return f'{self._to_brief_str()} [added: {self.added_at}]'
+
+    def _to_brief_str(self) -> str:
+        artists = '; '.join(self.artists)
+        return f'{artists} - {self.title} ({self.album})'
+
+    def to_brief_str(self, max_len: int) -> str:
+        original = str(self)
+        if len(original) < max_len:
+            return original
+
+        brief_str = self._to_brief_str()
+        if len(brief_str) > max_len:
+            return brief_str[: max_len - 3] + '...'
+
+        return brief_str
+
+    @property
+    def keys(self) -> TrackKeys:
+        """Normalized title, artists and album, computed once for any set of values and kept in a bounded LRU."""
+        return _track_keys(self.title, tuple(self.artists), self.album)
+
+
+class Track(_TrackBase, BaseModel):
+    artists: List[str]
+    album: str
+    title: str
+    added_at: datetime
+    source: Platform
+    external_id: str
+    isrc: Optional[str] = None
+
+    def __hash__(self) -> int:
+        return hash((self.source, self.external_id))
+
+    @classmethod
+    def from_deezer(cls, track: DeezerTrack) -> Track:
+        return cls(
+            artists=[track.artist.name],
+            album=track.album.title,
+            title=track.title,
+            added_at=datetime.fromtimestamp(track.time_add),
+            source=Platform.DEEZER,
+            external_id=str(track.id),
+            isrc=track.isrc,
+        )
+
+    @classmethod
+    def from_deezer_json(cls, raw: Dict[str, Any]) -> Track:
+        """Track from a trusted Deezer response item in one pass, without validation and intermediate entities."""
+        return cls.construct(
+            artists=[raw['artist']['name']],
+            album=raw['album']['title'],
+            title=raw['title'],
+            added_at=datetime.fromtimestamp(raw['time_add']),
+            source=Platform.DEEZER,
+            external_id=str(raw['id']),
+            isrc=raw.get('isrc'),
+        )
+
+    @classmethod
+    def from_spotify(cls, track: Union[SpotifyTrack, PlaylistItem]) -> Track:
+        return cls(
+            artists=[a.name for a in track.track.artists],
+            album=track.track.album.name,
+            title=track.track.name,
+            added_at=track.added_at,
+            source=Platform.SPOTIFY,
+            external_id=track.track.uri,
+            isrc=track.track.external_ids.get('isrc'),
+        )
+
+
+class CompactTrack(_TrackBase):
+    """Track for large in-memory libraries: no validation and no per-instance dict.
+
+    Artists and albums are interned, since they repeat across a library. The timestamp is kept as
+    microseconds of wall time and the hash is computed once. Conversion to and from Track is lossless.
+    """
+
+    __slots__ = ('artists', 'album', 'title', 'source', 'external_id', 'isrc', '_added_at', '_tz', '_hash')
+
+    artists: Tuple[str, ...]
+    album: str
+    title: str
+    source: Platform
+    external_id: str
+    isrc: Optional[str]
+
+    def __init__(  # pylint: disable=R0913
+        self,
+        artists: Iterable[str],
+        album: str,
+        title: str,
+        added_at: datetime,
+        source: Platform,
+        external_id: str,
+        isrc: Optional[str] = None,
+    ) -> None:
+        self.artists = tuple(sys.intern(a) for a in artists)
+        self.album = sys.intern(album)
+        self.title = title
+        self.source = source
+        self.external_id = external_id
+        self.isrc = isrc
+        self._added_at = (added_at.replace(tzinfo=None) - _EPOCH) // _MICROSECOND
+        self._tz = added_at.tzinfo
+        self._hash = hash((source, external_id))
+
+    @property
+    def added_at(self) -> datetime:
+        return (_EPOCH + timedelta(microseconds=self._added_at)).replace(tzinfo=self._tz)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactTrack):
+            return NotImplemented
+        return self._hash == other._hash and self._values() == other._values()
+
+    def __repr__(self) -> str:
+        return f'CompactTrack({self.source.value}, {self.external_id!r}, {self._to_brief_str()!r})'
+
+    def _values(self) -> Tuple[Any, ...]:
+        return self.source, self.external_id, self.title, self.artists, self.album, self._added_at, self._tz, self.isrc
+
+    @classmethod
+    def from_track(cls, track: Track) -> CompactTrack:
+        return cls(
+            artists=track.artists,
+            album=track.album,
+            title=track.title,
+            added_at=track.added_at,
+            source=track.source,
+            external_id=track.external_id,
+            isrc=track.isrc,
+        )
+
+    def to_track(self) -> Track:
+        return Track(
+            artists=list(self.artists),
+            album=self.album,
+            title=self.title,
+            added_at=self.added_at,
+            source=self.source,
+            external_id=self.external_id,
+            isrc=self.isrc,
+        )
+
+
+AnyTrack = Union[Track, CompactTrack]
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import importlib.util
+import logging
+import threading
+from typing import Dict, Optional, cast
+
+import httpx
+from pydantic import BaseSettings
+
+from playlist_organizer.client.rate_limit import RateLimit
+
+logger = logging.getLogger(__name__)
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+
+class HttpSettings(BaseSettings):
+    """Connection pool, wire format and request rate of one platform, shared by its API client and authenticator."""
+
+    # HTTP/2 multiplexes concurrent pages over one connection, needs httpx[http2]
+    http2: bool = True
+    # gzip and deflate are always accepted, brotli as well if httpx[brotli] is installed
+    compression: bool = True
+
+    max_connections: int = 10
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    timeout: float = 10.0
+
+    requests_per_second: float = 10.0
+    burst: int = 20
+    max_retries: int = 5
+    retry_backoff: float = 0.5
+
+    @property
+    def rate_limit(self) -> RateLimit:
+        return RateLimit(
+            rate=self.requests_per_second, burst=self.burst, max_retries=self.max_retries, backoff=self.retry_backoff
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {} if self.compression else {'Accept-Encoding': 'identity'}
+
+    @property
+    def use_http2(self) -> bool:
+        if self.http2 and not HTTP2_AVAILABLE:
+            logger.warning('HTTP/2 is on, but the h2 package is not installed, falling back to HTTP/1.1')
+            return False
+        return self.http2
+
+
+class WireStats:
+    """Size of response bodies as they came over the wire and after decompression."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.responses = 0
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+
+    def add(self, wire_bytes: int, decoded_bytes: int) -> None:
+        with self._lock:
+            self.responses += 1
+            self.wire_bytes += wire_bytes
+            self.decoded_bytes += decoded_bytes
+
+    @property
+    def ratio(self) -> float:
+        return self.decoded_bytes / self.wire_bytes if self.wire_bytes else 1.0
+
+    def __str__(self) -> str:
+        return (
+            f'{self.responses} responses, {self.wire_bytes / 1024:.1f} KiB on the wire, '
+            f'{self.decoded_bytes / 1024:.1f} KiB decoded (x{self.ratio:.1f})'
+        )
+
+
+class MeteredTransport(httpx.BaseTransport):
+    """Reads every response body and counts its bytes before and after decompression."""
+
+    def __init__(self, transport: httpx.BaseTransport, stats: Optional[WireStats] = None) -> None:
+        self._transport = transport
+        self.stats = stats or WireStats()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self._transport.handle_request(request)
+        try:
+            raw = b''.join(cast(httpx.SyncByteStream, response.stream))
+        finally:
+            response.close()
+        return _metered(response, raw, request, self.stats)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncMeteredTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, stats: Optional[WireStats] = None) -> None:
+        self._transport = transport
+        self.stats = stats or WireStats()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+        try:
+            raw = b''.join([chunk async for chunk in cast(httpx.AsyncByteStream, response.stream)])
+        finally:
+            await response.aclose()
+        return _metered(response, raw, request, self.stats)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def create_transport(settings: HttpSettings) -> MeteredTransport:
+    return MeteredTransport(httpx.HTTPTransport(http2=settings.use_http2, limits=settings.limits))
+
+
+def create_async_transport(settings: HttpSettings) -> AsyncMeteredTransport:
+    return AsyncMeteredTransport(httpx.AsyncHTTPTransport(http2=settings.use_http2, limits=settings.limits))
+
+
+def _metered(response: httpx.Response, raw: bytes, request: httpx.Request, stats: WireStats) -> httpx.Response:
+    """Response with the raw body in memory, so it is decoded once and both sizes are known."""
+    metered = httpx.Response(
+        response.status_code, headers=response.headers, content=raw, extensions=response.extensions, request=request
+    )
+    stats.add(len(raw), len(metered.read()))
+    return metered
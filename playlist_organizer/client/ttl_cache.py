@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, NamedTuple, Optional, Tuple, TypeVar
+
+KeyType = TypeVar('KeyType', bound=Hashable)
+ValueType = TypeVar('ValueType')
+
+MAX_SIZE = 256
+TTL = 600.0
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    size: int
+
+
+class TTLCache(Generic[KeyType, ValueType]):
+    """In-memory cache of fetched resources, bounded by size and by age of entries.
+
+    Keys name the resource, not the credential used to fetch it, so entries survive token refreshes.
+    Least recently used entries are evicted first once the cache is full.
+    """
+
+    def __init__(self, max_size: int = MAX_SIZE, ttl: float = TTL, clock: Callable[[], float] = time.monotonic):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[KeyType, Tuple[float, ValueType]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(hits=self.hits, misses=self.misses, size=len(self._entries))
+
+    def get(self, key: KeyType) -> Optional[ValueType]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[0] > self._ttl:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: KeyType, value: ValueType) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_fetch(self, key: KeyType, fetch: Callable[[], ValueType]) -> ValueType:
+        value = self.get(key)
+        if value is None:
+            value = fetch()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, predicate: Optional[Callable[[KeyType], bool]] = None) -> int:
+        """Drop entries whose keys match <predicate> or all of them, returns the number of dropped entries."""
+        with self._lock:
+            stale = [key for key in self._entries if predicate is None or predicate(key)]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
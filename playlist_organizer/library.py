@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import logging
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from playlist_organizer.client.base import IPlatformClient, Track
+from playlist_organizer.client.deezer.client import DeezerClient
+from playlist_organizer.client.store import LibraryStore
+from playlist_organizer.client.track import CompactTrack
+from playlist_organizer.matcher import MatchResult, TrackMatcher
+from playlist_organizer.matching.identity import TrackId, track_id
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PlaylistOverlap:
+    left_name: str
+    right_name: str
+    common: int
+    only_left: List[CompactTrack] = field(default_factory=list)
+    only_right: List[CompactTrack] = field(default_factory=list)
+
+
+@dataclass
+class LibraryMatch:
+    tracks: MatchResult
+    overlaps: List[PlaylistOverlap]
+
+
+class LibraryMatcher:
+    """Match every Deezer playlist against every Spotify playlist at once.
+
+    Each platform library is fetched once and deduplicated, unique tracks are matched in a single
+    TrackMatcher run, then every playlist becomes a set of song ids and overlaps are counted through
+    an inverted index from songs to playlists.
+
+    With a <store>, both libraries are synced into it and read back from it, so only playlists changed
+    since the last sync are fetched.
+    """
+
+    def __init__(
+        self,
+        deezer_client: DeezerClient,
+        spotify_client: IPlatformClient[Any],
+        track_matcher: TrackMatcher,
+        store: Optional[LibraryStore] = None,
+    ) -> None:
+        self._deezer_client = deezer_client
+        self._spotify_client = spotify_client
+        self._track_matcher = track_matcher
+        self._store = store
+
+    def match(self) -> LibraryMatch:
+        left_playlists = self._load(self._deezer_client, enrich=self._deezer_client.with_isrc)
+        right_playlists = self._load(self._spotify_client)
+
+        tracks = self._track_matcher.match(_unique(left_playlists), _unique(right_playlists))
+        tracks.left_name, tracks.right_name = 'Deezer library', 'Spotify library'
+
+        right = _PlaylistSongs(_song_ids(tracks), right_playlists)
+        overlaps = [o for name, playlist in left_playlists.items() for o in right.overlaps(name, playlist)]
+        overlaps.sort(key=lambda o: (-o.common, o.left_name, o.right_name))
+        logger.debug('Library matched: %s, %s overlapping playlist pairs', tracks.stage_counts, len(overlaps))
+        return LibraryMatch(tracks=tracks, overlaps=overlaps)
+
+    def _load(
+        self, client: IPlatformClient[Any], enrich: Optional[Callable[[List[Track]], List[Track]]] = None
+    ) -> Dict[str, List[CompactTrack]]:
+        if self._store is None:
+            return _load_library(client, enrich)
+        self._store.sync(client, enrich)
+        known: Dict[TrackId, CompactTrack] = {}
+        return {
+            label: [_compact(known, t) for t in tracks]
+            for label, tracks in self._store.library(client.platform).items()
+        }
+
+
+class _PlaylistSongs:
+    """Songs of the right side playlists with an inverted index from songs to the playlists having them."""
+
+    def __init__(self, songs: Dict[TrackId, int], playlists: Dict[str, List[CompactTrack]]) -> None:
+        self._songs = songs
+        self._playlists = playlists
+        self._by_playlist = {name: self.songs_of(playlist) for name, playlist in playlists.items()}
+        self._by_song: Dict[int, Set[str]] = defaultdict(set)
+        for name, playlist_songs in self._by_playlist.items():
+            for song in playlist_songs:
+                self._by_song[song].add(name)
+
+    def songs_of(self, playlist: List[CompactTrack]) -> Set[int]:
+        return {self._songs[track_id(t)] for t in playlist}
+
+    def overlaps(self, left_name: str, left_playlist: List[CompactTrack]) -> Iterator[PlaylistOverlap]:
+        """Overlaps of a left playlist with every right one sharing at least one song with it."""
+        left_songs = self.songs_of(left_playlist)
+        common = Counter(name for song in left_songs for name in self._by_song.get(song, ()))
+        for right_name, count in common.items():
+            yield PlaylistOverlap(
+                left_name=left_name,
+                right_name=right_name,
+                common=count,
+                only_left=[t for t in left_playlist if self._songs[track_id(t)] not in self._by_playlist[right_name]],
+                only_right=[t for t in self._playlists[right_name] if self._songs[track_id(t)] not in left_songs],
+            )
+
+
+def _song_ids(tracks: MatchResult) -> Dict[TrackId, int]:
+    """Number of every song of both libraries, paired tracks share one."""
+    songs: Dict[TrackId, int] = {}
+    for left, right in tracks.found.items():
+        songs[track_id(left)] = songs[track_id(right)] = len(songs)
+    for track in tracks.only_left + tracks.only_right:
+        songs[track_id(track)] = len(songs)
+    return songs
+
+
+def _load_library(
+    client: IPlatformClient[Any], enrich: Optional[Callable[[List[Track]], List[Track]]] = None
+) -> Dict[str, List[CompactTrack]]:
+    """Tracks of every playlist by its label, which is the name unless several playlists share it.
+
+    Tracks are kept compact and a track found in several playlists is stored once.
+    """
+    catalog = client.get_playlist_catalog()
+    known: Dict[TrackId, CompactTrack] = {}
+    playlists = {}
+    for entry in catalog.entries:
+        tracks = client.get_playlist_tracks_by_id(entry.id)
+        if enrich is not None:
+            tracks = enrich(tracks)
+        playlists[catalog.label(entry)] = [_compact(known, t) for t in tracks]
+    return playlists
+
+
+def _compact(known: Dict[TrackId, CompactTrack], track: Track) -> CompactTrack:
+    key = track_id(track)
+    if key not in known:
+        known[key] = CompactTrack.from_track(track)
+    return known[key]
+
+
+def _unique(playlists: Dict[str, List[CompactTrack]]) -> List[CompactTrack]:
+    return list(dict.fromkeys(t for playlist in playlists.values() for t in playlist))
@@ -1,16 +1,23 @@
 import enum
 import logging
+from typing import Optional
 
 import typer
 
 from playlist_organizer.client.auth.deezer import DeezerAuthenticator
 from playlist_organizer.client.auth.settings import DeezerAuthSettings, SpotifyAuthSettings
 from playlist_organizer.client.auth.spotify import SpotifyAuthenticator
+from playlist_organizer.client.cache import PlaylistCache
+from playlist_organizer.client.checkpoint import PaginationCheckpoints
 from playlist_organizer.client.deezer.client import DeezerClient
 from playlist_organizer.client.deezer.settings import DeezerSettings
 from playlist_organizer.client.spotify.client import SpotifyClient
 from playlist_organizer.client.spotify.settings import SpotifySettings
+from playlist_organizer.client.store import LibraryStore
+from playlist_organizer.client.transport import create_transport
 from playlist_organizer.matcher import TrackMatcher
+from playlist_organizer.matching.identity import IdentityStore
+from playlist_organizer.matching.settings import MatcherSettings
 from playlist_organizer.menu.builder import Menu
 from playlist_organizer.utils import create_settings
 
@@ -26,18 +33,35 @@ class LogLevel(str, enum.Enum):
 
 
 @app.command()
-def main(log_level: LogLevel = LogLevel.INFO) -> None:
+def main(
+    log_level: LogLevel = LogLevel.INFO, cache: bool = True, checkpoints: bool = True, library_store: bool = True
+) -> None:
     logging.basicConfig(level=log_level.value, format='%(asctime)s [%(levelname)s]: %(message)s')
 
-    deezer_settings = create_settings(DeezerAuthSettings, '.env')
-    deezer_authenticator = DeezerAuthenticator(deezer_settings)
-
-    spotify_settings = create_settings(SpotifyAuthSettings, '.env')
-    spotify_authenticator = SpotifyAuthenticator(spotify_settings)
-
+    playlist_cache = PlaylistCache() if cache else None
+    pagination_checkpoints = PaginationCheckpoints() if checkpoints else None
     menu = Menu(
-        deezer_client=DeezerClient(settings=DeezerSettings(), authenticator=deezer_authenticator),
-        spotify_client=SpotifyClient(settings=SpotifySettings(), authenticator=spotify_authenticator),
-        track_matcher=TrackMatcher(),
+        deezer_client=_deezer_client(playlist_cache, pagination_checkpoints),
+        spotify_client=_spotify_client(playlist_cache, pagination_checkpoints),
+        track_matcher=TrackMatcher(MatcherSettings().options, identities=IdentityStore()),
+        store=LibraryStore() if library_store else None,
     )
     menu.run_menu_loop()
+
+
+def _deezer_client(cache: Optional[PlaylistCache], checkpoints: Optional[PaginationCheckpoints]) -> DeezerClient:
+    settings = DeezerSettings()
+    transport = create_transport(settings)
+    authenticator = DeezerAuthenticator(create_settings(DeezerAuthSettings, '.env'), transport=transport)
+    return DeezerClient(
+        settings=settings, authenticator=authenticator, cache=cache, checkpoints=checkpoints, transport=transport
+    )
+
+
+def _spotify_client(cache: Optional[PlaylistCache], checkpoints: Optional[PaginationCheckpoints]) -> SpotifyClient:
+    settings = SpotifySettings()
+    transport = create_transport(settings)
+    authenticator = SpotifyAuthenticator(create_settings(SpotifyAuthSettings, '.env'), transport=transport)
+    return SpotifyClient(
+        settings=settings, authenticator=authenticator, cache=cache, checkpoints=checkpoints, transport=transport
+    )
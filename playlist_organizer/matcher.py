@@ -1,21 +1,35 @@
+import enum
 import logging
+from collections import Counter, defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from Levenshtein import distance
-
-from playlist_organizer.client.base import Track
+from playlist_organizer.client.track import AnyTrack
+from playlist_organizer.matching.assignment import match_assignment
+from playlist_organizer.matching.distance import FieldWeights, Penalty, composite_score
+from playlist_organizer.matching.identity import IdentityStore, track_id
+from playlist_organizer.matching.index import match_indexed
+from playlist_organizer.matching.parallel import ParallelOptions, match_parallel
 
 MATCH_THRESHOLD = 3
 logger = logging.getLogger(__name__)
 
 
+class MatchStage(str, enum.Enum):
+    IDENTITY = 'IDENTITY'
+    ISRC = 'ISRC'
+    EXACT = 'EXACT'
+    FUZZY = 'FUZZY'
+    MANUAL = 'MANUAL'
+
+
 @dataclass
 class MatchResult:
-    only_left: List[Track] = field(default_factory=list)
-    only_right: List[Track] = field(default_factory=list)
-    found: Dict[Track, Track] = field(default_factory=dict)
+    only_left: List[AnyTrack] = field(default_factory=list)
+    only_right: List[AnyTrack] = field(default_factory=list)
+    found: Dict[AnyTrack, AnyTrack] = field(default_factory=dict)
+    stages: Dict[AnyTrack, MatchStage] = field(default_factory=dict)
     left_name: str = 'Left'
     right_name: str = 'Right'
     created_at: str = field(default_factory=lambda: datetime.now().strftime('%Y.%m.%d %H:%M:%S.%f'))
@@ -24,49 +38,213 @@ class MatchResult:
     def name(self) -> str:
         return f'{self.left_name} -> {self.right_name} ({self.created_at})'
 
+    @property
+    def stage_counts(self) -> Dict[MatchStage, int]:
+        return dict(Counter(self.stages.values()))
 
-def _distance(s1: str, s2: str) -> int:
-    return distance(_normalize(s1), _normalize(s2))
+    def link(self, left: AnyTrack, right: AnyTrack, stage: MatchStage) -> None:
+        self.found[left] = right
+        self.stages[left] = stage
 
+    def same_pairs(self, other: 'MatchResult') -> bool:
+        return self.found == other.found and self.only_left == other.only_left and self.only_right == other.only_right
+
+
+class MatchMode(str, enum.Enum):
+    SCAN = 'SCAN'
+    INDEXED = 'INDEXED'
+    ASSIGNMENT = 'ASSIGNMENT'
+    PARALLEL = 'PARALLEL'
 
-class TrackMatcher:
-    def __init__(self, match_threshold: int = MATCH_THRESHOLD):
-        self._match_threshold = match_threshold
-
-    def match(self, left: List[Track], right: List[Track]) -> MatchResult:
-        result = MatchResult()
-
-        for idx, t1 in enumerate(left):
-            best_candidate = right[0]
-            best_distance = _distance(t1.title, best_candidate.title)
-            for t2 in right[1:]:
-                new_dist = _distance(t1.title, t2.title)
-                if new_dist > best_distance:
-                    continue
-                best_candidate = t2
-                best_distance = new_dist
-
-            if best_distance <= self._match_threshold:
-                result.found[t1] = best_candidate
-                right.remove(best_candidate)
-            else:
-                logger.debug(
-                    'Pair not found for %s\nBest candidate: %s\nLevenshtein distance=%s',
-                    t1,
-                    best_candidate,
-                    best_distance,
-                )
-                result.only_left.append(t1)
-
-            if not right:
-                result.only_left.extend(left[idx + 1 :])
-                break
 
-        result.only_right = right
+class ExactKey(str, enum.Enum):
+    NONE = 'NONE'
+    TITLE = 'TITLE'
+    TITLE_ARTIST = 'TITLE_ARTIST'
 
-        return result
 
+Pairs = Dict[int, int]
+Step = Callable[[List[AnyTrack], List[AnyTrack]], Pairs]
 
-def _normalize(raw: str) -> str:
-    replaced = raw.lower().replace('remastered', '').replace('remaster', '').strip()
-    return ''.join(r for r in replaced if r.isalpha() or r.isdigit())
+
+@dataclass(frozen=True)
+class MatchOptions:
+    threshold: int = MATCH_THRESHOLD
+    mode: MatchMode = MatchMode.INDEXED
+    exact_key: ExactKey = ExactKey.TITLE_ARTIST
+    weights: FieldWeights = FieldWeights()
+    parallel: ParallelOptions = ParallelOptions()
+
+
+class TrackMatcher:
+    def __init__(self, options: MatchOptions = MatchOptions(), identities: Optional[IdentityStore] = None):
+        self._match_threshold = options.threshold
+        self._mode = options.mode
+        self._exact_key = options.exact_key
+        self._weights = options.weights
+        self._parallel = options.parallel
+        self._identities = identities
+
+    def match(self, left: Sequence[AnyTrack], right: Sequence[AnyTrack]) -> MatchResult:
+        """Pair tracks stage by stage, every stage gets only tracks left unpaired by the previous ones."""
+        stages: Dict[int, Tuple[int, MatchStage]] = {}
+        for stage, step in self._steps():
+            taken = {right_idx for right_idx, _ in stages.values()}
+            rest_left = [i for i in range(len(left)) if i not in stages]
+            rest_right = [j for j in range(len(right)) if j not in taken]
+            if not rest_left or not rest_right:
+                break
+            pairs = step([left[i] for i in rest_left], [right[j] for j in rest_right])
+            stages.update({rest_left[i]: (rest_right[j], stage) for i, j in pairs.items()})
+
+        return _to_result(left, right, stages)
+
+    def _steps(self) -> List[Tuple[MatchStage, Step]]:
+        steps: List[Tuple[MatchStage, Step]] = []
+        if self._identities is not None:
+            steps.append((MatchStage.IDENTITY, self._match_identity))
+        steps.append((MatchStage.ISRC, self._match_isrc))
+        if self._exact_key is not ExactKey.NONE:
+            steps.append((MatchStage.EXACT, self._match_exact))
+        steps.append((MatchStage.FUZZY, self._match_fuzzy))
+        return steps
+
+    def remember(self, pairs: Iterable[Tuple[AnyTrack, AnyTrack]]) -> None:
+        """Save confirmed pairs, so next matches will pair these tracks right away."""
+        if self._identities is not None:
+            self._identities.add_many(pairs)
+
+    def _match_identity(self, left: List[AnyTrack], right: List[AnyTrack]) -> Pairs:
+        identities = self._identities
+        if identities is None:
+            return {}
+        by_id = {track_id(track): right_idx for right_idx, track in enumerate(right)}
+
+        pairs = {}
+        for left_idx, track in enumerate(left):
+            known = identities.get(track)
+            if known is not None and known in by_id:
+                pairs[left_idx] = by_id.pop(known)
+        return pairs
+
+    @staticmethod
+    def _match_isrc(left: List[AnyTrack], right: List[AnyTrack]) -> Pairs:
+        """Hash join on ISRC for tracks which have it, ties go to the latest right track."""
+        by_isrc: Dict[str, List[int]] = defaultdict(list)
+        for right_idx, track in enumerate(right):
+            if track.isrc:
+                by_isrc[track.isrc.upper()].append(right_idx)
+
+        pairs = {}
+        for left_idx, track in enumerate(left):
+            free = by_isrc.get(track.isrc.upper()) if track.isrc else None
+            if free:
+                pairs[left_idx] = free.pop()
+        return pairs
+
+    def _exact_key_of(self, track: AnyTrack) -> Tuple[str, ...]:
+        keys = track.keys
+        if self._exact_key is ExactKey.TITLE:
+            return (keys.title,)
+        return keys.title, keys.artists[0] if keys.artists else ''
+
+    def _match_exact(self, left: List[AnyTrack], right: List[AnyTrack]) -> Pairs:
+        """Hash join on normalized keys, ties go to the latest right track like in the fuzzy stage."""
+        by_key: Dict[Tuple[str, ...], List[int]] = defaultdict(list)
+        for right_idx, track in enumerate(right):
+            by_key[self._exact_key_of(track)].append(right_idx)
+
+        pairs = {}
+        for left_idx, track in enumerate(left):
+            free = by_key.get(self._exact_key_of(track))
+            if free:
+                pairs[left_idx] = free.pop()
+        return pairs
+
+    def _match_fuzzy(self, left: List[AnyTrack], right: List[AnyTrack]) -> Pairs:
+        if self._mode is MatchMode.SCAN:
+            return self._match_scan(left, right)
+        if self._mode is MatchMode.ASSIGNMENT:
+            return self._match_assignment(left, right)
+        if self._mode is MatchMode.PARALLEL:
+            return match_parallel(
+                left=[t.keys for t in left],
+                right=[t.keys for t in right],
+                threshold=self._match_threshold,
+                weights=self._weights,
+                options=self._parallel,
+            )
+        return match_indexed(
+            left_keys=[t.keys.title for t in left],
+            right_keys=[t.keys.title for t in right],
+            threshold=self._match_threshold,
+            penalty=self._penalty(left, right),
+        )
+
+    def _penalty(self, left: List[AnyTrack], right: List[AnyTrack]) -> Optional[Penalty]:
+        if not self._weights:
+            return None
+        return lambda i, j: self._weights.penalty(left[i].keys, right[j].keys)
+
+    def _score(self, t1: AnyTrack, t2: AnyTrack) -> int:
+        return composite_score(t1.keys, t2.keys, self._weights, self._match_threshold)
+
+    def _match_assignment(self, left: List[AnyTrack], right: List[AnyTrack]) -> Pairs:
+        """Globally optimal pairing, tracks are put in a canonical order first to make ties order independent."""
+        left_order = sorted(range(len(left)), key=lambda i: (left[i].keys.title, left[i].external_id))
+        right_order = sorted(range(len(right)), key=lambda j: (right[j].keys.title, right[j].external_id))
+        left_sorted, right_sorted = [left[i] for i in left_order], [right[j] for j in right_order]
+        pairs = match_assignment(
+            left_keys=[t.keys.title for t in left_sorted],
+            right_keys=[t.keys.title for t in right_sorted],
+            threshold=self._match_threshold,
+            penalty=self._penalty(left_sorted, right_sorted),
+        )
+        return {left_order[i]: right_order[j] for i, j in pairs.items()}
+
+    def _match_scan(self, left: List[AnyTrack], right: List[AnyTrack]) -> Pairs:
+        """Reference implementation: compare every left track with every remaining right one."""
+        pairs = {}
+        free = list(range(len(right)))
+
+        for left_idx, track in enumerate(left):
+            if not free:
+                break
+
+            best_idx, best_score = self._best_candidate(track, right, free)
+            if best_score <= self._match_threshold:
+                pairs[left_idx] = best_idx
+                free.remove(best_idx)
+            else:
+                logger.debug('Pair not found for %s\nBest candidate: %s\nScore=%s', track, right[best_idx], best_score)
+
+        return pairs
+
+    def _best_candidate(self, track: AnyTrack, right: List[AnyTrack], free: List[int]) -> Tuple[int, int]:
+        """Free right position with the lowest score for <track> and the score, ties go to the latest one."""
+        best_idx = free[0]
+        best_score = self._score(track, right[best_idx])
+        for right_idx in free[1:]:
+            new_score = self._score(track, right[right_idx])
+            if new_score > best_score:
+                continue
+            best_idx = right_idx
+            best_score = new_score
+        return best_idx, best_score
+
+
+def _to_result(
+    left: Sequence[AnyTrack], right: Sequence[AnyTrack], stages: Dict[int, Tuple[int, MatchStage]]
+) -> MatchResult:
+    result = MatchResult()
+    for left_idx, track in enumerate(left):
+        if left_idx in stages:
+            right_idx, stage = stages[left_idx]
+            result.link(track, right[right_idx], stage)
+        else:
+            result.only_left.append(track)
+
+    taken = {right_idx for right_idx, _ in stages.values()}
+    result.only_right = [t for right_idx, t in enumerate(right) if right_idx not in taken]
+    logger.debug('Matched by stages: %s, not found: %s', result.stage_counts, len(result.only_left))
+    return result
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from Levenshtein import distance
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from playlist_organizer.matching.distance import Penalty
+
+WORD_SIZE = 64
+BATCH_CELLS = 1 << 20
+_ONE = np.uint64(1)
+
+
+def distance_matrix(left_keys: Sequence[str], right_keys: Sequence[str], cap: int) -> np.ndarray:
+    """Levenshtein distances between all left and right keys, values above <cap> are clipped to <cap>.
+
+    Runs bit-parallel Myers/Hyyrö algorithm for a batch of equally long left keys against all right keys
+    at once: every left key is a bit mask per character, every right character is one vectorized step.
+    Pairs with lengths differing by <cap> or more are clipped without computing anything, keys longer
+    than a machine word fall back to a plain distance call.
+    """
+    result = np.full((len(left_keys), len(right_keys)), cap, dtype=np.int32)
+    if not left_keys or not right_keys:
+        return result
+
+    right = _EncodedKeys(right_keys, set(''.join(left_keys)))
+    for length, indices in _group_by_length(left_keys).items():
+        columns = np.flatnonzero(np.abs(right.lengths - length) < cap)
+        if len(columns):
+            result[np.ix_(np.array(indices), columns)] = right.distances([left_keys[i] for i in indices], columns, cap)
+
+    return result
+
+
+class _EncodedKeys:
+    """Keys as rows of character codes padded to the longest one, with the alphabet of both sides."""
+
+    def __init__(self, keys: Sequence[str], other_chars: Set[str]) -> None:
+        self._keys = keys
+        self.alphabet = {c: code for code, c in enumerate(sorted(other_chars | set(''.join(keys))))}
+        self.lengths = np.array([len(k) for k in keys], dtype=np.int32)
+        self.codes = np.full((len(keys), max(int(self.lengths.max()), 1)), len(self.alphabet), dtype=np.int32)
+        for idx, key in enumerate(keys):
+            self.codes[idx, : len(key)] = [self.alphabet[c] for c in key]
+
+    def distances(self, patterns: List[str], columns: np.ndarray, cap: int) -> np.ndarray:
+        """Distances of equally long <patterns> to keys at <columns>, clipped to <cap>."""
+        length = len(patterns[0])
+        if length == 0:
+            return np.tile(self.lengths[columns], (len(patterns), 1))
+        if length > WORD_SIZE:
+            return np.minimum([[distance(p, self._keys[j]) for j in columns.tolist()] for p in patterns], cap)
+
+        batch_size = max(BATCH_CELLS // len(columns), 1)
+        codes, lengths = self.codes[columns, : length + cap], self.lengths[columns]
+        batches = [
+            _myers(_pattern_masks(patterns[start : start + batch_size], self.alphabet), length, codes, lengths)
+            for start in range(0, len(patterns), batch_size)
+        ]
+        return np.concatenate(batches).clip(max=cap)
+
+
+def _group_by_length(keys: Sequence[str]) -> Dict[int, List[int]]:
+    by_length: Dict[int, List[int]] = defaultdict(list)
+    for idx, key in enumerate(keys):
+        by_length[len(key)].append(idx)
+    return by_length
+
+
+def _pattern_masks(patterns: List[str], alphabet: Dict[str, int]) -> np.ndarray:
+    """Bit mask of positions of every alphabet character in every pattern."""
+    peq = np.zeros((len(patterns), len(alphabet) + 1), dtype=np.uint64)
+    for row, pattern in enumerate(patterns):
+        for pos, char in enumerate(pattern):
+            peq[row, alphabet[char]] |= _ONE << np.uint64(pos)
+    return peq
+
+
+def _myers(peq: np.ndarray, pattern_len: int, codes: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Edit distances of equally long patterns given by their masks to every text given as padded character codes."""
+    last_bit = _ONE << np.uint64(pattern_len - 1)
+    vp = np.full((len(peq), len(lengths)), ~np.uint64(0) >> np.uint64(WORD_SIZE - pattern_len))
+    vn = np.zeros_like(vp)
+    score = np.full(vp.shape, pattern_len, dtype=np.int32)
+    for pos in range(codes.shape[1]):
+        delta, vp, vn = _myers_step(peq[:, codes[:, pos]], vp, vn, last_bit)
+        score += delta * (pos < lengths)
+
+    return score
+
+
+def _myers_step(
+    eq: np.ndarray, vp: np.ndarray, vn: np.ndarray, last_bit: np.uint64
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Advance all patterns by one text character, returns the score change and the new vertical deltas."""
+    xv = eq | vn
+    xh = ((eq & vp) + vp) ^ vp | eq
+    hp = vn | ~(xh | vp)
+    hn = vp & xh
+    delta = (hp & last_bit != 0).astype(np.int32) - (hn & last_bit != 0)
+    hp = (hp << _ONE) | _ONE
+    return delta, (hn << _ONE) | ~(xv | hp), hp & xv
+
+
+def match_assignment(
+    left_keys: Sequence[str], right_keys: Sequence[str], threshold: int, penalty: Optional[Penalty] = None
+) -> Dict[int, int]:
+    """Pair keys by a minimum total score assignment among pairs within <threshold>.
+
+    Score is the keys distance plus <penalty> for the pair of positions, if given.
+
+    Pairs count goes first: every additional pair is cheaper than any distance saving. Keys are sorted
+    before solving, so the result does not depend on the input order. The assignment is solved
+    independently for every connected group of keys which are within the threshold from each other.
+    """
+    left_order = sorted(range(len(left_keys)), key=lambda i: left_keys[i])
+    right_order = sorted(range(len(right_keys)), key=lambda j: right_keys[j])
+    costs = distance_matrix([left_keys[i] for i in left_order], [right_keys[j] for j in right_order], threshold + 1)
+
+    rows, cols = np.nonzero(costs <= threshold)
+    if rows.size and penalty is not None:
+        penalties = (penalty(left_order[i], right_order[j]) for i, j in zip(rows.tolist(), cols.tolist()))
+        costs[rows, cols] += np.fromiter(penalties, dtype=costs.dtype, count=rows.size)
+        rows, cols = np.nonzero(costs <= threshold)
+    if rows.size == 0:
+        return {}
+
+    return {left_order[row]: right_order[col] for row, col in _assign(costs, rows, cols, threshold)}
+
+
+def _assign(costs: np.ndarray, rows: np.ndarray, cols: np.ndarray, threshold: int) -> Iterator[Tuple[int, int]]:
+    """Minimum score assignment within <threshold>, solved for every connected group of <rows> and <cols> pairs."""
+    for group_rows, group_cols in _components(rows, cols, costs.shape):
+        group = costs[np.ix_(group_rows, group_cols)].astype(np.int64)
+        forbidden = group > threshold
+        group[forbidden] = (threshold + 1) * min(group.shape) + 1
+
+        for row, col in zip(*linear_sum_assignment(group)):
+            if not forbidden[row, col]:
+                yield group_rows[row], group_cols[col]
+
+
+def _components(rows: np.ndarray, cols: np.ndarray, shape: Tuple[int, ...]) -> Iterator[Tuple[List[int], List[int]]]:
+    """Rows and columns of every connected group of (row, col) pairs."""
+    left_count = shape[0]
+    graph = coo_matrix((np.ones(len(rows)), (rows, cols + left_count)), shape=(left_count + shape[1],) * 2)
+    _, labels = connected_components(graph, directed=False)
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for node in np.unique(np.concatenate([rows, cols + left_count])):
+        groups[labels[node]].append(node)
+    for nodes in groups.values():
+        yield [n for n in nodes if n < left_count], [n - left_count for n in nodes if n >= left_count]
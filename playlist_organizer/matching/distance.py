@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+from Levenshtein import distance
+
+from playlist_organizer.client.track import TrackKeys
+
+Penalty = Callable[[int, int], int]
+
+
+def bounded_distance(s1: str, s2: str, cutoff: int) -> int:
+    """Levenshtein distance between <s1> and <s2>, or <cutoff> + 1 as soon as it is known to be above.
+
+    Lengths difference is a lower bound of the distance, so such pairs are rejected for free,
+    the rest are computed in a band around the diagonal which is dropped once it exceeds the cutoff.
+    """
+    if abs(len(s1) - len(s2)) > cutoff:
+        return cutoff + 1
+    return distance(s1, s2, score_cutoff=cutoff)
+
+
+@dataclass(frozen=True)
+class FieldWeights:
+    """Extra score, in title edit distance units, added when artists or albums of two tracks differ."""
+
+    artist: int = 0
+    album: int = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.artist or self.album)
+
+    def penalty(self, left: TrackKeys, right: TrackKeys) -> int:
+        penalty = 0
+        if self.artist and not set(left.artists) & set(right.artists):
+            penalty += self.artist
+        if self.album and left.album != right.album:
+            penalty += self.album
+        return penalty
+
+
+def composite_score(left: TrackKeys, right: TrackKeys, weights: FieldWeights, threshold: int) -> int:
+    """Fields penalty plus title distance, or <threshold> + 1 if the sum is above the threshold.
+
+    Cheap fields go first: title distance is not computed at all when they already exceed the threshold
+    and is bounded by the rest of the threshold otherwise.
+    """
+    penalty = weights.penalty(left, right)
+    if penalty > threshold:
+        return threshold + 1
+    return penalty + bounded_distance(left.title, right.title, threshold - penalty)
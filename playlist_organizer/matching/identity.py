@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+import logging
+import pathlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from playlist_organizer.client.track import AnyTrack, Platform
+
+logger = logging.getLogger(__name__)
+IDENTITIES_PATH = pathlib.Path(__file__).parent / 'identities.json'
+
+TrackId = Tuple[Platform, str]
+
+
+def track_id(track: AnyTrack) -> TrackId:
+    return track.source, track.external_id
+
+
+class IdentityStore:
+    """Confirmed pairs of the same track on different platforms, kept in a json file between runs."""
+
+    def __init__(self, path: pathlib.Path = IDENTITIES_PATH) -> None:
+        self._path = path
+        self._pairs: Optional[Dict[TrackId, TrackId]] = None
+
+    def get(self, track: AnyTrack) -> Optional[TrackId]:
+        return self._loaded.get(track_id(track))
+
+    def add(self, left: AnyTrack, right: AnyTrack) -> None:
+        self.add_many([(left, right)])
+
+    def add_many(self, pairs: Iterable[Tuple[AnyTrack, AnyTrack]]) -> None:
+        changed = False
+        for left, right in pairs:
+            left_id, right_id = track_id(left), track_id(right)
+            if self._loaded.get(left_id) == right_id:
+                continue
+            for stale in (self._loaded.pop(left_id, None), self._loaded.pop(right_id, None)):
+                if stale is not None:
+                    self._loaded.pop(stale, None)
+            self._loaded[left_id], self._loaded[right_id] = right_id, left_id
+            changed = True
+
+        if changed:
+            self._dump()
+
+    @property
+    def _loaded(self) -> Dict[TrackId, TrackId]:
+        if self._pairs is None:
+            self._pairs = self._load()
+        return self._pairs
+
+    def _load(self) -> Dict[TrackId, TrackId]:
+        if not self._path.exists():
+            return {}
+
+        pairs: Dict[TrackId, TrackId] = {}
+        with self._path.open() as f:
+            try:
+                for left_source, left_id, right_source, right_id in json.load(f):
+                    left, right = (Platform(left_source), left_id), (Platform(right_source), right_id)
+                    pairs[left], pairs[right] = right, left
+            except (ValueError, TypeError):
+                logger.warning('Broken identities file %s, starting from scratch', self._path)
+                return {}
+
+        logger.debug('Loaded %s track identities from %s', len(pairs) // 2, self._path)
+        return pairs
+
+    def _dump(self) -> None:
+        rows: List[Tuple[str, str, str, str]] = [
+            (left[0].value, left[1], right[0].value, right[1]) for left, right in self._loaded.items() if left < right
+        ]
+        tmp_path = self._path.with_suffix('.tmp')
+        with tmp_path.open('w') as f:
+            json.dump(sorted(rows), f, ensure_ascii=False, indent=4)
+        tmp_path.replace(self._path)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from playlist_organizer.matching.distance import Penalty, bounded_distance
+
+Segment = Tuple[int, int]
+
+
+class SegmentIndex:
+    """Inverted index over normalized titles split into <threshold + 1> segments.
+
+    A single edit touches at most one segment, so a key within Levenshtein distance k from the query
+    keeps at least one of its k + 1 segments intact, and the query contains it shifted by at most k
+    positions (pigeonhole principle). Candidates are looked up by those substrings only, they still
+    have to be checked with a real distance.
+    """
+
+    def __init__(self, keys: Iterable[str], threshold: int) -> None:
+        self._threshold = threshold
+        self._keys: List[str] = []
+        self._segments: Dict[Tuple[int, int, str], List[int]] = defaultdict(list)
+        self._by_length: Dict[int, List[int]] = defaultdict(list)
+
+        for key_id, key in enumerate(keys):
+            self._keys.append(key)
+            self._by_length[len(key)].append(key_id)
+            for segment_no, (start, size) in enumerate(self._partition(len(key))):
+                self._segments[len(key), segment_no, key[start : start + size]].append(key_id)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def key(self, key_id: int) -> str:
+        return self._keys[key_id]
+
+    def candidates(self, query: str) -> Set[int]:
+        """Return ids of all keys which may be within the threshold distance from <query>."""
+        found: Set[int] = set()
+        for length in range(max(len(query) - self._threshold, 0), len(query) + self._threshold + 1):
+            if length in self._by_length:
+                found.update(self._candidates_of_length(query, length))
+        return found
+
+    def _candidates_of_length(self, query: str, length: int) -> Iterable[int]:
+        partition = self._partition(length)
+        if partition[0][1] == 0:
+            # keys shorter than the segment count have empty segments matching anything
+            return self._by_length[length]
+
+        found: Set[int] = set()
+        for segment_no, (start, size) in enumerate(partition):
+            # the intact segment is shifted by at most <threshold> positions in the query
+            for pos in range(max(start - self._threshold, 0), min(start + self._threshold, len(query) - size) + 1):
+                found.update(self._segments.get((length, segment_no, query[pos : pos + size]), ()))
+        return found
+
+    def _partition(self, length: int) -> List[Segment]:
+        """Split <length> into <threshold + 1> (start, size) segments, longer ones go last."""
+        count = self._threshold + 1
+        short_size, longer = divmod(length, count)
+        segments, start = [], 0
+        for segment_no in range(count):
+            size = short_size + (segment_no >= count - longer)
+            segments.append((start, size))
+            start += size
+        return segments
+
+
+def match_indexed(
+    left_keys: Sequence[str], right_keys: Sequence[str], threshold: int, penalty: Optional[Penalty] = None
+) -> Dict[int, int]:
+    """Greedily pair normalized keys exactly like the full scan does, but look only at indexed candidates.
+
+    Left keys are processed in order, each one takes the free right key with the lowest score within
+    <threshold>, ties go to the latest right key. Score is the keys distance plus <penalty> for the
+    pair of positions, if given. Returns mapping of left positions to right positions.
+    """
+    pool = _RightPool(right_keys, threshold, penalty)
+    pairs: Dict[int, int] = {}
+    for left_position, left_key in enumerate(left_keys):
+        position = pool.take_best(left_position, left_key)
+        if position is not None:
+            pairs[left_position] = position
+    return pairs
+
+
+class _RightPool:
+    """Right keys not paired yet, indexed by their unique values."""
+
+    def __init__(self, right_keys: Sequence[str], threshold: int, penalty: Optional[Penalty]) -> None:
+        self._threshold = threshold
+        self._penalty = penalty
+        unique_keys: Dict[str, int] = {}
+        self._free: List[List[int]] = []  # free right positions per unique key, ascending
+        for position, key in enumerate(right_keys):
+            key_id = unique_keys.setdefault(key, len(unique_keys))
+            if key_id == len(self._free):
+                self._free.append([])
+            self._free[key_id].append(position)
+        self._index = SegmentIndex(unique_keys, threshold)
+
+    def take_best(self, left_position: int, left_key: str) -> Optional[int]:
+        """Remove and return the free right position with the lowest score for the left key, if any is close."""
+        best, best_score = -1, (self._threshold, 0)
+        for key_id in self._index.candidates(left_key):
+            score = self._score(left_position, left_key, key_id)
+            if score is not None and (best < 0 or score < best_score):
+                best, best_score = key_id, score
+
+        if best < 0:
+            return None
+        position = -best_score[1]
+        self._free[best].remove(position)
+        return position
+
+    def _score(self, left_position: int, left_key: str, key_id: int) -> Optional[Tuple[int, int]]:
+        """Score of the best free position of a right key and the negated position, None if it is too far."""
+        if not self._free[key_id]:
+            return None
+
+        extra, position = 0, self._free[key_id][-1]
+        if self._penalty is not None:
+            extra, negated = min((self._penalty(left_position, p), -p) for p in self._free[key_id])
+            position = -negated
+            if extra > self._threshold:
+                return None
+
+        score = extra + bounded_distance(left_key, self._index.key(key_id), self._threshold - extra)
+        return (score, -position) if score <= self._threshold else None
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from playlist_organizer.client.track import TrackKeys
+from playlist_organizer.matching.distance import FieldWeights, bounded_distance
+from playlist_organizer.matching.index import SegmentIndex
+
+Candidates = List[Tuple[int, int]]  # (score, -right position), best first
+
+_WORKER: Dict[str, CandidateFinder] = {}
+
+
+@dataclass(frozen=True)
+class ParallelOptions:
+    workers: Optional[int] = None  # os.cpu_count() by default
+    chunk_size: int = 1000
+
+
+class CandidateFinder:
+    """All right tracks within the threshold from a left one, ordered the way the greedy matcher prefers them."""
+
+    def __init__(self, right: Sequence[TrackKeys], threshold: int, weights: FieldWeights) -> None:
+        self._right = right
+        self._threshold = threshold
+        self._weights = weights
+
+        positions: Dict[str, List[int]] = defaultdict(list)
+        for position, keys in enumerate(right):
+            positions[keys.title].append(position)
+        self._positions = list(positions.values())
+        self._index = SegmentIndex(positions, threshold)
+
+    def find(self, left: TrackKeys) -> Candidates:
+        found: Candidates = []
+        for key_id in self._index.candidates(left.title):
+            positions = self._positions[key_id]
+            penalties = [self._weights.penalty(left, self._right[p]) for p in positions] if self._weights else None
+            lowest = min(penalties) if penalties else 0
+            if lowest > self._threshold:
+                continue
+
+            distance = bounded_distance(left.title, self._index.key(key_id), self._threshold - lowest)
+            if distance + lowest > self._threshold:
+                continue
+            if penalties is None:
+                found.extend((distance, -p) for p in positions)
+            else:
+                found.extend((distance + penalty, -p) for penalty, p in zip(penalties, positions))
+        found.sort()
+        return [candidate for candidate in found if candidate[0] <= self._threshold]
+
+
+def _init_worker(right: Sequence[TrackKeys], threshold: int, weights: FieldWeights) -> None:
+    _WORKER['finder'] = CandidateFinder(right, threshold, weights)
+
+
+def _find_chunk(chunk: Sequence[TrackKeys]) -> List[Candidates]:
+    finder = _WORKER['finder']
+    return [finder.find(keys) for keys in chunk]
+
+
+def match_parallel(
+    left: Sequence[TrackKeys],
+    right: Sequence[TrackKeys],
+    threshold: int,
+    weights: FieldWeights,
+    options: ParallelOptions,
+) -> Dict[int, int]:
+    """Same pairs as the greedy matcher, but candidates of left chunks are searched in a process pool.
+
+    Workers get only normalized keys: right ones once at start, left ones chunk by chunk. Each worker
+    returns every candidate within the threshold, so conflicts are resolved afterwards in left order:
+    a left track takes its best candidate not taken by earlier tracks yet.
+    """
+    pairs: Dict[int, int] = {}
+    taken = set()
+    for left_position, found in enumerate(_find_candidates(left, right, threshold, weights, options)):
+        for _, position in found:
+            if -position not in taken:
+                taken.add(-position)
+                pairs[left_position] = -position
+                break
+    return pairs
+
+
+def _find_candidates(
+    left: Sequence[TrackKeys],
+    right: Sequence[TrackKeys],
+    threshold: int,
+    weights: FieldWeights,
+    options: ParallelOptions,
+) -> List[Candidates]:
+    chunks = [left[start : start + options.chunk_size] for start in range(0, len(left), options.chunk_size)]
+    if len(chunks) <= 1 or options.workers == 1:
+        finder = CandidateFinder(right, threshold, weights)
+        return [finder.find(keys) for keys in left]
+
+    with ProcessPoolExecutor(
+        max_workers=options.workers,
+        initializer=_init_worker,
+        initargs=(list(right), threshold, weights),
+    ) as pool:
+        return [found for chunk_found in pool.map(_find_chunk, chunks) for found in chunk_found]
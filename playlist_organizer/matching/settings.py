@@ -0,0 +1,34 @@
+from typing import Optional
+
+from pydantic import BaseSettings
+
+from playlist_organizer.matcher import MATCH_THRESHOLD, ExactKey, MatchMode, MatchOptions
+from playlist_organizer.matching.distance import FieldWeights
+from playlist_organizer.matching.parallel import ParallelOptions
+
+
+class MatcherSettings(BaseSettings):
+    threshold: int = MATCH_THRESHOLD
+    mode: MatchMode = MatchMode.INDEXED
+    exact_key: ExactKey = ExactKey.TITLE_ARTIST
+
+    # extra score, in title edit distance units, when artists or albums differ
+    artist_weight: int = 0
+    album_weight: int = 0
+
+    # process pool of the PARALLEL mode, os.cpu_count() workers by default
+    workers: Optional[int] = None
+    chunk_size: int = ParallelOptions.chunk_size
+
+    @property
+    def options(self) -> MatchOptions:
+        return MatchOptions(
+            threshold=self.threshold,
+            mode=self.mode,
+            exact_key=self.exact_key,
+            weights=FieldWeights(artist=self.artist_weight, album=self.album_weight),
+            parallel=ParallelOptions(workers=self.workers, chunk_size=self.chunk_size),
+        )
+
+    class Config:
+        env_prefix = 'MATCHER_'
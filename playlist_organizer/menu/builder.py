@@ -3,17 +3,21 @@ from __future__ import annotations
 import enum
 import logging
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import typer
 from inquirer.render import ConsoleRender
 from inquirer.themes import GreenPassion, term
 
-from playlist_organizer.client.base import IPlatformClient, Track
+from playlist_organizer.client.base import BaseClient, IPlatformClient, Track
 from playlist_organizer.client.deezer.client import DeezerClient
 from playlist_organizer.client.spotify.client import SpotifyClient
-from playlist_organizer.matcher import MatchResult, TrackMatcher
-from playlist_organizer.menu.render import MAX_LEN, choose_from_inquirer_list, render_matches
+from playlist_organizer.client.store import LibraryStore
+from playlist_organizer.client.track import AnyTrack
+from playlist_organizer.library import LibraryMatcher
+from playlist_organizer.matcher import MatchResult, MatchStage, TrackMatcher
+from playlist_organizer.menu.render import MAX_LEN, choose_from_inquirer_list, render_matches, render_overlaps
+from playlist_organizer.menu.store import local_library_choices
 from playlist_organizer.utils import Stack, pprint_json
 
 MenuAction = Callable[[], None]
@@ -55,18 +59,26 @@ class TopLevelMenu(str, enum.Enum):
     DEEZER = 'Deezer'
     SPOTIFY = 'Spotify'
     MATCH_PLAYLISTS = 'Match playlist tracks'
+    MATCH_LIBRARY = 'Match whole library'
+    LOCAL_LIBRARY = 'Local library'
 
 
 class DeezerOptions(str, enum.Enum):
     AUTH = 'Authentication'
     USER_INFO = 'User info'
     PLAYLIST_INFO = 'Playlist info'
+    REFRESH_PLAYLISTS = 'Refresh playlists'
+    INVALIDATE_CACHE = 'Forget cached playlists'
+    NETWORK_USAGE = 'Network usage'
 
 
 class SpotifyOptions(str, enum.Enum):
     AUTH = 'Authentication'
     USER_INFO = 'User info'
     PLAYLIST_INFO = 'Playlist info'
+    REFRESH_PLAYLISTS = 'Refresh playlists'
+    INVALIDATE_CACHE = 'Forget cached playlists'
+    NETWORK_USAGE = 'Network usage'
 
 
 class Menu:
@@ -75,10 +87,12 @@ class Menu:
         deezer_client: DeezerClient,
         spotify_client: SpotifyClient,
         track_matcher: TrackMatcher,
+        store: Optional[LibraryStore] = None,
     ) -> None:
         self._deezer_client = deezer_client
         self._spotify_client = spotify_client
         self._track_matcher = track_matcher
+        self._store = store
         self._matches: List[MatchResult] = []
 
     @property
@@ -89,6 +103,9 @@ class Menu:
                 DeezerOptions.AUTH: lambda: _(self._deezer_client.token),
                 DeezerOptions.USER_INFO: lambda: pprint_json(self._deezer_client.user_info, fg='white'),
                 DeezerOptions.PLAYLIST_INFO: lambda: _playlist_tracks(self._deezer_client),
+                DeezerOptions.REFRESH_PLAYLISTS: lambda: _refresh_playlists(self._deezer_client),
+                DeezerOptions.INVALIDATE_CACHE: lambda: _refresh_playlists(self._deezer_client, forget_cached=True),
+                DeezerOptions.NETWORK_USAGE: lambda: typer.secho(str(self._deezer_client.wire_stats), fg='white'),
             },
         )
         spotify_menu = MenuItem(
@@ -97,16 +114,24 @@ class Menu:
                 SpotifyOptions.AUTH: lambda: _(self._spotify_client.token),
                 SpotifyOptions.USER_INFO: lambda: typer.secho(str(self._spotify_client.current_user), fg='white'),
                 SpotifyOptions.PLAYLIST_INFO: lambda: _playlist_tracks(self._spotify_client),
+                SpotifyOptions.REFRESH_PLAYLISTS: lambda: _refresh_playlists(self._spotify_client),
+                SpotifyOptions.INVALIDATE_CACHE: lambda: _refresh_playlists(self._spotify_client, forget_cached=True),
+                SpotifyOptions.NETWORK_USAGE: lambda: typer.secho(str(self._spotify_client.wire_stats), fg='white'),
             },
         )
-        return MenuItem(
-            title='What to do?',
-            choices={
-                TopLevelMenu.DEEZER: deezer_menu,
-                TopLevelMenu.SPOTIFY: spotify_menu,
-                TopLevelMenu.MATCH_PLAYLISTS: self._match_playlists,
-            },
-        )
+        choices: Dict[str, Union[MenuAction, MenuItem]] = {
+            TopLevelMenu.DEEZER: deezer_menu,
+            TopLevelMenu.SPOTIFY: spotify_menu,
+            TopLevelMenu.MATCH_PLAYLISTS: self._match_playlists,
+            TopLevelMenu.MATCH_LIBRARY: self._match_library,
+        }
+        if self._store is not None:
+            library_menu: MenuItem = MenuItem(
+                title='What to look up?',
+                choices=dict(local_library_choices(self._store, self._deezer_client, self._spotify_client)),
+            )
+            choices[TopLevelMenu.LOCAL_LIBRARY] = library_menu
+        return MenuItem(title='What to do?', choices=choices)
 
     def run_menu_loop(self) -> None:  # pylint: disable=R0915 R0914
         _exit = 'EXIT'
@@ -167,10 +192,15 @@ class Menu:
         spotify_name, spotify_tracks = _get_playlist_tracks(
             self._spotify_client, message='Choose playlist from Spotify'
         )
-        matches = self._track_matcher.match(deezer_tracks, spotify_tracks)
+        matches = self._track_matcher.match(self._deezer_client.with_isrc(deezer_tracks), spotify_tracks)
         matches.left_name, matches.right_name = deezer_name, spotify_name
         self._matches.append(matches)
 
+    def _match_library(self) -> None:
+        library = LibraryMatcher(self._deezer_client, self._spotify_client, self._track_matcher, self._store).match()
+        render_overlaps(library.overlaps)
+        self._matches.append(library.tracks)
+
     def _create_playlist_copy(self, matches: MatchResult) -> None:
         render_matches(matches)
         typer.secho('Not implemented yet', bg='white')
@@ -179,26 +209,38 @@ class Menu:
         deezer_track = _choose_track('Which one from Deezer?', matches.only_left)
         spotify_track = _choose_track('Which one from Spotify?', matches.only_right)
 
-        matches.found[deezer_track] = spotify_track
+        matches.link(deezer_track, spotify_track, MatchStage.MANUAL)
+        self._track_matcher.remember([(deezer_track, spotify_track)])
         matches.only_left.remove(deezer_track)
         matches.only_right.remove(spotify_track)
 
 
-def _choose_track(title: str, track_list: List[Track]) -> Track:
+def _choose_track(title: str, track_list: List[AnyTrack]) -> AnyTrack:
     track_names = [track.to_brief_str(MAX_LEN - 3) for track in track_list]
     idx = choose_from_inquirer_list(title, track_names)
     return track_list[idx]
 
 
 def _playlist_tracks(client: IPlatformClient[Any]) -> None:
-    _, tracks = _get_playlist_tracks(client, 'Which one?')
-    typer.secho(f'Tracks total: {len(tracks)}', fg='green')
-    for t in tracks:
+    _, playlist_id = _choose_playlist(client, 'Which one?')
+    total = 0
+    for total, t in enumerate(client.iter_playlist_tracks(playlist_id), start=1):
         typer.secho(str(t), fg='white')
+    typer.secho(f'Tracks total: {total}', fg='green')
 
 
 def _get_playlist_tracks(client: IPlatformClient[Any], message: str) -> Tuple[str, List[Track]]:
-    playlist_names = client.get_playlist_names()
-    idx = choose_from_inquirer_list(message, items=playlist_names)
-    target = playlist_names[idx]
-    return target, client.get_playlist_tracks(target)
+    label, playlist_id = _choose_playlist(client, message)
+    return label, client.get_playlist_tracks_by_id(playlist_id)
+
+
+def _choose_playlist(client: IPlatformClient[Any], message: str) -> Tuple[str, str]:
+    catalog = client.get_playlist_catalog()
+    playlists = catalog.entries
+    idx = choose_from_inquirer_list(message, items=[catalog.label(p) for p in playlists])
+    return catalog.label(playlists[idx]), playlists[idx].id
+
+
+def _refresh_playlists(client: BaseClient[Any], forget_cached: bool = False) -> None:
+    changed = client.refresh_playlist_catalog(forget_cached)
+    typer.secho(f'Playlists changed since last fetch: {len(changed)}', fg='green')
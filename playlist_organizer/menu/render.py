@@ -1,4 +1,4 @@
-from typing import List, Optional, TypeVar
+from typing import List, Optional, Sequence, TypeVar
 
 import inquirer
 import typer
@@ -6,7 +6,8 @@ from colorclass import Color
 from inquirer.render import ConsoleRender
 from terminaltables import AsciiTable
 
-from playlist_organizer.client.base import Track
+from playlist_organizer.client.track import AnyTrack
+from playlist_organizer.library import PlaylistOverlap
 from playlist_organizer.matcher import MatchResult
 
 T = TypeVar('T')
@@ -22,12 +23,27 @@ def render_matches(match_result: MatchResult) -> None:
     table_body = [[d.to_brief_str(MAX_LEN), s.to_brief_str(MAX_LEN)] for d, s in match_result.found.items()]
     found = AsciiTable(table_headers + table_body)
     typer.secho(found.table)
+    if match_result.stages:
+        stages = ', '.join(f'{stage.value.lower()}: {count}' for stage, count in match_result.stage_counts.items())
+        typer.secho(f'Matched by {stages}', fg='green')
 
     _render_single('Deezer only', match_result.only_left)
     _render_single('Spotify only', match_result.only_right)
 
 
-def _render_single(title: str, tracks: List[Track]) -> None:
+def render_overlaps(overlaps: List[PlaylistOverlap]) -> None:
+    if not overlaps:
+        typer.secho('No common tracks found', fg='yellow')
+        return
+    headers = ['Deezer', 'Spotify', 'Common', 'Deezer only', 'Spotify only']
+    table_headers = [[_c(h, color='automagenta') for h in headers]]
+    table_body = [
+        [o.left_name, o.right_name, str(o.common), str(len(o.only_left)), str(len(o.only_right))] for o in overlaps
+    ]
+    typer.secho(AsciiTable(table_headers + table_body).table)
+
+
+def _render_single(title: str, tracks: Sequence[AnyTrack]) -> None:
     if not tracks:
         return
     header = [[_c(title, color='automagenta')]]
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import enum
+from datetime import datetime, timedelta
+from typing import Callable, Dict
+
+import typer
+
+from playlist_organizer.client.deezer.client import DeezerClient
+from playlist_organizer.client.spotify.client import SpotifyClient
+from playlist_organizer.client.store import LibraryQueries, LibraryStore
+from playlist_organizer.menu.render import MAX_LEN, choose_from_inquirer_list
+
+
+class LocalLibraryOptions(str, enum.Enum):
+    SYNC = 'Sync local library'
+    FIND_TRACK = 'Find track in playlists'
+    RECENTLY_ADDED = 'Recently added tracks'
+
+
+def local_library_choices(
+    store: LibraryStore, deezer_client: DeezerClient, spotify_client: SpotifyClient
+) -> Dict[str, Callable[[], None]]:
+    queries = LibraryQueries(store)
+    return {
+        LocalLibraryOptions.SYNC: lambda: _sync(store, deezer_client, spotify_client),
+        LocalLibraryOptions.FIND_TRACK: lambda: _find_track(queries),
+        LocalLibraryOptions.RECENTLY_ADDED: lambda: _recently_added(queries),
+    }
+
+
+def _sync(store: LibraryStore, deezer_client: DeezerClient, spotify_client: SpotifyClient) -> None:
+    deezer_changed = store.sync(deezer_client, enrich=deezer_client.with_isrc)
+    spotify_changed = store.sync(spotify_client)
+    typer.secho(
+        f'Playlists synced: {len(deezer_changed)} from Deezer, {len(spotify_changed)} from Spotify', fg='green'
+    )
+
+
+def _find_track(queries: LibraryQueries) -> None:
+    title = typer.prompt('Title')
+    artist = typer.prompt('Artist', default='')
+    tracks = queries.search(title, artist)
+    if not tracks:
+        typer.secho('Nothing found, is the local library synced?', fg='yellow')
+        return
+
+    idx = choose_from_inquirer_list('Which one?', [t.to_brief_str(MAX_LEN - 3) for t in tracks])
+    for platform, entry in queries.containing(tracks[idx]):
+        typer.secho(f'{platform.value}: {entry.name}', fg='white')
+
+
+def _recently_added(queries: LibraryQueries) -> None:
+    days = typer.prompt('Added during last days', default=30, type=int)
+    added = queries.added_between(datetime.now() - timedelta(days=days))
+    for entry, track in added:
+        typer.secho(f'{entry.name}: {track}', fg='white')
+    typer.secho(f'Tracks total: {len(added)}', fg='green')
@@ -1,6 +1,7 @@
 import json
 from urllib.parse import parse_qs, urlparse
 
+import httpx
 import pytest
 
 from playlist_organizer.client.auth.base import BaseAuthenticator
@@ -34,3 +35,43 @@ def responses(httpx_mock, json_responses):
     for response in json_responses:
         httpx_mock.add_response(json=response)
     return httpx_mock
+
+
+@pytest.fixture()
+def anyio_backend():
+    return 'asyncio'
+
+
+def deezer_pages(items, page_size, with_total=True, hidden=()):
+    """pytest-httpx callback serving <items> by `index`, like Deezer does, items at <hidden> positions are left out."""
+
+    def callback(request):
+        index = int(get_qs(str(request.url)).get('index', ['0'])[0])
+        data = [item for i, item in enumerate(items[index : index + page_size], index) if i not in hidden]
+        body = {'data': data}
+        if with_total:
+            body['total'] = len(items)
+        if index + page_size < len(items):
+            body['next'] = f'{request.url.copy_with(query=None)}?index={index + page_size}'
+        return httpx.Response(200, json=body)
+
+    return callback
+
+
+def spotify_pages(items, page_size):
+    """pytest-httpx callback serving <items> by `offset`, like Spotify does."""
+
+    def callback(request):
+        offset = int(get_qs(str(request.url)).get('offset', ['0'])[0])
+        body = {
+            'href': str(request.url),
+            'items': items[offset : offset + page_size],
+            'limit': page_size,
+            'offset': offset,
+            'total': len(items),
+            'previous': None,
+            'next': str(request.url) if offset + page_size < len(items) else None,
+        }
+        return httpx.Response(200, json=body)
+
+    return callback
@@ -0,0 +1,102 @@
+import os
+from datetime import datetime
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from playlist_organizer.client.base import Platform, Track
+from playlist_organizer.client.cache import PlaylistCache
+from playlist_organizer.client.deezer.client import DeezerClient
+from playlist_organizer.client.deezer.settings import DeezerSettings
+
+
+def _tracks(*titles):
+    return [
+        Track(
+            artists=['a'],
+            album='b',
+            title=title,
+            added_at=datetime(2020, 1, 1),
+            source=Platform.DEEZER,
+            external_id=title,
+            isrc='X',
+        )
+        for title in titles
+    ]
+
+
+@pytest.fixture()
+def cache(tmp_path):
+    return PlaylistCache(tmp_path / 'cache', max_entries=2)
+
+
+def test_get_put(cache):
+    assert cache.get(Platform.DEEZER, '1', 'v1') is None
+
+    cache.put(Platform.DEEZER, '1', 'v1', _tracks('x', 'y'))
+
+    assert cache.get(Platform.DEEZER, '1', 'v1') == _tracks('x', 'y')
+    assert cache.get(Platform.DEEZER, '1', 'v2') is None
+    assert cache.get(Platform.SPOTIFY, '1', 'v1') is None
+
+
+def test_broken_entry(cache, tmp_path):
+    cache.put(Platform.SPOTIFY, 'abc', 'v1', _tracks('x'))
+    (file,) = (tmp_path / 'cache').iterdir()
+    file.write_text('{"version": "v1", "tracks": [{}]}')
+
+    assert cache.get(Platform.SPOTIFY, 'abc', 'v1') is None
+    assert not file.exists()
+
+
+def test_evicts_least_recently_used(cache, tmp_path):
+    for i, playlist_id in enumerate(['1', '2']):
+        cache.put(Platform.DEEZER, playlist_id, 'v', _tracks(playlist_id))
+        os.utime(tmp_path / 'cache' / f'deezer-{playlist_id}.json', (i, i))
+    cache.get(Platform.DEEZER, '1', 'v')
+
+    cache.put(Platform.DEEZER, '3', 'v', _tracks('3'))
+
+    assert cache.get(Platform.DEEZER, '2', 'v') is None
+    assert cache.get(Platform.DEEZER, '1', 'v') is not None
+    assert cache.get(Platform.DEEZER, '3', 'v') is not None
+
+
+def test_invalidate(tmp_path):
+    cache = PlaylistCache(tmp_path)
+    cache.put(Platform.DEEZER, '1', 'v', _tracks('1'))
+    cache.put(Platform.DEEZER, '2', 'v', _tracks('2'))
+    cache.put(Platform.SPOTIFY, '1', 'v', _tracks('1'))
+
+    assert cache.invalidate(Platform.DEEZER, '1') == 1
+    assert cache.invalidate(Platform.DEEZER) == 1
+    assert cache.get(Platform.SPOTIFY, '1', 'v') is not None
+    assert cache.invalidate() == 1
+
+
+@pytest.mark.parametrize(
+    'response_filenames',
+    [('deezer_playlists_1.json', 'deezer_playlists_2.json')],
+    indirect=True,
+)
+def test_client_skips_unchanged_playlist(cache, authenticator, responses: HTTPXMock, json_responses):
+    settings = DeezerSettings(api_host='https://dummy')
+    playlist = json_responses[0]['data'][0]
+    cached = _tracks('cached')
+    cache.put(Platform.DEEZER, playlist['id'], playlist['checksum'], cached)
+
+    client = DeezerClient(settings=settings, authenticator=authenticator, cache=cache)
+
+    assert client.get_playlist_tracks(playlist['title']) == cached
+    assert not any('tracks' in str(r.url) for r in responses.get_requests())
+
+    client.refresh_playlist_catalog(forget_cached=True)
+    assert cache.get(Platform.DEEZER, playlist['id'], playlist['checksum']) is None
+
+
+def test_isrc_kept_aside_from_entries(cache):
+    cache.put_isrc(Platform.DEEZER, {'1': 'GBF087000290'})
+
+    assert cache.invalidate() == 0
+    assert cache.get_isrc(Platform.DEEZER) == {'1': 'GBF087000290'}
+    assert cache.get_isrc(Platform.SPOTIFY) == {}
@@ -0,0 +1,73 @@
+import pytest
+
+from playlist_organizer.client.catalog import PlaylistCatalog, PlaylistEntry
+from playlist_organizer.client.deezer.client import DeezerClient
+from playlist_organizer.client.deezer.entities import Playlist
+from playlist_organizer.client.deezer.settings import DeezerSettings
+
+
+@pytest.fixture()
+def catalog():
+    return PlaylistCatalog(
+        [
+            PlaylistEntry(id='1', name='rock', version='a'),
+            PlaylistEntry(id='2', name='jazz', version='b'),
+            PlaylistEntry(id='3', name='rock', version='c'),
+        ]
+    )
+
+
+def test_lookups(catalog):
+    assert catalog.names == ['rock', 'jazz', 'rock']
+    assert catalog.by_id('3').version == 'c'
+    assert catalog.by_name('jazz').id == '2'
+    assert catalog.by_id('2').version == 'b'
+    assert '1' in catalog and '4' not in catalog
+
+
+def test_missing_and_ambiguous(catalog):
+    with pytest.raises(ValueError, match='not found'):
+        catalog.by_id('4')
+    with pytest.raises(ValueError, match='not found'):
+        catalog.by_name('pop')
+    with pytest.raises(ValueError, match='address them by id'):
+        catalog.by_name('rock')
+
+
+def test_labels(catalog):
+    assert [catalog.label(e) for e in catalog.entries] == ['rock [1]', 'jazz', 'rock [3]']
+
+
+def test_update(catalog):
+    changed = catalog.update(
+        [
+            PlaylistEntry(id='1', name='rock', version='a'),
+            PlaylistEntry(id='2', name='jazz', version='b2'),
+            PlaylistEntry(id='4', name='pop', version='d'),
+        ]
+    )
+
+    assert changed == {'2', '3', '4'}
+    assert catalog.by_name('rock').id == '1'
+    assert len(catalog) == 3
+
+
+def test_refresh_drops_only_changed_playlists(authenticator, mocker):
+    client = DeezerClient(settings=DeezerSettings(api_host='https://dummy'), authenticator=authenticator)
+    client.get_playlist_list = mocker.MagicMock(
+        return_value=[Playlist(id='1', title='rock', checksum='a'), Playlist(id='2', title='jazz', checksum='b')]
+    )
+    client._fetch_playlist_tracks = mocker.MagicMock(return_value=[])
+    assert client.get_playlist_names() == ['rock', 'jazz']
+
+    for playlist_id in (None, '1', '2'):
+        client._listings.put((client._listing(playlist_id), 200), [])
+    client.get_playlist_list.return_value = [
+        Playlist(id='1', title='rock', checksum='a'),
+        Playlist(id='2', title='jazz', checksum='b2'),
+    ]
+
+    assert client.refresh_playlist_catalog() == {'2'}
+    assert client._listings.get((client._listing('1'), 200)) == []
+    assert len(client._listings) == 1
+    assert client._playlist_version('2') == 'b2'
@@ -0,0 +1,101 @@
+import copy
+from datetime import timedelta
+
+import httpx
+import pytest
+import tekore as tk
+from pytest_httpx import HTTPXMock
+
+from playlist_organizer.client.base import Platform
+from playlist_organizer.client.checkpoint import PaginationCheckpoints
+from playlist_organizer.client.deezer.client import DeezerClient
+from playlist_organizer.client.deezer.settings import DeezerSettings
+from playlist_organizer.client.spotify.client import SpotifyClient
+from playlist_organizer.client.spotify.settings import SpotifySettings
+from tests.test_client.conftest import deezer_pages, get_qs, spotify_pages
+
+
+@pytest.fixture()
+def checkpoints(tmp_path):
+    return PaginationCheckpoints(tmp_path)
+
+
+def test_resume_same_version(checkpoints):
+    checkpoints.open(Platform.DEEZER, 'listing', 'v1').add('page', {'data': [1]})
+
+    assert checkpoints.open(Platform.DEEZER, 'listing', 'v1').get('page') == {'data': [1]}
+    assert checkpoints.open(Platform.SPOTIFY, 'listing', 'v1').get('page') is None
+    assert checkpoints.open(Platform.DEEZER, 'listing', 'v2').get('page') is None
+    assert checkpoints.open(Platform.DEEZER, 'listing', 'v1').get('page') is None
+
+
+def test_expired(tmp_path):
+    PaginationCheckpoints(tmp_path).open(Platform.DEEZER, 'listing').add('page', {})
+
+    assert PaginationCheckpoints(tmp_path, max_age=timedelta(0)).open(Platform.DEEZER, 'listing').get('page') is None
+
+
+def test_done(checkpoints, tmp_path):
+    checkpoint = checkpoints.open(Platform.DEEZER, 'listing')
+    checkpoint.add('page', {})
+    checkpoint.done()
+
+    assert not list(tmp_path.iterdir())
+
+
+def _failing_once(callback, param, value):
+    """Wrap pytest-httpx <callback> to fail the first request with <param> = <value>."""
+    failed = []
+
+    def wrapper(request):
+        if get_qs(str(request.url)).get(param) == [str(value)] and not failed:
+            failed.append(request)
+            return httpx.Response(500)
+        return callback(request)
+
+    return wrapper
+
+
+def test_deezer_resumes_interrupted_listing(checkpoints, authenticator, httpx_mock: HTTPXMock, tmp_path):
+    settings = DeezerSettings(api_host='https://dummy', page_concurrency=1)
+    playlists = [{'id': str(i), 'title': f'playlist{i}'} for i in range(23)]
+    httpx_mock.add_callback(_failing_once(deezer_pages(playlists, page_size=5), 'index', 15))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        DeezerClient(settings=settings, authenticator=authenticator, checkpoints=checkpoints).get_playlist_names()
+    interrupted = len(httpx_mock.get_requests())
+
+    client = DeezerClient(settings=settings, authenticator=authenticator, checkpoints=checkpoints)
+    assert client.get_playlist_names() == [p['title'] for p in playlists]
+
+    indices = [get_qs(str(r.url)).get('index', ['0'])[0] for r in httpx_mock.get_requests()[interrupted:]]
+    assert indices == ['15']
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize('response_filenames', [('spotify_playlists_1.json',)], indirect=True)
+def test_spotify_resumes_interrupted_listing(
+    checkpoints, authenticator, httpx_mock: HTTPXMock, json_responses, mocker
+):
+    playlists = []
+    for i in range(13):
+        playlist = copy.deepcopy(json_responses[0]['items'][0])
+        playlist['id'], playlist['name'] = f'id{i}', f'playlist{i}'
+        playlists.append(playlist)
+    httpx_mock.add_callback(_failing_once(spotify_pages(playlists, page_size=5), 'offset', 5))
+    authenticator.token = 'token'
+
+    def client():
+        spotify_client = SpotifyClient(
+            settings=SpotifySettings(), authenticator=authenticator, checkpoints=checkpoints
+        )
+        spotify_client.__dict__['current_user'] = mocker.MagicMock(id='user')
+        return spotify_client
+
+    with pytest.raises(tk.HTTPError):
+        client().get_playlist_names()
+    interrupted = len(httpx_mock.get_requests())
+
+    assert client().get_playlist_names() == [p['name'] for p in playlists]
+    offsets = [get_qs(str(r.url))['offset'][0] for r in httpx_mock.get_requests()[interrupted:]]
+    assert offsets == ['5', '10']
@@ -1,12 +1,17 @@
+import re
+from datetime import datetime
 from uuid import uuid4
 
+import httpx
 import pytest
 from pytest_httpx import HTTPXMock
 
+from playlist_organizer.client.base import Platform, Track
+from playlist_organizer.client.cache import PlaylistCache
 from playlist_organizer.client.deezer.client import DeezerClient
 from playlist_organizer.client.deezer.entities import Playlist
 from playlist_organizer.client.deezer.settings import DeezerSettings
-from tests.test_client.conftest import get_qs
+from tests.test_client.conftest import deezer_pages, get_qs
 
 
 @pytest.fixture()
@@ -75,3 +80,121 @@ def test_get_playlist_tracks(client, responses: HTTPXMock, mocker, json_response
     expected_qs = get_qs(json_responses[0]['next'])
     actual_qs = get_qs(str(responses.get_requests()[1].url))
     assert expected_qs['index'] == actual_qs['index']
+
+
+def test_with_isrc(client, httpx_mock: HTTPXMock):
+    tracks = [
+        Track(artists=['a'], album='b', title='c', added_at=datetime.now(), source=Platform.DEEZER, external_id='1'),
+        Track(
+            artists=['a'],
+            album='b',
+            title='d',
+            added_at=datetime.now(),
+            source=Platform.DEEZER,
+            external_id='2',
+            isrc='X',
+        ),
+        Track(artists=['a'], album='b', title='e', added_at=datetime.now(), source=Platform.DEEZER, external_id='3'),
+    ]
+    httpx_mock.add_response(url=re.compile(r'https://dummy/track/1\?.*'), json={'id': 1, 'isrc': 'GBF087000290'})
+    httpx_mock.add_response(url=re.compile(r'https://dummy/track/3\?.*'), status_code=500)
+
+    assert [t.isrc for t in client.with_isrc(tracks)] == ['GBF087000290', 'X', None]
+    assert len(httpx_mock.get_requests()) == 2
+
+
+def test_with_isrc_failed_lookups(client, httpx_mock: HTTPXMock):
+    tracks = [
+        Track(
+            artists=['a'], album='b', title=str(i), added_at=datetime.now(), source=Platform.DEEZER, external_id=str(i)
+        )
+        for i in range(3)
+    ]
+    httpx_mock.add_exception(httpx.ConnectError('Connection refused'), url=re.compile(r'https://dummy/track/0\?.*'))
+    httpx_mock.add_response(url=re.compile(r'https://dummy/track/1\?.*'), content=b'<html>Bad gateway</html>')
+    httpx_mock.add_response(url=re.compile(r'https://dummy/track/2\?.*'), json={'id': 2, 'isrc': 'GBF087000290'})
+
+    assert [t.isrc for t in client.with_isrc(tracks)] == [None, None, 'GBF087000290']
+
+
+@pytest.mark.parametrize('with_total', [True, False])
+def test_pages_keep_playlist_order(client, httpx_mock: HTTPXMock, with_total):
+    playlists = [{'id': str(i), 'title': f'playlist{i}'} for i in range(23)]
+    httpx_mock.add_callback(deezer_pages(playlists, page_size=5, with_total=with_total))
+
+    assert client.get_playlist_names() == [p['title'] for p in playlists]
+    assert len(httpx_mock.get_requests()) == 5
+
+
+def test_short_pages_keep_offsets(client, httpx_mock: HTTPXMock):
+    playlists = [{'id': str(i), 'title': f'playlist{i}'} for i in range(23)]
+    httpx_mock.add_callback(deezer_pages(playlists, page_size=5, hidden={1, 2, 7}))
+
+    assert client.get_playlist_names() == [p['title'] for i, p in enumerate(playlists) if i not in {1, 2, 7}]
+    assert len(httpx_mock.get_requests()) == 5
+
+
+def test_iter_playlist_tracks_streams_pages(client, httpx_mock: HTTPXMock):
+    tracks = [
+        {'id': i, 'title': f't{i}', 'time_add': 0, 'album': {'id': 1, 'title': 'b'}, 'artist': {'id': 1, 'name': 'a'}}
+        for i in range(30)
+    ]
+    httpx_mock.add_callback(deezer_pages(tracks, page_size=2))
+
+    stream = client.iter_playlist_tracks('1')
+    assert next(stream).title == 't0'
+    assert len(httpx_mock.get_requests()) == 1
+
+    assert [t.title for t in stream] == [t['title'] for t in tracks[1:]]
+    assert len(httpx_mock.get_requests()) == 15
+
+
+@pytest.mark.parametrize(
+    'response_filenames',
+    [('deezer_playlist_tracks_1.json', 'deezer_playlist_tracks_2.json')],
+    indirect=True,
+)
+def test_fast_parsing_same_as_strict(settings, authenticator, httpx_mock: HTTPXMock, json_responses):
+    tracks = {}
+    for strict in (True, False):
+        for response in json_responses:
+            httpx_mock.add_response(json=response)
+        settings.strict_parsing = strict
+        client = DeezerClient(settings=settings, authenticator=authenticator)
+        tracks[strict] = client.get_playlist_tracks_by_id('5432')
+
+    assert len(tracks[True]) == 4
+    assert tracks[False] == tracks[True]
+
+
+def test_pages_decoded_once(client, httpx_mock: HTTPXMock, mocker):
+    tracks = [
+        {'id': i, 'title': f't{i}', 'time_add': 0, 'album': {'id': 1, 'title': 'b'}, 'artist': {'id': 1, 'name': 'a'}}
+        for i in range(30)
+    ]
+    httpx_mock.add_callback(deezer_pages(tracks, page_size=10))
+    decode = mocker.spy(httpx.Response, 'json')
+
+    assert len(client.get_playlist_tracks_by_id('1')) == 30
+    assert decode.call_count == len(httpx_mock.get_requests()) == 3
+
+
+def test_fast_parsing_rejects_unexpected_page(client, httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json={'data': [{'id': 1, 'title': 'no artist'}]})
+
+    with pytest.raises(ValueError, match='strict parsing'):
+        client.get_playlist_tracks_by_id('5432')
+
+
+def test_with_isrc_fetched_once(settings, authenticator, httpx_mock: HTTPXMock, tmp_path):
+    cache = PlaylistCache(tmp_path)
+    tracks = [
+        Track(artists=['a'], album='b', title='c', added_at=datetime.now(), source=Platform.DEEZER, external_id='1')
+    ]
+    httpx_mock.add_response(url=re.compile(r'https://dummy/track/1\?.*'), json={'id': 1, 'isrc': 'GBF087000290'})
+
+    first = DeezerClient(settings=settings, authenticator=authenticator, cache=cache).with_isrc(tracks)
+    second = DeezerClient(settings=settings, authenticator=authenticator, cache=cache).with_isrc(tracks)
+
+    assert [t.isrc for t in first] == [t.isrc for t in second] == ['GBF087000290']
+    assert len(httpx_mock.get_requests()) == 1
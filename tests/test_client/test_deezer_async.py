@@ -0,0 +1,102 @@
+from uuid import uuid4
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from playlist_organizer.client.deezer.async_client import AsyncDeezerClient
+from playlist_organizer.client.deezer.settings import DeezerSettings
+from tests.test_client.conftest import deezer_pages, get_qs
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+def settings():
+    return DeezerSettings(api_host='https://dummy', max_connections=3)
+
+
+@pytest.fixture()
+async def client(settings, authenticator):
+    async with AsyncDeezerClient(settings=settings, authenticator=authenticator) as client:
+        yield client
+
+
+@pytest.mark.parametrize(
+    'response_filenames',
+    [('deezer_playlists_1.json', 'deezer_playlists_2.json')],
+    indirect=True,
+)
+async def test_get_playlist_names(client, responses: HTTPXMock, json_responses):
+    assert await client.get_playlist_names() == ['playlist1', 'playlist2', 'playlist3', 'playlist4']
+    assert await client.get_playlist_names() == ['playlist1', 'playlist2', 'playlist3', 'playlist4']
+
+    requests = responses.get_requests()
+    assert len(requests) == 2
+    assert get_qs(json_responses[0]['next'])['index'] == get_qs(str(requests[1].url))['index']
+
+
+@pytest.mark.parametrize(
+    'response_filenames',
+    [('deezer_playlist_tracks_1.json', 'deezer_playlist_tracks_2.json')],
+    indirect=True,
+)
+async def test_get_playlist_tracks(client, responses: HTTPXMock, mocker):
+    client._playlist_id_by_name = mocker.AsyncMock(return_value='5432')
+
+    tracks = await client.get_playlist_tracks(str(uuid4()))
+
+    assert [t.title for t in tracks] == [
+        'Highway Star',
+        'Pictures Of Home (Remastered 2012)',
+        'Burn (Remastered 2004)',
+        'Lazy',
+    ]
+    assert all('5432' in str(r.url) for r in responses.get_requests())
+
+
+async def test_shared_http_client_is_not_closed(settings, authenticator):
+    async with httpx.AsyncClient() as http:
+        async with AsyncDeezerClient(settings=settings, authenticator=authenticator, http=http):
+            pass
+        assert not http.is_closed
+
+
+async def test_shared_http_client_brings_own_transport(settings, authenticator, mocker):
+    create_transport = mocker.patch('playlist_organizer.client.base.create_async_transport')
+    async with httpx.AsyncClient() as http:
+        async with AsyncDeezerClient(settings=settings, authenticator=authenticator, http=http) as client:
+            assert client.wire_stats.responses == 0
+
+    create_transport.assert_not_called()
+
+
+def test_pool_limits():
+    limits = DeezerSettings(max_connections=3, max_keepalive_connections=2, keepalive_expiry=5).limits
+    assert (limits.max_connections, limits.max_keepalive_connections, limits.keepalive_expiry) == (3, 2, 5)
+
+
+@pytest.mark.parametrize('with_total', [True, False])
+async def test_pages_keep_playlist_order(client, httpx_mock: HTTPXMock, with_total):
+    playlists = [{'id': str(i), 'title': f'playlist{i}'} for i in range(23)]
+    httpx_mock.add_callback(deezer_pages(playlists, page_size=5, with_total=with_total))
+
+    assert await client.get_playlist_names() == [p['title'] for p in playlists]
+    assert len(httpx_mock.get_requests()) == 5
+
+
+async def test_short_pages_keep_offsets(client, httpx_mock: HTTPXMock):
+    playlists = [{'id': str(i), 'title': f'playlist{i}'} for i in range(23)]
+    httpx_mock.add_callback(deezer_pages(playlists, page_size=5, hidden={1, 2, 7}))
+
+    assert await client.get_playlist_names() == [p['title'] for i, p in enumerate(playlists) if i not in {1, 2, 7}]
+    assert len(httpx_mock.get_requests()) == 5
+
+
+async def test_duplicate_names_need_an_id(client, httpx_mock: HTTPXMock):
+    playlists = [{'id': '1', 'title': 'same'}, {'id': '2', 'title': 'same'}, {'id': '3', 'title': 'other'}]
+    httpx_mock.add_callback(deezer_pages(playlists, page_size=5))
+
+    assert await client._playlist_id_by_name('other') == '3'
+    with pytest.raises(ValueError, match='address them by id'):
+        await client._playlist_id_by_name('same')
@@ -0,0 +1,39 @@
+import pytest
+
+from benchmarks.clients import measure
+from benchmarks.fake_api import FakeApiOptions, FakeLibrary, parse_fields, project
+from playlist_organizer.client.base import Platform
+from playlist_organizer.client.spotify.entities import PLAYLIST_ITEM_FIELDS
+
+OPTIONS = FakeApiOptions(playlists=3, tracks=25, page_size=10, latency=0, throttle_rate=0.2, seed=1)
+
+
+@pytest.mark.parametrize(
+    'platform, pages',
+    [
+        # playlists, then 3 pages per playlist
+        (Platform.DEEZER, 1 + 3 * 3),
+        # current user, playlists, then 3 pages per playlist
+        (Platform.SPOTIFY, 2 + 3 * 3),
+    ],
+)
+def test_client_loads_fake_library(platform, pages):
+    run = measure(platform, OPTIONS, page_concurrency=2)
+
+    assert run.playlists == 3
+    assert run.tracks == 3 * 25
+    assert run.throttled > 0
+    assert run.requests == pages + run.throttled
+    assert run.wire.responses == run.requests
+    assert run.wire.wire_bytes < run.wire.decoded_bytes
+
+
+def test_projection():
+    items = FakeLibrary(OPTIONS).spotify_items(0)
+    page = project({'total': 25, 'href': 'x', 'items': items[:1]}, parse_fields(PLAYLIST_ITEM_FIELDS))
+
+    assert page['total'] == 25
+    assert 'href' not in page
+    assert set(page['items'][0]) == {'added_at', 'track'}
+    assert page['items'][0]['track']['artists'] == [{'name': items[0]['track']['artists'][0]['name']}]
+    assert page['items'][0]['track']['external_ids'] == {'isrc': 'QZ0000000000'}
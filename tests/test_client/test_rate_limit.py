@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from playlist_organizer.client.deezer.client import is_quota_exceeded
+from playlist_organizer.client.rate_limit import (
+    AsyncRateLimitedTransport,
+    RateLimit,
+    RateLimitedTransport,
+    RateLimiter,
+)
+
+URL = 'https://dummy/resource'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _response(status_code=200, **kwargs):
+    return httpx.Response(status_code, request=httpx.Request('GET', URL), **kwargs)
+
+
+def test_token_bucket():
+    clock = Clock()
+    limiter = RateLimiter(RateLimit(rate=2, burst=2), clock=clock)
+
+    assert [limiter.reserve() for _ in range(4)] == [0, 0, 0.5, 1.0]
+
+    clock.now += 10
+    assert limiter.reserve() == 0
+
+
+@pytest.mark.parametrize(
+    'retry_after, expected',
+    [
+        (lambda: '3', 3),
+        (
+            lambda: format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True),
+            pytest.approx(30, abs=2),
+        ),
+    ],
+)
+def test_retry_after_pauses_bucket(retry_after, expected):
+    clock = Clock()
+    limiter = RateLimiter(RateLimit(rate=100, burst=10), clock=clock)
+
+    assert limiter.retry_delay(_response(429, headers={'Retry-After': retry_after()}), attempt=0) == expected
+    assert limiter.reserve() == expected
+
+
+def test_jittered_backoff():
+    limiter = RateLimiter(RateLimit(rate=1, burst=1, max_retries=3, backoff=1, max_backoff=3))
+
+    assert 0 <= limiter.retry_delay(_response(503), attempt=0) <= 1
+    assert 0 <= limiter.retry_delay(_response(503), attempt=2) <= 3
+    assert limiter.retry_delay(_response(503), attempt=3) is None
+    assert limiter.retry_delay(_response(500), attempt=0) is None
+
+
+def test_deezer_quota_exceeded():
+    assert is_quota_exceeded(_response(json={'error': {'code': 4, 'message': 'Quota limit exceeded'}}))
+    assert is_quota_exceeded(_response(429))
+    assert not is_quota_exceeded(_response(json={'error': {'code': 800}}))
+    assert not is_quota_exceeded(_response(json=[1]))
+    assert not is_quota_exceeded(_response(text='not json'))
+
+
+def test_deezer_quota_check_skips_pages(mocker):
+    decode = mocker.spy(httpx.Response, 'json')
+
+    assert not is_quota_exceeded(_response(json={'data': [{'id': 1, 'title': 'Highway Star'}], 'total': 1}))
+    decode.assert_not_called()
+    assert not is_quota_exceeded(_response(500, text='Internal error'))
+
+
+@pytest.fixture()
+def limiter():
+    return RateLimiter(RateLimit(rate=1000, burst=10, max_retries=2, backoff=0.01), throttled=is_quota_exceeded)
+
+
+def _replay(*responses):
+    """Inner transport answering with <responses> in turn and recording requests."""
+    requests, queue = [], list(responses)
+
+    def handler(request):
+        requests.append(request)
+        return queue.pop(0) if len(queue) > 1 else queue[0]
+
+    return httpx.MockTransport(handler), requests
+
+
+def test_transport_retries(limiter):
+    inner, requests = _replay(
+        httpx.Response(429, headers={'Retry-After': '0'}),
+        httpx.Response(200, json={'error': {'code': 4}}),
+        httpx.Response(200, json={'data': []}),
+    )
+
+    with httpx.Client(transport=RateLimitedTransport(limiter, inner)) as http:
+        assert http.get(URL).json() == {'data': []}
+    assert len(requests) == 3
+
+
+def test_transport_gives_up(limiter):
+    inner, requests = _replay(httpx.Response(429))
+
+    with httpx.Client(transport=RateLimitedTransport(limiter, inner)) as http:
+        assert http.get(URL).status_code == 429
+    assert len(requests) == 3
+
+
+@pytest.mark.anyio
+async def test_async_transport_retries(limiter):
+    inner, requests = _replay(httpx.Response(503), httpx.Response(200, json={'data': []}))
+
+    async with httpx.AsyncClient(transport=AsyncRateLimitedTransport(limiter, inner)) as http:
+        assert (await http.get(URL)).json() == {'data': []}
+    assert len(requests) == 2
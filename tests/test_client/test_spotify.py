@@ -5,7 +5,9 @@ import pytest
 from pytest_httpx import HTTPXMock
 
 from playlist_organizer.client.spotify.client import SpotifyClient
+from playlist_organizer.client.spotify.entities import PLAYLIST_ITEM_FIELDS
 from playlist_organizer.client.spotify.settings import SpotifySettings
+from tests.test_client.conftest import get_qs
 
 
 @pytest.fixture()
@@ -72,3 +74,40 @@ def test_get_playlist_tracks(client, responses: HTTPXMock, mocker, json_response
     assert len(tracks) == 4
     expected_titles = {'Маленький', 'Прыгаю-стою', 'Black Sheep', 'Caravane'}
     assert {t.title for t in tracks} == expected_titles
+
+
+@pytest.mark.parametrize(
+    'response_filenames',
+    [('spotify_playlist_tracks_1.json', 'spotify_playlist_tracks_2.json')],
+    indirect=True,
+)
+@pytest.mark.parametrize('project_fields', [True, False])
+def test_get_playlist_tracks_projection(settings, authenticator, responses: HTTPXMock, mocker, project_fields):
+    settings.project_fields = project_fields
+    client = SpotifyClient(settings=settings, authenticator=authenticator)
+    client._playlist_id_by_name = mocker.MagicMock(return_value=str(uuid4()))
+
+    tracks = client.get_playlist_tracks('any')
+
+    assert {t.title for t in tracks} == {'Маленький', 'Прыгаю-стою', 'Black Sheep', 'Caravane'}
+    fields = [get_qs(str(r.url)).get('fields') for r in responses.get_requests()]
+    assert fields == ([[PLAYLIST_ITEM_FIELDS]] * 2 if project_fields else [None] * 2)
+
+
+@pytest.mark.parametrize(
+    'response_filenames',
+    [('spotify_playlist_tracks_1.json', 'spotify_playlist_tracks_2.json')],
+    indirect=True,
+)
+def test_iter_playlist_tracks(client, responses: HTTPXMock):
+    stream = client.iter_playlist_tracks('5432')
+    next(stream)
+    assert len(responses.get_requests()) == 1
+
+    assert len(list(stream)) == 3
+    assert len(responses.get_requests()) == 2
+
+    tracks = client.get_playlist_tracks_by_id('5432')
+    requests = len(responses.get_requests())
+    assert [t.title for t in client.iter_playlist_tracks('5432')] == [t.title for t in tracks]
+    assert len(responses.get_requests()) == requests
@@ -0,0 +1,106 @@
+import copy
+from uuid import uuid4
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from playlist_organizer.client.spotify.async_client import AsyncSpotifyClient
+from playlist_organizer.client.spotify.settings import SpotifySettings
+from tests.test_client.conftest import get_qs, spotify_pages
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+def settings():
+    return SpotifySettings(api_host='https://dummy', page_concurrency=2)
+
+
+@pytest.fixture()
+async def client(settings, authenticator, mocker):
+    authenticator.token = 'token'
+    async with AsyncSpotifyClient(settings=settings, authenticator=authenticator) as spotify_client:
+        user = mocker.MagicMock()
+        user.id = '12312eqasds2'
+        spotify_client.current_user = mocker.AsyncMock(return_value=user)
+        yield spotify_client
+
+
+@pytest.mark.parametrize(
+    'response_filenames',
+    [('spotify_playlists_1.json', 'spotify_playlists_2.json')],
+    indirect=True,
+)
+async def test_get_playlist_names(client, responses: HTTPXMock):
+    assert await client.get_playlist_names() == ['playlist1', 'playlist2', 'playlist3', 'playlist4']
+    assert await client._playlist_id_by_name('playlist1') == 'playlist1_id'
+
+    requests = responses.get_requests()
+    assert len(requests) == 2
+    assert get_qs(str(requests[1].url))['offset'] == ['2']
+
+
+@pytest.mark.parametrize(
+    'response_filenames',
+    [('spotify_playlist_tracks_1.json', 'spotify_playlist_tracks_2.json')],
+    indirect=True,
+)
+async def test_get_playlist_tracks(client, responses: HTTPXMock, mocker):
+    client._playlist_id_by_name = mocker.AsyncMock(return_value='5432')
+
+    tracks = await client.get_playlist_tracks(str(uuid4()))
+
+    assert {t.title for t in tracks} == {'Маленький', 'Прыгаю-стою', 'Black Sheep', 'Caravane'}
+    assert all('5432' in str(r.url) for r in responses.get_requests())
+
+
+@pytest.mark.parametrize('response_filenames', [('spotify_playlists_1.json',)], indirect=True)
+async def test_pages_keep_playlist_order(client, httpx_mock: HTTPXMock, json_responses):
+    playlists = []
+    for i in range(23):
+        playlist = copy.deepcopy(json_responses[0]['items'][0])
+        playlist['id'], playlist['name'] = f'id{i}', f'playlist{i}'
+        playlists.append(playlist)
+    httpx_mock.add_callback(spotify_pages(playlists, page_size=5))
+
+    assert await client.get_playlist_names() == [p['name'] for p in playlists]
+    offsets = sorted(int(get_qs(str(r.url))['offset'][0]) for r in httpx_mock.get_requests())
+    assert offsets == [0, 5, 10, 15, 20]
+
+
+async def test_shared_http_client_brings_own_transport(settings, authenticator, mocker):
+    create_transport = mocker.patch('playlist_organizer.client.base.create_async_transport')
+    async with httpx.AsyncClient() as http:
+        async with AsyncSpotifyClient(settings=settings, authenticator=authenticator, http=http) as client:
+            assert client.wire_stats.responses == 0
+        assert not http.is_closed
+
+    create_transport.assert_not_called()
+
+
+@pytest.mark.parametrize('response_filenames', [('spotify_playlists_1.json',)], indirect=True)
+async def test_duplicate_names_need_an_id(client, httpx_mock: HTTPXMock, json_responses):
+    playlists = []
+    for playlist_id, name in [('1', 'same'), ('2', 'same'), ('3', 'other')]:
+        playlist = copy.deepcopy(json_responses[0]['items'][0])
+        playlist['id'], playlist['name'] = playlist_id, name
+        playlists.append(playlist)
+    httpx_mock.add_callback(spotify_pages(playlists, page_size=5))
+
+    assert await client._playlist_id_by_name('other') == '3'
+    with pytest.raises(ValueError, match='address them by id'):
+        await client._playlist_id_by_name('same')
+
+
+@pytest.mark.parametrize('response_filenames', [('spotify_playlists_1.json',)], indirect=True)
+async def test_playlist_list_expires(authenticator, mocker, httpx_mock: HTTPXMock, json_responses):
+    settings = SpotifySettings(api_host='https://dummy', listing_cache_ttl=0)
+    httpx_mock.add_callback(spotify_pages(json_responses[0]['items'][:1], page_size=5))
+    async with AsyncSpotifyClient(settings=settings, authenticator=authenticator) as client:
+        client.current_user = mocker.AsyncMock(return_value=mocker.MagicMock(id='user'))
+
+        await client.get_playlist_names()
+        await client.get_playlist_names()
+
+    assert len(httpx_mock.get_requests()) == 2
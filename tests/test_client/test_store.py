@@ -0,0 +1,163 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from playlist_organizer.client.base import Platform, Track
+from playlist_organizer.client.catalog import PlaylistCatalog, PlaylistEntry
+from playlist_organizer.client.store import LibraryQueries, LibraryStore
+
+
+def _track(title, artist, source, external_id, added_at, isrc=None):
+    return Track(
+        artists=[artist],
+        album='Machine Head',
+        title=title,
+        added_at=added_at,
+        source=source,
+        external_id=external_id,
+        isrc=isrc,
+    )
+
+
+def _client(mocker, platform, playlists):
+    """Client with <playlists> as {(id, version): tracks}."""
+    client = mocker.MagicMock()
+    client.platform = platform
+    client.get_playlist_catalog.return_value = PlaylistCatalog(
+        PlaylistEntry(id=i, name=f'name {i}', version=v) for i, v in playlists
+    )
+    tracks = {i: t for (i, _), t in playlists.items()}
+    client.get_playlist_tracks_by_id.side_effect = lambda playlist_id: tracks[playlist_id]
+    return client
+
+
+@pytest.fixture()
+def store(tmp_path):
+    store = LibraryStore(tmp_path / 'library.sqlite3')
+    yield store
+    store.close()
+
+
+@pytest.fixture()
+def deezer_tracks():
+    return [
+        _track('Highway Star', 'Deep Purple', Platform.DEEZER, '1', datetime(2020, 1, 1)),
+        _track('Lazy', 'Deep Purple', Platform.DEEZER, '2', datetime(2020, 2, 1), isrc='GBF087200003'),
+        _track('Burn', 'Deep Purple', Platform.DEEZER, '3', datetime(2021, 1, 1)),
+    ]
+
+
+@pytest.fixture()
+def spotify_tracks():
+    utc = timezone.utc
+    return [
+        _track(
+            'Lazy - Remastered',
+            'Deep Purple',
+            Platform.SPOTIFY,
+            's:1',
+            datetime(2020, 1, 1, tzinfo=utc),
+            'GBF087200003',
+        ),
+        _track('Highway Star', 'Deep Purple', Platform.SPOTIFY, 's:2', datetime(2021, 1, 1, tzinfo=utc)),
+        _track('Child in Time', 'Deep Purple', Platform.SPOTIFY, 's:3', datetime(2022, 1, 1, tzinfo=utc)),
+    ]
+
+
+def test_sync_round_trip(mocker, store, deezer_tracks, spotify_tracks):
+    deezer = _client(mocker, Platform.DEEZER, {('1', 'a'): deezer_tracks, ('2', 'b'): deezer_tracks[:1]})
+    spotify = _client(mocker, Platform.SPOTIFY, {('1', 'a'): spotify_tracks})
+
+    assert store.sync(deezer) == {'1', '2'}
+    assert store.sync(spotify) == {'1'}
+
+    assert store.playlists(Platform.DEEZER) == [PlaylistEntry('1', 'name 1', 'a'), PlaylistEntry('2', 'name 2', 'b')]
+    assert store.playlist_tracks(Platform.DEEZER, '1') == deezer_tracks
+    assert store.playlist_tracks(Platform.SPOTIFY, '1') == spotify_tracks
+    assert store.library(Platform.DEEZER) == {'name 1': deezer_tracks, 'name 2': deezer_tracks[:1]}
+    assert store.db.execute('SELECT COUNT(*) FROM tracks').fetchone()[0] == 6
+
+
+def test_sync_fetches_changed_playlists(mocker, store, deezer_tracks):
+    store.sync(_client(mocker, Platform.DEEZER, {('1', 'a'): deezer_tracks, ('2', 'b'): deezer_tracks[:1]}))
+
+    client = _client(mocker, Platform.DEEZER, {('2', 'c'): deezer_tracks[1:2], ('1', 'a'): deezer_tracks})
+    assert store.sync(client) == {'2'}
+    client.get_playlist_tracks_by_id.assert_called_once_with('2')
+    assert [e.id for e in store.playlists(Platform.DEEZER)] == ['2', '1']
+    assert store.playlist_tracks(Platform.DEEZER, '2') == deezer_tracks[1:2]
+
+    assert store.sync(_client(mocker, Platform.DEEZER, {('2', 'c'): deezer_tracks[1:2]})) == {'1'}
+    assert store.playlist_tracks(Platform.DEEZER, '1') == []
+    assert store.db.execute('SELECT COUNT(*) FROM tracks').fetchone()[0] == 1
+
+
+def test_interrupted_sync_fetches_again(mocker, store, deezer_tracks):
+    client = _client(mocker, Platform.DEEZER, {('1', 'a'): deezer_tracks})
+    client.get_playlist_tracks_by_id.side_effect = RuntimeError
+
+    with pytest.raises(RuntimeError):
+        store.sync(client)
+
+    assert store.sync(_client(mocker, Platform.DEEZER, {('1', 'a'): deezer_tracks})) == {'1'}
+
+
+def test_enrich(mocker, store, deezer_tracks):
+    client = _client(mocker, Platform.DEEZER, {('1', 'a'): deezer_tracks})
+    store.sync(client, enrich=lambda tracks: [t.copy(update={'isrc': 'X'}) for t in tracks])
+
+    assert {t.isrc for t in store.playlist_tracks(Platform.DEEZER, '1')} == {'X'}
+
+
+def test_queries(mocker, store, deezer_tracks, spotify_tracks):
+    store.sync(_client(mocker, Platform.DEEZER, {('1', 'a'): deezer_tracks}))
+    store.sync(_client(mocker, Platform.SPOTIFY, {('1', 'a'): spotify_tracks[:2], ('2', 'b'): spotify_tracks[2:]}))
+    queries = LibraryQueries(store)
+
+    assert queries.search('highway') == [deezer_tracks[0], spotify_tracks[1]]
+    assert queries.search('High-way', artist='deep', platform=Platform.SPOTIFY) == [spotify_tracks[1]]
+    assert queries.search('highway', artist='rainbow') == []
+
+    # by isrc and by normalized title and artist
+    assert queries.containing(deezer_tracks[1]) == [
+        (Platform.DEEZER, PlaylistEntry('1', 'name 1', 'a')),
+        (Platform.SPOTIFY, PlaylistEntry('1', 'name 1', 'a')),
+    ]
+    assert queries.containing(spotify_tracks[2]) == [(Platform.SPOTIFY, PlaylistEntry('2', 'name 2', 'b'))]
+
+    added = queries.added_between(datetime(2020, 12, 1), datetime(2021, 12, 1) + timedelta(days=1))
+    assert sorted(t.external_id for _, t in added) == ['3', 's:2']
+    added = queries.added_between(datetime(2020, 1, 15), platform=Platform.SPOTIFY)
+    assert [t.external_id for _, t in added] == ['s:3', 's:2']
+
+
+def test_outdated_schema_is_rebuilt(tmp_path, mocker, deezer_tracks):
+    store = LibraryStore(tmp_path / 'library.sqlite3')
+    store.sync(_client(mocker, Platform.DEEZER, {('1', 'a'): deezer_tracks}))
+    store.db.execute('PRAGMA user_version = 0')
+    store.close()
+
+    assert store.playlists(Platform.DEEZER) == []
+    store.close()
+
+
+@pytest.fixture()
+def tokyo_time(monkeypatch):
+    monkeypatch.setenv('TZ', 'Asia/Tokyo')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_added_between_off_utc(mocker, store, tokyo_time):
+    added_at = datetime(2021, 1, 1, 0, 30, tzinfo=timezone.utc)
+    spotify_track = _track('Burn', 'Deep Purple', Platform.SPOTIFY, 's:1', added_at.replace(tzinfo=None))
+    deezer_track = _track('Burn', 'Deep Purple', Platform.DEEZER, '1', datetime.fromtimestamp(added_at.timestamp()))
+    store.sync(_client(mocker, Platform.SPOTIFY, {('1', 'a'): [spotify_track]}))
+    store.sync(_client(mocker, Platform.DEEZER, {('1', 'a'): [deezer_track]}))
+
+    added = LibraryQueries(store).added_between(datetime(2021, 1, 1), datetime(2021, 1, 1, 1))
+
+    assert sorted(t.external_id for _, t in added) == ['1', 's:1']
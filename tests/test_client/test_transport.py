@@ -0,0 +1,72 @@
+import gzip
+import json
+
+import httpx
+import pytest
+
+from playlist_organizer.client.deezer.async_client import AsyncDeezerClient
+from playlist_organizer.client.deezer.client import DeezerClient
+from playlist_organizer.client.deezer.settings import DeezerSettings
+from playlist_organizer.client.transport import AsyncMeteredTransport, MeteredTransport, create_transport
+
+pytestmark = pytest.mark.anyio
+
+BODY = json.dumps({'data': [], 'padding': [{'id': i, 'title': 'Highway Star'} for i in range(100)]}).encode()
+
+
+def _gzipped(request):
+    assert 'gzip' in request.headers['Accept-Encoding']
+    return httpx.Response(200, content=gzip.compress(BODY), headers={'Content-Encoding': 'gzip'})
+
+
+def test_counts_wire_and_decoded_bytes():
+    transport = MeteredTransport(httpx.MockTransport(_gzipped))
+
+    with httpx.Client(transport=transport) as http:
+        assert http.get('https://dummy/tracks').json()['padding'][99]['id'] == 99
+        http.get('https://dummy/tracks')
+
+    stats = transport.stats
+    assert stats.responses == 2
+    assert stats.wire_bytes == 2 * len(gzip.compress(BODY))
+    assert stats.decoded_bytes == 2 * len(BODY)
+    assert stats.ratio > 5
+
+
+async def test_async_counts_wire_and_decoded_bytes():
+    transport = AsyncMeteredTransport(httpx.MockTransport(_gzipped))
+
+    async with httpx.AsyncClient(transport=transport) as http:
+        resp = await http.get('https://dummy/tracks')
+
+    assert resp.content == BODY
+    assert (transport.stats.wire_bytes, transport.stats.decoded_bytes) == (len(gzip.compress(BODY)), len(BODY))
+
+
+def test_settings():
+    assert DeezerSettings(compression=False).headers == {'Accept-Encoding': 'identity'}
+    assert DeezerSettings().headers == {}
+    assert isinstance(create_transport(DeezerSettings(http2=True)), MeteredTransport)
+
+
+@pytest.mark.parametrize(
+    ('client_cls', 'transport_cls'), [(DeezerClient, 'HTTPTransport'), (AsyncDeezerClient, 'AsyncHTTPTransport')]
+)
+def test_pool_limits_reach_the_transport(mocker, authenticator, client_cls, transport_cls):
+    settings = DeezerSettings(max_connections=3, max_keepalive_connections=2, keepalive_expiry=5)
+    created = mocker.spy(httpx, transport_cls)
+
+    client_cls(settings=settings, authenticator=authenticator)
+
+    assert created.call_args.kwargs['limits'] == settings.limits
+
+
+def test_client_is_metered(authenticator):
+    transport = MeteredTransport(httpx.MockTransport(_gzipped))
+    client = DeezerClient(
+        settings=DeezerSettings(api_host='https://dummy'), authenticator=authenticator, transport=transport
+    )
+
+    assert len(client.get_playlist_list()) == 0
+    assert client.wire_stats is transport.stats
+    assert client.wire_stats.decoded_bytes == len(BODY)
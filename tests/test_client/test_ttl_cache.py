@@ -0,0 +1,95 @@
+from pytest_httpx import HTTPXMock
+
+from playlist_organizer.client.deezer.client import DeezerClient
+from playlist_organizer.client.deezer.settings import DeezerSettings
+from playlist_organizer.client.spotify.client import SpotifyClient
+from playlist_organizer.client.spotify.settings import SpotifySettings
+from playlist_organizer.client.ttl_cache import CacheStats, TTLCache
+from tests.test_client.conftest import deezer_pages
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_put_stats():
+    cache = TTLCache()
+
+    assert cache.get('a') is None
+    cache.put('a', [1])
+
+    assert cache.get('a') == [1]
+    assert cache.get_or_fetch('a', lambda: [2]) == [1]
+    assert cache.get_or_fetch('b', lambda: [2]) == [2]
+    assert cache.stats == CacheStats(hits=2, misses=2, size=2)
+
+
+def test_evicts_least_recently_used():
+    cache = TTLCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_expires():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, clock=clock)
+    cache.put('a', 1)
+
+    clock.now = 10
+    assert cache.get('a') == 1
+    clock.now = 10.5
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_invalidate():
+    cache = TTLCache()
+    for key in [('playlists', 1), ('playlist/1', 1), ('playlist/2', 1)]:
+        cache.put(key, [])
+
+    assert cache.invalidate(lambda key: key[0] == 'playlist/1') == 1
+    assert cache.get(('playlist/2', 1)) == []
+    assert cache.invalidate() == 2
+    assert len(cache) == 0
+
+
+def test_client_keeps_listings_across_token_refresh(authenticator, httpx_mock: HTTPXMock):
+    client = DeezerClient(settings=DeezerSettings(api_host='https://dummy'), authenticator=authenticator)
+    playlists = [{'id': str(i), 'title': f'playlist{i}'} for i in range(3)]
+    httpx_mock.add_callback(deezer_pages(playlists, page_size=5))
+
+    authenticator.token = 'first'
+    client.get_playlist_list()
+    authenticator.token = 'refreshed'
+    client.get_playlist_list()
+    assert len(httpx_mock.get_requests()) == 1
+
+    assert client.refresh_playlist_catalog() == set()
+    assert client.get_playlist_names() == [p['title'] for p in playlists]
+    assert len(httpx_mock.get_requests()) == 2
+
+
+def test_create_playlist_drops_only_its_listing(authenticator, mocker):
+    client = SpotifyClient(settings=SpotifySettings(api_host='https://dummy'), authenticator=authenticator)
+    client._spotify = mocker.MagicMock()
+    client._spotify.playlist_create.return_value.id = 'new'
+    mocker.patch.object(SpotifyClient, 'current_user', new_callable=mocker.PropertyMock)
+    for key in [(client._listing(), 50), (client._listing('new'), 100), (client._listing('other'), 100)]:
+        client._listings.put(key, [])
+
+    client.create_playlist('new playlist')
+
+    assert client._listings.get((client._listing('other'), 100)) == []
+    assert client._listings.get((client._listing('new'), 100)) is None
+    assert client._listings.get((client._listing(), 50)) is None
@@ -1,10 +1,14 @@
 import json
+from datetime import datetime, timezone
 
+import pytest
 from tekore._model import PlaylistTrack as SpotifyTrack
 
 from playlist_organizer.client.base import Platform, Track
 from playlist_organizer.client.deezer.entities import Album, Artist
 from playlist_organizer.client.deezer.entities import Track as DeezerTrack
+from playlist_organizer.client.spotify.entities import PlaylistItemsPage
+from playlist_organizer.client.track import CompactTrack
 
 
 def test_track_convert_from_deezer():
@@ -22,6 +26,19 @@ def test_track_convert_from_deezer():
     assert track.album == deezer_track.album.title
     assert track.external_id == str(deezer_track.id)
     assert track.source == Platform.DEEZER
+    assert track.isrc is None
+
+
+def test_track_convert_from_deezer_with_isrc():
+    deezer_track = DeezerTrack(
+        id=111,
+        title='kek',
+        time_add=1599377243,
+        album=Album(id=222, title='Lol'),
+        artist=Artist(id=333, name='Cheburek'),
+        isrc='GBF087000290',
+    )
+    assert Track.from_deezer(deezer_track).isrc == 'GBF087000290'
 
 
 def test_track_convert_from_spotify(raw_data_dir):
@@ -35,3 +52,43 @@ def test_track_convert_from_spotify(raw_data_dir):
     assert track.added_at
     assert track.external_id == spotify_track.track.uri
     assert track.source is Platform.SPOTIFY
+    assert track.isrc == 'GBBZV0304216'
+
+
+def test_spotify_projection_same_as_full_model(raw_data_dir):
+    with (raw_data_dir / 'spotify_playlist_tracks_1.json').open() as f:
+        raw = json.load(f)
+
+    full = [Track.from_spotify(SpotifyTrack(**item)) for item in raw['items']]
+    projected = [Track.from_spotify(item) for item in PlaylistItemsPage.parse_obj(raw).items]
+
+    assert projected == full
+
+
+@pytest.mark.parametrize(
+    'added_at',
+    [
+        datetime(2020, 9, 6, 10, 27, 23),
+        datetime(1969, 12, 31, 23, 59, 59, 999),
+        datetime(2021, 1, 1, tzinfo=timezone.utc),
+    ],
+)
+def test_compact_track_round_trip(added_at):
+    track = Track(
+        artists=['Deep Purple', 'Rainbow'],
+        album='Machine Head',
+        title='Highway Star',
+        added_at=added_at,
+        source=Platform.DEEZER,
+        external_id='111',
+        isrc='GBF087000290',
+    )
+    compact = CompactTrack.from_track(track)
+
+    assert compact.to_track() == track
+    assert compact.added_at == added_at
+    assert str(compact) == str(track)
+    assert compact.keys == track.keys
+    assert compact == CompactTrack.from_track(track)
+    assert hash(compact) == hash(track)
+    assert not hasattr(compact, '__dict__')
@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import pytest
+
+from playlist_organizer.client.base import Platform, Track
+from playlist_organizer.client.catalog import PlaylistCatalog, PlaylistEntry
+from playlist_organizer.client.store import LibraryStore
+from playlist_organizer.library import LibraryMatcher
+from playlist_organizer.matcher import TrackMatcher
+
+
+def _create_track(title, source, external_id):
+    return Track(
+        artists=['Deep Purple'],
+        album='',
+        title=title,
+        added_at=datetime.now(),
+        source=source,
+        external_id=external_id,
+    )
+
+
+def _client(mocker, playlists, platform=Platform.DEEZER, version=None):
+    client = mocker.MagicMock()
+    client.platform = platform
+    client.get_playlist_catalog.return_value = PlaylistCatalog(
+        PlaylistEntry(id=name, name=name, version=version) for name in playlists
+    )
+    client.get_playlist_tracks_by_id.side_effect = lambda playlist_id: playlists[playlist_id]
+    client.with_isrc.side_effect = lambda tracks: tracks
+    return client
+
+
+@pytest.fixture()
+def deezer_tracks():
+    titles = ['Highway Star', 'Lazy', 'Burn', 'Stormbringer']
+    return [_create_track(title, Platform.DEEZER, str(i)) for i, title in enumerate(titles)]
+
+
+@pytest.fixture()
+def spotify_tracks():
+    titles = ['Highway Star', 'Lazy - Remastered', 'Burn', 'Child in Time']
+    return [_create_track(title, Platform.SPOTIFY, f'spotify:track:{i}') for i, title in enumerate(titles)]
+
+
+def test_library_match(mocker, deezer_tracks, spotify_tracks):
+    highway, lazy, burn, storm = deezer_tracks
+    s_highway, s_lazy, s_burn, s_child = spotify_tracks
+    deezer_client = _client(mocker, {'machine head': [highway, lazy], 'all': [highway, lazy, burn, storm]})
+    spotify_client = _client(mocker, {'mh': [s_lazy, s_highway], 'burn': [s_burn, s_child], 'other': [s_child]})
+
+    library = LibraryMatcher(deezer_client, spotify_client, TrackMatcher()).match()
+
+    assert len(library.tracks.found) == 3
+    assert [(o.left_name, o.right_name, o.common) for o in library.overlaps] == [
+        ('all', 'mh', 2),
+        ('machine head', 'mh', 2),
+        ('all', 'burn', 1),
+    ]
+    assert [t.to_track() for t in library.overlaps[0].only_left] == [burn, storm]
+    assert library.overlaps[1].only_left == []
+    assert [t.to_track() for t in library.overlaps[2].only_right] == [s_child]
+    assert deezer_client.get_playlist_tracks_by_id.call_count == 2
+    assert deezer_client.with_isrc.call_count == 2
+
+
+def test_library_match_through_store(mocker, tmp_path, deezer_tracks, spotify_tracks):
+    highway, lazy, burn, storm = deezer_tracks
+    s_highway, s_lazy, s_burn, s_child = spotify_tracks
+    deezer_client = _client(
+        mocker, {'machine head': [highway, lazy], 'all': [highway, lazy, burn, storm]}, version='v1'
+    )
+    spotify_client = _client(
+        mocker, {'mh': [s_lazy, s_highway], 'burn': [s_burn, s_child], 'other': [s_child]}, Platform.SPOTIFY, 'v1'
+    )
+    store = LibraryStore(tmp_path / 'library.sqlite3')
+    matcher = LibraryMatcher(deezer_client, spotify_client, TrackMatcher(), store)
+
+    expected = LibraryMatcher(deezer_client, spotify_client, TrackMatcher()).match()
+    for _ in range(2):
+        library = matcher.match()
+        assert len(library.tracks.found) == len(expected.tracks.found)
+        assert [(o.left_name, o.right_name, o.common) for o in library.overlaps] == [
+            (o.left_name, o.right_name, o.common) for o in expected.overlaps
+        ]
+
+    # once without the store and once by the first sync
+    assert deezer_client.get_playlist_tracks_by_id.call_count == 2 + 2
+    assert deezer_client.with_isrc.call_count == 2 + 2
+    store.close()
@@ -1,8 +1,8 @@
 import pytest
 
-from playlist_organizer.matcher import TrackMatcher
+from playlist_organizer.matcher import MatchMode, MatchOptions, TrackMatcher
 
 
-@pytest.fixture()
-def matcher():
-    return TrackMatcher(match_threshold=0)
+@pytest.fixture(params=list(MatchMode))
+def matcher(request):
+    return TrackMatcher(MatchOptions(threshold=0, mode=request.param))
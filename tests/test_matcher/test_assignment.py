@@ -0,0 +1,61 @@
+import random
+import string
+from datetime import datetime
+
+import pytest
+from Levenshtein import distance
+
+from playlist_organizer.client.base import Platform, Track
+from playlist_organizer.matcher import ExactKey, MatchMode, MatchOptions, TrackMatcher
+from playlist_organizer.matching.assignment import distance_matrix
+
+
+def _random_keys(count, max_len, seed):
+    rnd = random.Random(seed)
+    return [''.join(rnd.choices(string.ascii_lowercase[:5] + 'é1', k=rnd.randint(0, max_len))) for _ in range(count)]
+
+
+def _create_track(title, external_id):
+    return Track(
+        artists=[''],
+        album='',
+        title=title,
+        added_at=datetime.now(),
+        source=Platform.DEEZER,
+        external_id=external_id,
+    )
+
+
+@pytest.mark.parametrize('max_len', [3, 20, 80])
+@pytest.mark.parametrize('cap', [1, 4, 100])
+def test_distance_matrix(max_len, cap):
+    left, right = _random_keys(40, max_len, seed=1), _random_keys(50, max_len, seed=2)
+
+    matrix = distance_matrix(left, right, cap)
+
+    assert matrix.tolist() == [[min(distance(l, r), cap) for r in right] for l in left]
+
+
+def test_assignment_beats_greedy():
+    left = [_create_track('abcd', '1'), _create_track('xbcd', '2')]
+    right = [_create_track('abcd', '3'), _create_track('abce', '4')]
+
+    greedy = TrackMatcher(MatchOptions(threshold=1, mode=MatchMode.SCAN, exact_key=ExactKey.NONE)).match(left, right)
+    optimal = TrackMatcher(MatchOptions(threshold=1, mode=MatchMode.ASSIGNMENT, exact_key=ExactKey.NONE)).match(
+        left, right
+    )
+
+    assert len(greedy.found) == 1
+    assert optimal.found == {left[0]: right[1], left[1]: right[0]}
+
+
+def test_assignment_order_independent():
+    left = [_create_track(title, str(i)) for i, title in enumerate(_random_keys(60, 6, seed=3))]
+    right = [_create_track(title, str(i)) for i, title in enumerate(_random_keys(60, 6, seed=4))]
+    matcher = TrackMatcher(MatchOptions(threshold=2, mode=MatchMode.ASSIGNMENT, exact_key=ExactKey.NONE))
+
+    expected = matcher.match(left, right).found
+    random.Random(5).shuffle(left)
+    random.Random(6).shuffle(right)
+
+    assert matcher.match(left, right).found == expected
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+from Levenshtein import distance
+
+from playlist_organizer.client.base import Platform, Track
+from playlist_organizer.client.track import TrackKeys
+from playlist_organizer.matcher import ExactKey, MatchMode, MatchOptions, TrackMatcher
+from playlist_organizer.matching.distance import FieldWeights, bounded_distance, composite_score
+
+
+def _create_track(title, artist, album, external_id):
+    return Track(
+        artists=[artist],
+        album=album,
+        title=title,
+        added_at=datetime.now(),
+        source=Platform.DEEZER,
+        external_id=external_id,
+    )
+
+
+@pytest.mark.parametrize(('s1', 's2'), [('kitten', 'sitting'), ('kek', 'kekkekkek'), ('', 'lol'), ('lol', 'lol')])
+@pytest.mark.parametrize('cutoff', [0, 1, 3, 10])
+def test_bounded_distance(s1, s2, cutoff):
+    expected = distance(s1, s2)
+    assert bounded_distance(s1, s2, cutoff) == (expected if expected <= cutoff else cutoff + 1)
+
+
+def test_composite_score_rejects_by_fields_first(mocker):
+    spy = mocker.patch('playlist_organizer.matching.distance.distance')
+    left = TrackKeys(title='highwaystar', artists=('deeppurple',), album='machinehead')
+    right = TrackKeys(title='highwaystar', artists=('rainbow',), album='rising')
+
+    assert composite_score(left, right, FieldWeights(artist=2, album=2), threshold=3) == 4
+    spy.assert_not_called()
+
+
+def test_composite_score():
+    left = TrackKeys(title='highwaystar', artists=('deeppurple',), album='machinehead')
+    right = TrackKeys(title='highwaystars', artists=('deeppurple', 'rainbow'), album='live')
+
+    assert composite_score(left, right, FieldWeights(), threshold=3) == 1
+    assert composite_score(left, right, FieldWeights(artist=5, album=2), threshold=3) == 3
+    assert composite_score(left, right, FieldWeights(album=3), threshold=3) == 4
+
+
+@pytest.mark.parametrize('mode', list(MatchMode))
+def test_match_with_weights(mode):
+    left = [_create_track('Highway Star', 'Deep Purple', 'Machine Head', '1')]
+    right = [
+        _create_track('Highway Star', 'Deep Purple', 'Made in Japan', '2'),
+        _create_track('Highway Stars', 'Deep Purple', 'Machine Head', '3'),
+        _create_track('Highway Star', 'Rainbow', 'Machine Head', '4'),
+    ]
+    matcher = TrackMatcher(MatchOptions(threshold=3, mode=mode, exact_key=ExactKey.NONE, weights=FieldWeights(3, 2)))
+
+    result = matcher.match(left, right)
+
+    assert result.found == {left[0]: right[1]}
+
+
+@pytest.mark.parametrize('mode', list(MatchMode))
+def test_match_with_weights_no_candidates(mode):
+    left = [_create_track('hello world', 'Deep Purple', 'Machine Head', '1')]
+    right = [_create_track('completely different', 'Deep Purple', 'Machine Head', '2')]
+    matcher = TrackMatcher(MatchOptions(mode=mode, exact_key=ExactKey.NONE, weights=FieldWeights(artist=1)))
+
+    result = matcher.match(left, right)
+
+    assert not result.found
+    assert result.only_left == left
+    assert result.only_right == right
@@ -0,0 +1,55 @@
+import pytest
+from Levenshtein import distance as levenshtein
+
+from benchmarks.synthetic import Noise, synthetic_libraries
+from playlist_organizer.client.track import CompactTrack
+from playlist_organizer.matcher import ExactKey, MatchMode, MatchOptions, TrackMatcher
+from playlist_organizer.matching import distance
+from playlist_organizer.matching.distance import FieldWeights
+from playlist_organizer.matching.parallel import ParallelOptions
+
+NOISY = Noise(remaster=0.3, punctuation=0.5, typo=0.3, missing=0.1)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('exact_key', [ExactKey.NONE, ExactKey.TITLE_ARTIST])
+@pytest.mark.parametrize('weights', [FieldWeights(), FieldWeights(artist=1, album=1)])
+def test_modes_same_as_scan(seed, exact_key, weights):
+    left, right = synthetic_libraries(150, NOISY, seed=seed)
+
+    expected = TrackMatcher(MatchOptions(mode=MatchMode.SCAN, exact_key=exact_key, weights=weights)).match(left, right)
+    for mode in (MatchMode.INDEXED, MatchMode.PARALLEL):
+        options = ParallelOptions(workers=2, chunk_size=40)
+        actual = TrackMatcher(MatchOptions(mode=mode, exact_key=exact_key, weights=weights, parallel=options)).match(
+            left, right
+        )
+        assert actual.same_pairs(expected), mode
+
+    assignment = TrackMatcher(MatchOptions(mode=MatchMode.ASSIGNMENT, exact_key=exact_key, weights=weights)).match(
+        left, right
+    )
+    assert len(assignment.found) >= len(expected.found)
+
+
+def test_indexed_computes_fewer_distances(mocker):
+    left, right = synthetic_libraries(300, NOISY)
+    calls = mocker.patch.object(distance, 'distance', side_effect=levenshtein)
+
+    TrackMatcher(MatchOptions(mode=MatchMode.SCAN, exact_key=ExactKey.NONE)).match(left, right)
+    scan_calls = calls.call_count
+    calls.reset_mock()
+    TrackMatcher(MatchOptions(mode=MatchMode.INDEXED, exact_key=ExactKey.NONE)).match(left, right)
+
+    assert 0 < calls.call_count < scan_calls
+
+
+def test_compact_tracks_match_the_same():
+    left, right = synthetic_libraries(200, NOISY)
+
+    expected = TrackMatcher().match(left, right)
+    actual = TrackMatcher().match(
+        [CompactTrack.from_track(t) for t in left], [CompactTrack.from_track(t) for t in right]
+    )
+
+    assert {(l.to_track(), r.to_track()) for l, r in actual.found.items()} == set(expected.found.items())
+    assert [t.to_track() for t in actual.only_left] == expected.only_left
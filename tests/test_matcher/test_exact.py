@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import pytest
+
+from playlist_organizer.client.base import Platform, Track
+from playlist_organizer.matcher import ExactKey, MatchOptions, MatchStage, TrackMatcher
+
+
+def _create_track(title, artist, external_id):
+    return Track(
+        artists=[artist],
+        album='',
+        title=title,
+        added_at=datetime.now(),
+        source=Platform.DEEZER,
+        external_id=external_id,
+    )
+
+
+@pytest.fixture()
+def left():
+    return [_create_track('Highway Star', 'Deep Purple', '1'), _create_track('Lazy', 'Deep Purple', '2')]
+
+
+@pytest.fixture()
+def right():
+    return [_create_track('Lazy (Remastered)', 'Deep purple', '3'), _create_track('Highway Star', 'Purple', '4')]
+
+
+def test_exact_by_title(left, right):
+    result = TrackMatcher(MatchOptions(exact_key=ExactKey.TITLE)).match(left, right)
+
+    assert result.found == {left[0]: right[1], left[1]: right[0]}
+    assert result.stage_counts == {MatchStage.EXACT: 2}
+
+
+def test_exact_by_title_and_artist(left, right):
+    result = TrackMatcher(MatchOptions(exact_key=ExactKey.TITLE_ARTIST)).match(left, right)
+
+    assert result.found == {left[0]: right[1], left[1]: right[0]}
+    assert result.stages == {left[0]: MatchStage.FUZZY, left[1]: MatchStage.EXACT}
+
+
+def test_without_exact_stage(left, right):
+    result = TrackMatcher(MatchOptions(exact_key=ExactKey.NONE)).match(left, right)
+
+    assert result.found == {left[0]: right[1], left[1]: right[0]}
+    assert result.stage_counts == {MatchStage.FUZZY: 2}
+
+
+def test_exact_stage_goes_first(left, right):
+    right.append(_create_track('Highway Stars', 'Deep Purple', '5'))
+    left.insert(0, _create_track('Highway Stars', 'Deep Purple', '6'))
+
+    result = TrackMatcher(MatchOptions(threshold=0)).match(left, right)
+
+    assert result.found[left[0]] == right[2]
+    assert result.found[left[1]] == right[1]
+    assert not result.only_left
+    assert not result.only_right
+
+
+def test_isrc_goes_first(left, right):
+    right.append(_create_track('Lazy - Live', 'Deep Purple', '5').copy(update={'isrc': 'GBF087000290'}))
+    left[1] = left[1].copy(update={'isrc': 'gbf087000290'})
+
+    result = TrackMatcher().match(left, right)
+
+    assert result.found == {left[0]: right[1], left[1]: right[2]}
+    assert result.stages[left[1]] == MatchStage.ISRC
+    assert result.only_right == [right[0]]
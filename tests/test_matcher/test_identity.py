@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+
+from playlist_organizer.client.base import Platform, Track
+from playlist_organizer.matcher import MatchOptions, MatchStage, TrackMatcher
+from playlist_organizer.matching.identity import IdentityStore
+
+
+def _create_track(title, source, external_id):
+    return Track(
+        artists=['Deep Purple'],
+        album='',
+        title=title,
+        added_at=datetime.now(),
+        source=source,
+        external_id=external_id,
+    )
+
+
+@pytest.fixture()
+def path(tmp_path):
+    return tmp_path / 'identities.json'
+
+
+@pytest.fixture()
+def deezer_track():
+    return _create_track('Smoke on the Water', Platform.DEEZER, '111')
+
+
+@pytest.fixture()
+def spotify_track():
+    return _create_track('Smoke on the Water - Live', Platform.SPOTIFY, 'spotify:track:222')
+
+
+def test_store_persists(path, deezer_track, spotify_track):
+    IdentityStore(path).add(deezer_track, spotify_track)
+
+    store = IdentityStore(path)
+    assert store.get(deezer_track) == (Platform.SPOTIFY, 'spotify:track:222')
+    assert store.get(spotify_track) == (Platform.DEEZER, '111')
+
+
+def test_store_relink(path, deezer_track, spotify_track):
+    other = _create_track('Smoke on the Water', Platform.SPOTIFY, 'spotify:track:333')
+    store = IdentityStore(path)
+    store.add(deezer_track, spotify_track)
+    store.add(deezer_track, other)
+
+    store = IdentityStore(path)
+    assert store.get(deezer_track) == (Platform.SPOTIFY, 'spotify:track:333')
+    assert store.get(spotify_track) is None
+
+
+def test_store_broken_file(path, deezer_track):
+    path.write_text('[["DEEZER", "111"]]')
+    assert IdentityStore(path).get(deezer_track) is None
+
+
+def test_match_remembered(path, deezer_track, spotify_track):
+    decoy = _create_track('Smoke on the Water', Platform.SPOTIFY, 'spotify:track:333')
+    matcher = TrackMatcher(MatchOptions(threshold=0), identities=IdentityStore(path))
+
+    assert matcher.match([deezer_track], [spotify_track, decoy]).found == {deezer_track: decoy}
+
+    matcher.remember([(deezer_track, spotify_track)])
+    result = TrackMatcher(MatchOptions(threshold=0), identities=IdentityStore(path)).match(
+        [deezer_track], [spotify_track, decoy]
+    )
+
+    assert result.found == {deezer_track: spotify_track}
+    assert result.stages == {deezer_track: MatchStage.IDENTITY}
+    assert result.only_right == [decoy]
@@ -0,0 +1,58 @@
+import random
+import string
+
+import pytest
+from Levenshtein import distance
+
+from playlist_organizer.matching.index import SegmentIndex, match_indexed
+
+
+def _random_keys(count, seed):
+    rnd = random.Random(seed)
+    alphabet = string.ascii_lowercase[:6] + string.digits[:2]
+    return [''.join(rnd.choices(alphabet, k=rnd.randint(0, 12))) for _ in range(count)]
+
+
+@pytest.mark.parametrize('threshold', [0, 1, 3])
+def test_candidates_are_complete(threshold):
+    keys = _random_keys(300, seed=threshold)
+    index = SegmentIndex(keys, threshold)
+
+    for query in _random_keys(50, seed=threshold + 100):
+        expected = {key_id for key_id, key in enumerate(keys) if distance(query, key) <= threshold}
+        assert expected <= set(index.candidates(query))
+
+
+def test_candidates_pruned():
+    keys = ['highwaystar', 'picturesofhome', 'burn', 'lazy', 'smokeonthewater']
+    index = SegmentIndex(keys, threshold=1)
+
+    assert [index.key(key_id) for key_id in index.candidates('highwaystra')] == ['highwaystar']
+
+
+def test_match_indexed_prefers_closest_then_latest():
+    pairs = match_indexed(['abcdef', 'abcdef', 'abcdef'], ['abcdxx', 'abcdef', 'abcdef'], threshold=2)
+    assert pairs == {0: 2, 1: 1, 2: 0}
+
+
+def test_match_indexed_keeps_threshold():
+    assert match_indexed(['abcd'], ['wxyz', 'abxy'], threshold=1) == {}
+
+
+@pytest.mark.parametrize('threshold', [1, 2, 3])
+def test_match_indexed_threshold_boundary(threshold):
+    key = 'abcdefgh'
+    at_threshold = 'x' * threshold + key[threshold:]
+    past_threshold = 'x' * (threshold + 1) + key[threshold + 1 :]
+
+    assert match_indexed([key], [at_threshold], threshold) == {0: 0}
+    assert match_indexed([key], [past_threshold], threshold) == {}
+    assert match_indexed([key], [past_threshold], threshold, penalty=lambda i, j: 0) == {}
+    assert match_indexed([key], [key], threshold, penalty=lambda i, j: threshold) == {0: 0}
+    assert match_indexed([key], [key[1:]], threshold, penalty=lambda i, j: threshold) == {}
+
+
+def test_match_indexed_with_penalty():
+    penalties = {(0, 0): 0, (0, 1): 2, (0, 2): 0}
+    pairs = match_indexed(['abcd'], ['abcx', 'abcd', 'abcy'], threshold=2, penalty=lambda i, j: penalties[i, j])
+    assert pairs == {0: 2}
@@ -43,3 +43,11 @@ def test_no_match(matcher, title1, title2):
     track1, track2 = _create_track(title1), _create_track(title2)
     result = matcher.match([track1], [track2])
     assert not result.found
+
+
+def test_track_keys():
+    track = _create_track('Burn (Remastered 2004)').copy(update={'artists': ['Deep Purple'], 'album': 'Burn!'})
+    same = track.copy(update={'external_id': '42'})
+
+    assert track.keys == ('burn2004', ('deeppurple',), 'burn')
+    assert track.keys is same.keys
@@ -0,0 +1,42 @@
+import random
+import string
+from datetime import datetime
+
+import pytest
+
+from playlist_organizer.client.base import Platform, Track
+from playlist_organizer.matcher import ExactKey, MatchMode, MatchOptions, TrackMatcher
+from playlist_organizer.matching.distance import FieldWeights
+from playlist_organizer.matching.parallel import ParallelOptions
+
+
+def _random_tracks(count, seed):
+    rnd = random.Random(seed)
+    return [
+        Track(
+            artists=[rnd.choice('ab')],
+            album=rnd.choice('cd'),
+            title=''.join(rnd.choices(string.ascii_lowercase[:4], k=rnd.randint(1, 7))),
+            added_at=datetime.now(),
+            source=Platform.DEEZER,
+            external_id=str(i),
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize('weights', [FieldWeights(), FieldWeights(artist=1, album=2)])
+@pytest.mark.parametrize('options', [ParallelOptions(workers=1), ParallelOptions(workers=2, chunk_size=15)])
+def test_parallel_same_as_scan(weights, options):
+    left, right = _random_tracks(80, seed=1), _random_tracks(70, seed=2)
+
+    expected = TrackMatcher(MatchOptions(mode=MatchMode.SCAN, exact_key=ExactKey.NONE, weights=weights)).match(
+        left, right
+    )
+    actual = TrackMatcher(
+        MatchOptions(mode=MatchMode.PARALLEL, exact_key=ExactKey.NONE, weights=weights, parallel=options)
+    ).match(left, right)
+
+    assert actual.found == expected.found
+    assert actual.only_left == expected.only_left
+    assert actual.only_right == expected.only_right